@@ -12,9 +12,14 @@ setup(
         "click",
         "python-dateutil",
     ],
+    extras_require={
+        "columnar": ["pyarrow"],
+        "zstd": ["zstandard"],
+    },
     entry_points={
         "console_scripts": [
             "track = timetrack.cli:main",
+            "trackd = timetrack.daemon:main",
         ],
     },
 )
@@ -0,0 +1,36 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Callable, Optional
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def track_env(tmp_path: Path) -> dict:
+    """An environment for running track against an empty data directory."""
+    env = dict(os.environ)
+    env["HOME"] = str(tmp_path)
+    env["PYTHONPATH"] = str(REPO_ROOT)
+    return env
+
+
+@pytest.fixture
+def track(track_env: dict) -> Callable[..., subprocess.CompletedProcess]:
+    """Runs the track CLI in a subprocess, with its data in a temporary home."""
+
+    def run(*args: str, input: Optional[str] = None) -> subprocess.CompletedProcess:
+        result = subprocess.run(
+            [sys.executable, "-m", "timetrack.cli", *args],
+            env=track_env,
+            input=input,
+            capture_output=True,
+            text=True,
+        )
+        assert result.returncode == 0, result.stderr
+        return result
+
+    return run
@@ -0,0 +1,116 @@
+from datetime import date, timedelta
+
+
+def test_times_with_an_offset_are_stored_as_local_time(track, track_env):
+    track_env["TZ"] = "UTC"
+    track("add", "work", "--start", "01-07-2025 09:00+02:00", "--end", "01-07-2025 09:30Z")
+    track("add", "other", "--start", "01-07-2025 10:00", "--for", "1h")
+
+    log = track("log", "01-07-2025").stdout
+    assert "07:00:00   09:30:00   work" in log
+
+    track("edit", "0", "--when", "01-07-2025", input="\n2025-07-01T08:00:00+01:00\n\n")
+    assert "07:00:00   09:30:00   work" in track("log", "01-07-2025").stdout
+    track("remove", "1", "--when", "01-07-2025")
+    assert "other" not in track("log", "01-07-2025").stdout
+
+
+def test_report_describes_open_ended_ranges(track):
+    track("add", "work", "--start", "01-07-2025 09:00", "--for", "1h")
+
+    assert "--- Report from 2025-07-01 onwards ---" in track("report", "--from", "01-07-2025").stdout
+    assert "No log entries up to 2025-06-30." in track("report", "--to", "30-06-2025").stdout
+
+
+def test_report_refuses_a_period_with_a_range(track):
+    result = track("report", "--month", "--from", "01-07-2025")
+    assert "Give either --week/--month or --from/--to" in result.stdout
+
+
+def day(d: date) -> str:
+    return d.strftime("%d-%m-%Y")
+
+
+def test_report_covers_this_week_by_default(track):
+    monday = date.today() - timedelta(days=date.today().weekday())
+    track("add", "this week", "--start", f"{day(monday)} 09:00", "--for", "1h")
+    track("add", "last week", "--start", f"{day(monday - timedelta(days=1))} 09:00", "--for", "1h")
+
+    report = track("report").stdout
+    assert f"--- Report from {monday} to {monday + timedelta(days=6)} ---" in report
+    assert "this week" in report and "last week" not in report
+    assert track("report", "--week").stdout == report
+
+
+def test_report_covers_this_month(track):
+    first = date.today().replace(day=1)
+    track("add", "this month", "--start", f"{day(first)} 09:00", "--for", "1h")
+    track("add", "last month", "--start", f"{day(first - timedelta(days=1))} 09:00", "--for", "1h")
+
+    report = track("report", "--month").stdout
+    assert f"--- Report from {first} to " in report
+    assert "this month" in report and "last month" not in report
+
+
+def test_report_totals_a_range_per_activity_and_day(track):
+    track("add", "review", "--start", "01-07-2025 09:00", "--for", "1h")
+    track("add", "meeting", "--start", "01-07-2025 11:00", "--for", "30m")
+    track("add", "review", "--start", "02-07-2025 09:00", "--for", "30m")
+    track("add", "review", "--start", "03-07-2025 09:00", "--for", "2h")
+
+    lines = track("report", "--from", "01-07-2025", "--to", "02-07-2025").stdout.splitlines()
+    assert lines[0] == "--- Report from 2025-07-01 to 2025-07-02 ---"
+    assert lines[3].split() == ["review", "1h", "30m", "2", "75.0%"]
+    assert lines[4].split() == ["meeting", "30m", "1", "25.0%"]
+    assert lines[-1] == "Total time: 2h 0m"
+
+    filtered = track("report", "--from", "01-07-2025", "--to", "02-07-2025", "--activity", "meeting")
+    assert filtered.stdout.splitlines()[-1] == "Total time: 30m"
+    assert "Invalid date format" in track("report", "--from", "31-31-2025").stdout
+
+
+def test_status_totals_follow_edits_removals_and_rebuilds(track, tmp_path):
+    today = day(date.today())
+    track("add", "a", "--start", f"{today} 08:00", "--for", "1h")
+    track("add", "b", "--start", f"{today} 10:00", "--for", "30m")
+    assert "Logged today: 1h 30m" in track("status").stdout
+
+    track("remove", "1", "--when", today)
+    assert "Logged today: 1h 0m" in track("status").stdout
+
+    track("edit", "0", "--when", today, input=f"\n\n{date.today()}T08:15:00\n")
+    assert "Logged today: 15m" in track("status").stdout
+
+    # Totals are rebuilt from the log when the rollups are missing.
+    for name in ("rollups.json", "rollups.journal.jsonl"):
+        (tmp_path / ".timetrack" / name).unlink(missing_ok=True)
+    assert "Logged today: 15m" in track("status").stdout
+    assert "Total time: 15m" in track("report").stdout
+
+
+def test_report_from_rollups_matches_report_from_entries(track):
+    for start, minutes in [("01-07-2025 09:00", "1h"), ("01-07-2025 11:00", "45m"), ("05-07-2025 09:00", "20m")]:
+        track("add", "work", "--start", start, "--for", minutes)
+
+    args = ["report", "--from", "01-07-2025", "--to", "31-07-2025"]
+    assert track(*args).stdout == track(*args, "--where", "duration > 0").stdout
+
+
+def test_log_shows_a_range_of_days_keeping_day_ids(track):
+    track("add", "a", "--start", "01-07-2025 09:00", "--for", "1h")
+    track("add", "b", "--start", "01-07-2025 11:00", "--for", "1h")
+    track("add", "c", "--start", "03-07-2025 09:00", "--for", "30m")
+    track("add", "d", "--start", "05-07-2025 09:00", "--for", "30m")
+
+    log = track("log", "--from", "01-07-2025", "--to", "03-07-2025").stdout
+    assert "2025-07-01" in log and "2025-07-03" in log and "2025-07-05" not in log
+
+    # IDs count from each day's first entry, so they work with edit and remove.
+    log = track("log", "--from", "01-07-2025", "--where", "activity = b").stdout
+    assert "1     11:00:00   12:00:00   b" in log
+    assert "No log entries from 2025-07-06 onwards." in track("log", "--from", "06-07-2025").stdout
+
+
+def test_log_refuses_a_day_with_a_range(track):
+    result = track("log", "01-07-2025", "--from", "01-07-2025")
+    assert "Give either a day or --from/--to" in result.stderr
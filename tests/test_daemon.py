@@ -0,0 +1,115 @@
+import json
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from timetrack.daemon import CachedLogStore
+from timetrack.models import TimeEntry
+from timetrack.storage import SqliteLogStore
+
+
+@pytest.fixture
+def trackd(track_env, tmp_path):
+    """Runs trackd against the temporary home and yields a function sending it raw requests."""
+    socket_file = Path(tmp_path) / ".timetrack" / "trackd.sock"
+    process = subprocess.Popen(
+        [sys.executable, "-m", "timetrack.daemon"],
+        env=track_env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 10
+    while not socket_file.exists() and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+    def send(request: dict) -> dict:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(10)
+            sock.connect(str(socket_file))
+            sock.sendall(json.dumps(request).encode() + b"\n")
+            with sock.makefile("rb") as f:
+                return json.loads(f.readline())
+
+    try:
+        yield send
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def test_serves_cli_methods(trackd, track):
+    assert "No task is currently running" in trackd({"method": "status"})["result"]
+
+    track("add", "review", "--start", "01-07-2025 09:00", "--for", "1h")
+    assert "review" in trackd({"method": "get_log", "args": ["01-07-2025"]})["result"]
+
+
+@pytest.mark.parametrize(
+    "method",
+    ["iter_entries", "_read_log", "update", "__init__", ["status"], None],
+)
+def test_refuses_methods_the_cli_does_not_call(trackd, method):
+    response = trackd({"method": method})
+    assert "Unknown method" in response["error"]
+
+
+def test_errors_are_returned_rather_than_dropping_the_connection(trackd):
+    response = trackd({"method": "get_log", "args": [1, 2, 3, 4, 5, 6]})
+    assert "error" in response
+    assert "No task is currently running" in trackd({"method": "status"})["result"]
+
+
+def test_a_slow_client_does_not_hold_up_others(trackd, tmp_path):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as slow:
+        # Connected, but the request line never arrives.
+        slow.connect(str(tmp_path / ".timetrack" / "trackd.sock"))
+        slow.sendall(b'{"method": ')
+        assert "No task is currently running" in trackd({"method": "status"})["result"]
+
+
+def test_socket_is_private_to_the_user(trackd, tmp_path):
+    mode = (tmp_path / ".timetrack" / "trackd.sock").stat().st_mode
+    assert mode & 0o777 == 0o600
+
+
+def test_cached_log_is_not_changed_through_what_callers_read(tmp_path):
+    store = CachedLogStore(SqliteLogStore(tmp_path / "timelog.db"))
+    start = datetime(2025, 7, 1, 9)
+    store.append_entry(
+        TimeEntry(start_time=start, end_time=start.replace(hour=10), activity="a", duration_minutes=60)
+    )
+
+    store.read_log().entries.clear()
+    assert len(store.read_log().entries) == 1
+    assert len(list(store.iter_log())) == 1
+
+
+@pytest.mark.parametrize("reply", [b'{"error": "boom"}\n', b""])
+def test_cli_reports_trackd_failures_as_errors(track_env, tmp_path, reply):
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            if self.rfile.readline():
+                self.wfile.write(reply)
+
+    socket_file = tmp_path / ".timetrack" / "trackd.sock"
+    socket_file.parent.mkdir()
+    with socketserver.ThreadingUnixStreamServer(str(socket_file), Handler) as server:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        result = subprocess.run(
+            [sys.executable, "-m", "timetrack.cli", "status"],
+            env=track_env,
+            capture_output=True,
+            text=True,
+        )
+        server.shutdown()
+
+    assert result.returncode == 1
+    assert result.stderr.startswith("❗ Error: trackd")
+    assert "Traceback" not in result.stderr
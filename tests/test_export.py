@@ -0,0 +1,290 @@
+import csv
+import gzip
+import io
+import json
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import openpyxl
+import pytest
+
+from timetrack import export
+from timetrack.export import (
+    EXPORT_COLUMNS,
+    WRITERS,
+    part_targets,
+    write_csv,
+    write_many,
+    write_partitioned,
+    write_xlsx,
+)
+from timetrack.models import ExportManifest, ExportWatermark, TimeEntry
+from timetrack.storage import FileLock
+
+
+def entry(start: datetime, minutes: int, activity: str, notes=()) -> TimeEntry:
+    return TimeEntry(
+        start_time=start,
+        end_time=start + timedelta(minutes=minutes),
+        activity=activity,
+        duration_minutes=minutes,
+        notes=list(notes),
+    )
+
+
+NINE = datetime(2025, 7, 1, 9)
+ENTRIES = [
+    entry(NINE, 60, "review", ["PR 12", "PR 13"]),
+    entry(NINE + timedelta(hours=2), 30, "meeting"),
+    entry(NINE + timedelta(days=31), 45, "review"),
+]
+
+
+def exported_activities(path: Path) -> list:
+    with path.open(newline="") as f:
+        return [row["activity"] for row in csv.DictReader(f)]
+
+
+def test_since_last_exports_only_new_entries(track, tmp_path):
+    track("add", "first", "--start", "01-07-2025 09:00", "--for", "1h")
+    track("add", "second", "--start", "02-07-2025 09:00", "--for", "1h")
+
+    out = tmp_path / "all.csv"
+    track("export", "--since-last", "-o", str(out))
+    assert exported_activities(out) == ["first", "second"]
+
+    result = track("export", "--since-last", "-o", str(tmp_path / "none.csv"))
+    assert "No new or changed entries" in result.stdout
+    assert not (tmp_path / "none.csv").exists()
+
+    track("add", "third", "--start", "03-07-2025 09:00", "--for", "1h")
+    out = tmp_path / "delta.csv"
+    track("export", "--since-last", "-o", str(out))
+    assert exported_activities(out) == ["third"]
+
+
+def test_since_last_exports_edited_entries(track, tmp_path):
+    track("add", "first", "--start", "01-07-2025 09:00", "--for", "1h")
+    track("add", "second", "--start", "02-07-2025 09:00", "--for", "1h")
+    track("export", "--since-last", "-o", str(tmp_path / "all.csv"))
+
+    # Rename the first entry, keeping its times.
+    track("edit", "0", "--when", "01-07-2025", input="renamed\n\n\n")
+    out = tmp_path / "delta.csv"
+    track("export", "--since-last", "-o", str(out))
+    assert exported_activities(out) == ["renamed"]
+
+
+def test_filtered_since_last_keeps_the_rest_of_the_watermark(track, tmp_path):
+    track("add", "first", "--start", "01-07-2025 09:00", "--for", "1h")
+    track("add", "second", "--start", "02-07-2025 09:00", "--for", "1h")
+    track("export", "--since-last", "-o", str(tmp_path / "all.csv"))
+
+    track("add", "third", "--start", "03-07-2025 09:00", "--for", "1h")
+    result = track(
+        "export", "--since-last", "--from", "01-07-2025", "--to", "01-07-2025",
+        "-o", str(tmp_path / "day.csv"),
+    )
+    assert "No new or changed entries" in result.stdout
+
+    # The filtered export must not have forgotten the second entry.
+    out = tmp_path / "delta.csv"
+    track("export", "--since-last", "-o", str(out))
+    assert exported_activities(out) == ["third"]
+
+
+def test_since_last_tells_apart_entries_that_share_a_start(track, tmp_path):
+    track("add", "a", "--start", "01-07-2025 09:00", "--for", "1h")
+    track("add", "b", "--start", "01-07-2025 09:00", "--for", "30m", "--allow-overlap")
+
+    out = tmp_path / "all.csv"
+    track("export", "--since-last", "-o", str(out))
+    assert sorted(exported_activities(out)) == ["a", "b"]
+
+    result = track("export", "--since-last", "-o", str(tmp_path / "none.csv"))
+    assert "No new or changed entries" in result.stdout
+
+
+def test_since_last_reads_watermarks_with_one_hash_per_start():
+    watermark = ExportWatermark.model_validate_json(
+        '{"exported_at": "2025-07-01T10:00:00", "fingerprints": {"2025-07-01T09:00:00": "abc"}}'
+    )
+    assert watermark.fingerprints == {"2025-07-01T09:00:00": ["abc"]}
+
+
+def test_since_last_waits_for_the_data_lock(track, track_env, tmp_path):
+    track("add", "first", "--start", "01-07-2025 09:00", "--for", "1h")
+    out = tmp_path / "all.csv"
+
+    with FileLock(tmp_path / ".timetrack" / ".lock"):
+        export = subprocess.Popen(
+            [sys.executable, "-m", "timetrack.cli", "export", "--since-last", "-o", str(out)],
+            env=track_env,
+            stdout=subprocess.DEVNULL,
+        )
+        time.sleep(1)
+        assert export.poll() is None
+    assert export.wait(timeout=30) == 0
+    assert exported_activities(out) == ["first"]
+
+
+def test_csv_has_one_row_per_entry_with_notes_joined():
+    buffer = io.BytesIO()
+    write_csv(ENTRIES, buffer)
+
+    rows = list(csv.DictReader(io.StringIO(buffer.getvalue().decode())))
+    assert [row["activity"] for row in rows] == ["review", "meeting", "review"]
+    assert rows[0]["start_time"] == "2025-07-01 09:00:00.000000"
+    assert rows[0]["duration_minutes"] == "60"
+    assert rows[0]["notes"] == "PR 12\nPR 13"
+    assert rows[1]["notes"] == ""
+
+
+def test_csv_export_does_not_import_pandas(track, track_env, tmp_path):
+    track("add", "work", "--start", "01-07-2025 09:00", "--for", "1h")
+    out = tmp_path / "out.csv"
+    script = (
+        "import sys\n"
+        "from timetrack.cli import main\n"
+        f"main(['export', '-o', {str(out)!r}], standalone_mode=False)\n"
+        "print('pandas' in sys.modules)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script], env=track_env, capture_output=True, text=True, check=True
+    )
+    assert result.stdout.splitlines()[-1] == "False"
+    assert exported_activities(out) == ["work"]
+
+
+def test_xlsx_stores_native_datetimes_and_numbers():
+    buffer = io.BytesIO()
+    write_xlsx(ENTRIES, buffer)
+
+    sheet = openpyxl.load_workbook(buffer).active
+    rows = list(sheet.iter_rows(values_only=True))
+    assert rows[0] == EXPORT_COLUMNS
+    assert rows[1] == (NINE, NINE + timedelta(hours=1), "review", 60, "PR 12\nPR 13")
+    assert len(rows) == 1 + len(ENTRIES)
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_columnar_formats_round_trip_across_batches(monkeypatch, fmt):
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    # One entry per batch, so later batches add to the activity dictionary.
+    monkeypatch.setattr(export, "ARROW_BATCH_ROWS", 1)
+    buffer = io.BytesIO()
+    WRITERS[fmt](ENTRIES, buffer)
+
+    buffer.seek(0)
+    table = pq.read_table(buffer) if fmt == "parquet" else pa.ipc.open_file(buffer).read_all()
+    assert table.schema.field("start_time").type == pa.timestamp("us")
+    assert pa.types.is_dictionary(table.schema.field("activity").type)
+    assert table.column("activity").to_pylist() == ["review", "meeting", "review"]
+    assert table.column("start_time").to_pylist()[2] == ENTRIES[2].start_time
+    assert table.column("notes").to_pylist() == [["PR 12", "PR 13"], [], []]
+
+
+def test_several_formats_are_written_from_one_pass(monkeypatch, tmp_path):
+    monkeypatch.setattr(export, "FANOUT_BATCH_ROWS", 2)
+    many = [entry(NINE + timedelta(hours=i), 30, f"a{i}") for i in range(25)]
+    reads = []
+
+    def read_once():
+        reads.append(1)
+        yield from many
+
+    targets = [tmp_path / "out.csv", tmp_path / "out.json", tmp_path / "out.xlsx"]
+    write_many(read_once(), [(WRITERS[t.suffix[1:]], str(t)) for t in targets])
+
+    assert len(reads) == 1
+    assert exported_activities(targets[0]) == [e.activity for e in many]
+    assert [e["activity"] for e in json.loads(targets[1].read_text())] == [e.activity for e in many]
+    assert openpyxl.load_workbook(targets[2]).active.max_row == 1 + len(many)
+
+
+def test_a_failing_writer_stops_the_fan_out_with_its_error(monkeypatch, tmp_path):
+    monkeypatch.setattr(export, "FANOUT_BATCH_ROWS", 1)
+    monkeypatch.setattr(export, "FANOUT_QUEUE_BATCHES", 1)
+
+    def failing(entries, output):
+        raise ValueError("disk full")
+
+    many = [entry(NINE + timedelta(hours=i), 30, "a") for i in range(50)]
+    with pytest.raises(ValueError, match="disk full"):
+        write_many(many, [(write_csv, str(tmp_path / "ok.csv")), (failing, str(tmp_path / "bad.csv"))])
+    assert len(exported_activities(tmp_path / "ok.csv")) == len(many)
+
+
+def test_export_to_stdout(track):
+    track("add", "work", "--start", "01-07-2025 09:00", "--for", "1h")
+    result = track("export", "--format", "csv", "-o", "-")
+
+    rows = list(csv.DictReader(io.StringIO(result.stdout)))
+    assert [row["activity"] for row in rows] == ["work"]
+
+
+@pytest.mark.parametrize("suffix", [".gz", ".zst"])
+def test_export_compresses_by_extension(track, tmp_path, suffix):
+    track("add", "work", "--start", "01-07-2025 09:00", "--for", "1h")
+    out = tmp_path / f"out.csv{suffix}"
+    track("export", "-o", str(out))
+
+    if suffix == ".zst":
+        zstandard = pytest.importorskip("zstandard")
+        data = zstandard.ZstdDecompressor().stream_reader(io.BytesIO(out.read_bytes())).read()
+    else:
+        data = gzip.decompress(out.read_bytes())
+    rows = list(csv.DictReader(io.StringIO(data.decode())))
+    assert [row["activity"] for row in rows] == ["work"]
+
+
+def test_partitioned_export_writes_a_manifest(track, tmp_path):
+    track("add", "review", "--start", "01-07-2025 09:00", "--for", "1h")
+    track("add", "meeting", "--start", "01-07-2025 11:00", "--for", "30m")
+    track("add", "review", "--start", "01-08-2025 09:00", "--for", "45m")
+    track("export", "--partition-by", "month", "--max-rows", "1", "-o", str(tmp_path / "out.csv"))
+
+    manifest = ExportManifest.model_validate_json((tmp_path / "out_manifest.json").read_text())
+    assert (manifest.format, manifest.partition_by, manifest.max_rows) == ("csv", "month", 1)
+    assert [(Path(p.path).name, p.partition, p.part, p.rows) for p in manifest.files] == [
+        ("out_2025-07_part001.csv", "2025-07", 1, 1),
+        ("out_2025-07_part002.csv", "2025-07", 2, 1),
+        ("out_2025-08_part001.csv", "2025-08", 1, 1),
+    ]
+    assert exported_activities(tmp_path / "out_2025-07_part002.csv") == ["meeting"]
+
+
+def test_partitions_by_activity_get_distinct_safe_names(tmp_path):
+    entries = [entry(NINE + timedelta(hours=i), 30, name) for i, name in enumerate(["a/b", "a b", "a/b"])]
+    parts = write_partitioned(
+        entries, write_csv, part_targets(tmp_path, "out", ".csv"), partition_by="activity"
+    )
+
+    assert [(Path(p.path).name, p.rows) for p in parts] == [("out_a_b.csv", 2), ("out_a_b_2.csv", 1)]
+    assert exported_activities(tmp_path / "out_a_b.csv") == ["a/b", "a/b"]
+
+
+def test_report_workbook_has_daily_weekly_and_activity_totals(track, tmp_path):
+    track("add", "review", "--start", "01-07-2025 09:00", "--for", "1h")
+    track("add", "meeting", "--start", "01-07-2025 11:00", "--for", "30m")
+    track("add", "review", "--start", "08-07-2025 09:00", "--for", "30m")
+    out = tmp_path / "report.xlsx"
+    track("export", "--report", "-o", str(out))
+
+    workbook = openpyxl.load_workbook(out)
+    assert workbook.sheetnames == ["Daily Totals", "Weekly Totals", "Activity by Day", "Activity Totals"]
+
+    def rows(name):
+        return list(workbook[name].iter_rows(values_only=True))
+
+    assert rows("Daily Totals")[1:] == [
+        (datetime(2025, 7, 1), 90, 1.5, 2),
+        (datetime(2025, 7, 8), 30, 0.5, 1),
+    ]
+    assert [row[0] for row in rows("Weekly Totals")[1:]] == [datetime(2025, 6, 30), datetime(2025, 7, 7)]
+    assert rows("Activity Totals")[1:] == [("review", 90, 1.5, 2, 75.0), ("meeting", 30, 0.5, 1, 25.0)]
@@ -0,0 +1,26 @@
+import subprocess
+import sys
+
+# Imported lazily, only by the commands that need them.
+HEAVY_MODULES = ["pandas", "dateutil", "openpyxl", "pyarrow"]
+
+SCRIPT = f"""
+import sys
+from timetrack.cli import main
+
+main(["status"], standalone_mode=False)
+print(",".join(m for m in {HEAVY_MODULES!r} if m in sys.modules))
+"""
+
+
+def test_status_does_not_import_heavy_modules(track_env):
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT],
+        env=track_env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    lines = result.stdout.splitlines()
+    assert "No task is currently running" in lines[0]
+    assert lines[-1] == ""
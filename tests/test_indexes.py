@@ -0,0 +1,75 @@
+from datetime import datetime
+
+from timetrack.indexes import IndexedLogStore, _signature
+from timetrack.models import TimeEntry
+from timetrack.rollups import Rollups
+from timetrack.search import SearchIndex
+from timetrack.storage import JsonLogStore
+
+ENTRY = TimeEntry(
+    start_time=datetime(2025, 7, 1, 9),
+    end_time=datetime(2025, 7, 1, 10),
+    activity="work",
+    duration_minutes=60,
+)
+
+
+class UnchangingStore(JsonLogStore):
+    """A store whose fingerprint never changes, like files whose mtime has not ticked over."""
+
+    def files(self):
+        return []
+
+
+def make_rollups(tmp_path):
+    store = UnchangingStore(
+        tmp_path / "timelog.json",
+        tmp_path / "timelog.journal.jsonl",
+        tmp_path / "timelog.index.json",
+    )
+    rollups = Rollups(tmp_path / "rollups.json", tmp_path / "rollups.journal.jsonl")
+    rollups.rebuild(store)
+    return rollups, _signature(store)
+
+
+def test_records_with_the_snapshot_fingerprint_are_replayed(tmp_path):
+    rollups, signature = make_rollups(tmp_path)
+    for _ in range(3):
+        rollups.update(signature, signature, added=[ENTRY])
+
+    assert rollups._load()["days"] == {"2025-07-01": {"work": [180, 3]}}
+
+
+def test_journal_left_by_an_interrupted_fold_is_not_replayed(tmp_path):
+    rollups, signature = make_rollups(tmp_path)
+    rollups.update(signature, signature, added=[ENTRY])
+    journal = rollups.journal_file.read_bytes()
+
+    # Crash between saving the snapshot and clearing the journal.
+    rollups._save(rollups._load())
+    rollups.journal_file.write_bytes(journal)
+    assert rollups._load()["days"] == {"2025-07-01": {"work": [60, 1]}}
+
+    rollups.update(signature, signature, added=[ENTRY])
+    assert rollups._load()["days"] == {"2025-07-01": {"work": [120, 2]}}
+
+
+def test_search_keeps_entries_that_share_a_start(tmp_path):
+    store = JsonLogStore(
+        tmp_path / "timelog.json",
+        tmp_path / "timelog.journal.jsonl",
+        tmp_path / "timelog.index.json",
+    )
+    index = SearchIndex(tmp_path / "search_index.json", tmp_path / "search_index.journal.jsonl")
+    index.rebuild(store)
+    indexed = IndexedLogStore(store, [index])
+    other = ENTRY.model_copy(update={"activity": "review", "duration_minutes": 30})
+    indexed.append_entry(ENTRY)
+    indexed.append_entry(other)
+
+    assert index.search(indexed, "work") == [ENTRY]
+    assert index.search(indexed, "review") == [other]
+
+    indexed.remove_entry(other)
+    assert index.search(indexed, "work") == [ENTRY]
+    assert index.search(indexed, "review") == []
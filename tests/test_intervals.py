@@ -0,0 +1,160 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from timetrack.indexes import IndexedLogStore
+from timetrack.intervals import IntervalIndex, find_overlaps
+from timetrack.models import TimeEntry
+from timetrack.storage import JsonLogStore
+
+BASE = datetime(2025, 7, 1)
+
+
+def entry(start: datetime, minutes: int, activity: str = "work") -> TimeEntry:
+    return TimeEntry(
+        start_time=start,
+        end_time=start + timedelta(minutes=minutes),
+        activity=activity,
+        duration_minutes=minutes,
+    )
+
+
+@pytest.fixture
+def indexed(tmp_path):
+    store = JsonLogStore(
+        tmp_path / "timelog.json",
+        tmp_path / "timelog.journal.jsonl",
+        tmp_path / "timelog.index.json",
+    )
+    index = IntervalIndex(tmp_path / "intervals.json", tmp_path / "intervals.journal.jsonl")
+    index.rebuild(store)
+    return IndexedLogStore(store, [index]), index
+
+
+def brute_force(entries, start, end):
+    return sorted(
+        (
+            (e.start_time.isoformat(), e.end_time.isoformat(), e.activity)
+            for e in entries
+            if e.start_time < end and e.end_time > start
+        ),
+        reverse=True,
+    )
+
+
+def test_touching_entries_do_not_overlap(indexed):
+    store, index = indexed
+    store.append_entry(entry(BASE + timedelta(hours=9), 60))
+
+    assert index.overlapping(store, BASE + timedelta(hours=10), BASE + timedelta(hours=11)) == []
+    assert index.overlapping(store, BASE + timedelta(hours=8), BASE + timedelta(hours=9)) == []
+    assert len(index.overlapping(store, BASE + timedelta(hours=8), BASE + timedelta(hours=10))) == 1
+
+
+def test_long_early_entry_is_found_after_many_short_ones(indexed):
+    store, index = indexed
+    store.append_entry(entry(BASE, 60 * 24 * 30, "long"))
+    for day in range(1, 30):
+        store.append_entry(entry(BASE + timedelta(days=day, hours=9), 30))
+
+    found = index.overlapping(store, BASE + timedelta(days=20, hours=12), BASE + timedelta(days=20, hours=13))
+    assert [activity for _, _, activity in found] == ["long"]
+
+
+def test_ignore_leaves_out_the_entry_being_edited(indexed):
+    store, index = indexed
+    editing = entry(BASE + timedelta(hours=9), 60)
+    store.append_entry(editing)
+
+    other = entry(editing.start_time, 30, "same start")
+    store.append_entry(other)
+
+    start, end = BASE + timedelta(hours=9, minutes=15), BASE + timedelta(hours=11)
+    found = index.overlapping(store, start, end, ignore=editing)
+    assert [activity for _, _, activity in found] == ["same start"]
+
+
+@pytest.mark.parametrize("block_rows", [4, IntervalIndex.BLOCK_ROWS])
+def test_matches_brute_force_through_adds_edits_and_removals(indexed, monkeypatch, block_rows):
+    monkeypatch.setattr(IntervalIndex, "BLOCK_ROWS", block_rows)
+    store, index = indexed
+    rng = random.Random(7)
+    live = []
+
+    def random_entry():
+        start = BASE + timedelta(minutes=15 * rng.randrange(4 * 24 * 20))
+        return entry(start, rng.choice([15, 60, 240, 60 * 24 * 3]), f"a{rng.randrange(3)}")
+
+    for step in range(300):
+        action = rng.random()
+        if action < 0.6 or not live:
+            new = random_entry()
+            store.append_entry(new)
+            live.append(new)
+        elif action < 0.8:
+            old = live.pop(rng.randrange(len(live)))
+            store.remove_entry(old)
+        else:
+            old, new = live.pop(rng.randrange(len(live))), random_entry()
+            store.replace_entry(old, new)
+            live.append(new)
+
+        if step % 10 == 0:
+            start = BASE + timedelta(minutes=15 * rng.randrange(4 * 24 * 20))
+            end = start + timedelta(minutes=rng.choice([15, 120, 60 * 24]))
+            assert index.overlapping(store, start, end) == brute_force(live, start, end)
+        if step % 50 == 0:
+            # Fold the journal into a snapshot of blocks.
+            index._save(index._load())
+
+
+def test_checks_skip_blocks_that_cannot_overlap(indexed, monkeypatch):
+    monkeypatch.setattr(IntervalIndex, "BLOCK_ROWS", 4)
+    store, index = indexed
+    store.append_entry(entry(BASE, 60 * 24 * 30, "long"))
+    for day in range(1, 30):
+        store.append_entry(entry(BASE + timedelta(days=day, hours=9), 30))
+    index._save(index._load())
+    start, end = BASE + timedelta(days=20, hours=9), BASE + timedelta(days=20, hours=10)
+
+    # Garble every block that starts after the check or ends before it.
+    raw = bytearray(index.path.read_bytes())
+    body = raw.index(b"\n") + 1
+    skipped = 0
+    for first_start, max_end, offset, length in index._read_header()["blocks"]:
+        if first_start >= end.isoformat() or max_end <= start.isoformat():
+            raw[body + offset:body + offset + length - 1] = b"x" * (length - 1)
+            skipped += 1
+    index.path.write_bytes(bytes(raw))
+
+    found = index.overlapping(store, start, end)
+    assert [activity for _, _, activity in found] == ["work", "long"]
+    assert skipped >= 5
+
+
+def test_find_overlaps_yields_every_pair():
+    a = entry(BASE + timedelta(hours=9), 120, "a")
+    b = entry(BASE + timedelta(hours=10), 30, "b")
+    c = entry(BASE + timedelta(hours=10, minutes=15), 60, "c")
+    d = entry(BASE + timedelta(hours=11, minutes=15), 30, "d")
+
+    pairs = [(x[0].activity, y[0].activity) for x, y in find_overlaps((e, None) for e in [a, b, c, d])]
+    assert pairs == [("a", "b"), ("a", "c"), ("b", "c")]
+
+
+@pytest.mark.parametrize(
+    "args, expected",
+    [
+        ([], "No overlapping entries in the log."),
+        (["--from", "01-07-2025"], "No overlapping entries from 2025-07-01 onwards."),
+        (["--to", "01-07-2025"], "No overlapping entries up to 2025-07-01."),
+        (
+            ["--from", "01-07-2025", "--to", "02-07-2025"],
+            "No overlapping entries from 2025-07-01 to 2025-07-02.",
+        ),
+    ],
+)
+def test_overlaps_describes_the_range(track, args, expected):
+    track("add", "work", "--start", "01-07-2025 09:00", "--for", "1h")
+    assert expected in track("overlaps", *args).stdout
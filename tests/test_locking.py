@@ -0,0 +1,105 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from timetrack import storage
+from timetrack.storage import FileLock, atomic_write
+
+# Tries to take the lock without waiting; prints whether it got it.
+TRY_LOCK = """
+import fcntl, os, sys
+fd = os.open(sys.argv[1], os.O_RDWR | os.O_CREAT)
+try:
+    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    print("free")
+except BlockingIOError:
+    print("held")
+"""
+
+pytest.importorskip("fcntl")
+
+
+def lock_state(path) -> str:
+    result = subprocess.run(
+        [sys.executable, "-c", TRY_LOCK, str(path)], capture_output=True, text=True, check=True
+    )
+    return result.stdout.strip()
+
+
+def test_atomic_write_replaces_the_contents(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text("old")
+    atomic_write(path, "new")
+
+    assert path.read_text() == "new"
+    assert os.listdir(tmp_path) == ["data.json"]
+
+
+def test_failed_atomic_write_leaves_the_old_file(tmp_path, monkeypatch):
+    path = tmp_path / "data.json"
+    path.write_text("old")
+
+    def fail(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(storage.os, "replace", fail)
+    with pytest.raises(OSError):
+        atomic_write(path, "new")
+
+    assert path.read_text() == "old"
+    assert os.listdir(tmp_path) == ["data.json"]
+
+
+def test_lock_is_reentrant_and_held_until_the_outermost_exit(tmp_path):
+    lock = FileLock(tmp_path / ".lock")
+    with lock:
+        with lock:
+            assert lock_state(lock.path) == "held"
+        assert lock_state(lock.path) == "held"
+    assert lock_state(lock.path) == "free"
+
+
+def test_threads_sharing_a_lock_take_turns(tmp_path):
+    lock = FileLock(tmp_path / ".lock")
+    inside = []
+    overlapped = []
+
+    def work():
+        for _ in range(20):
+            with lock:
+                inside.append(1)
+                if len(inside) > 1:
+                    overlapped.append(1)
+                time.sleep(0.001)
+                inside.pop()
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not overlapped
+
+
+def test_concurrent_adds_are_all_kept(track, track_env):
+    track("add", "first", "--start", "01-07-2025 08:00", "--for", "1m")
+    processes = [
+        subprocess.Popen(
+            [
+                sys.executable, "-m", "timetrack.cli", "add", f"task{i}",
+                "--start", f"01-07-2025 {9 + i}:00", "--for", "30m",
+            ],
+            env=track_env,
+            stdout=subprocess.DEVNULL,
+        )
+        for i in range(8)
+    ]
+    for process in processes:
+        assert process.wait(timeout=60) == 0
+
+    log = track("log", "01-07-2025").stdout
+    assert all(f"task{i}" in log for i in range(8))
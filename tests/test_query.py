@@ -0,0 +1,128 @@
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from timetrack.models import TimeEntry
+from timetrack.query import Query, QueryError
+
+
+def entry(start: str, minutes: int, activity: str, notes=()) -> TimeEntry:
+    start_time = datetime.fromisoformat(start)
+    return TimeEntry(
+        start_time=start_time,
+        end_time=start_time + timedelta(minutes=minutes),
+        activity=activity,
+        duration_minutes=minutes,
+        notes=list(notes),
+    )
+
+
+REVIEW = entry("2025-07-01T09:00", 90, "Code review", ["PR 12"])
+MEETING = entry("2025-07-02T14:00", 30, "Meeting")
+LATE = entry("2025-07-03T23:30", 45, "Code review")
+ENTRIES = [REVIEW, MEETING, LATE]
+
+
+def matching(text: str) -> list:
+    return [e for e in ENTRIES if Query(text).matches(e)]
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ('activity = "Code review"', [REVIEW, LATE]),
+        ("activity ~ REVIEW", [REVIEW, LATE]),
+        ("activity !~ review", [MEETING]),
+        ('notes = "PR 12"', [REVIEW]),
+        ("notes ~ pr", [REVIEW]),
+        ("duration > 30", [REVIEW, LATE]),
+        ("duration >= 1h30m", [REVIEW]),
+        ("duration = 45m", [LATE]),
+        ("day = 2025-07-02", [MEETING]),
+        ("day != 02-07-2025", [REVIEW, LATE]),
+        ("start >= 2025-07-02T14:00", [MEETING, LATE]),
+        ("end > 2025-07-04", [LATE]),
+        ("activity ~ review and not day = 2025-07-01", [LATE]),
+        ("day = 2025-07-01 or duration < 45", [REVIEW, MEETING]),
+        ("(activity = Meeting or duration = 45) and day >= 2025-07-02", [MEETING, LATE]),
+    ],
+)
+def test_matches(text, expected):
+    assert matching(text) == expected
+
+
+@pytest.mark.parametrize(
+    "text, start, end",
+    [
+        ("day = 2025-07-02", "2025-07-02", "2025-07-03"),
+        ("day >= 2025-07-02 and day <= 2025-07-05", "2025-07-02", "2025-07-06"),
+        ("day > 2025-07-02 and day < 2025-07-05", "2025-07-03", "2025-07-05"),
+        ("start >= 2025-07-02T14:00 and start < 2025-07-03", "2025-07-02T14:00", "2025-07-03"),
+        ("day >= 2025-07-01 and day >= 2025-07-03 and activity = x", "2025-07-03", None),
+    ],
+)
+def test_anded_day_and_start_terms_become_bounds(text, start, end):
+    query = Query(text)
+    assert query.start == datetime.fromisoformat(start)
+    assert query.end == (datetime.fromisoformat(end) if end else None)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "day = 2025-07-01 or day = 2025-07-03",
+        "not day >= 2025-07-02",
+        "day != 2025-07-02",
+        "(day >= 2025-07-02 or activity = x)",
+    ],
+)
+def test_other_day_terms_do_not_narrow_the_bounds(text):
+    query = Query(text)
+    assert (query.start, query.end) == (None, None)
+
+
+def test_bounds_intersect_with_another_range():
+    query = Query("day >= 2025-07-02 and day <= 2025-07-10")
+    start, end = query.bounds(datetime(2025, 7, 1), datetime(2025, 7, 5))
+    assert (start, end) == (datetime(2025, 7, 2), datetime(2025, 7, 5))
+
+
+def test_filter_checks_only_the_rest_of_the_expression():
+    query = Query("day >= 2025-07-02 and activity ~ review")
+    assert list(query.filter(ENTRIES)) == [REVIEW, LATE]
+    assert [e for e in ENTRIES if query.matches(e)] == [LATE]
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "",
+        "colour = red",
+        "activity",
+        "activity =",
+        "duration > soon",
+        "day = 31-31-2025",
+        "duration ~ 5",
+        "activity < b",
+        "activity ~ (",
+        "(activity = a",
+        "activity = a b",
+    ],
+)
+def test_invalid_expressions_raise(text):
+    with pytest.raises(QueryError):
+        Query(text)
+
+
+def test_times_with_an_offset_are_compared_in_local_time(monkeypatch):
+    monkeypatch.setenv("TZ", "UTC")
+    time.tzset()
+    try:
+        query = Query("start >= 2025-07-02T16:00+02:00")
+        assert query.start == datetime(2025, 7, 2, 14)
+        assert matching("start >= 2025-07-02T16:00+02:00") == [MEETING, LATE]
+        assert matching("end > 2025-07-04T00:00Z") == [LATE]
+    finally:
+        monkeypatch.undo()
+        time.tzset()
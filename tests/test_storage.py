@@ -0,0 +1,203 @@
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from timetrack import storage
+from timetrack.models import TimeEntry, TimeLog
+from timetrack.storage import BinaryLogStore, JsonLogStore, ShardedLogStore, SqliteLogStore
+
+
+def entry(start: datetime, minutes: int, activity: str, notes=()) -> TimeEntry:
+    return TimeEntry(
+        start_time=start,
+        end_time=start + timedelta(minutes=minutes),
+        activity=activity,
+        duration_minutes=minutes,
+        notes=list(notes),
+    )
+
+
+def json_store(tmp_path: Path) -> JsonLogStore:
+    return JsonLogStore(
+        tmp_path / "timelog.json",
+        tmp_path / "timelog.journal.jsonl",
+        tmp_path / "timelog.index.json",
+    )
+
+
+STORES = {
+    "json": json_store,
+    "sqlite": lambda tmp_path: SqliteLogStore(tmp_path / "timelog.db"),
+    "shards": lambda tmp_path: ShardedLogStore(tmp_path / "log"),
+    "binary": lambda tmp_path: BinaryLogStore(tmp_path / "timelog.bin"),
+}
+
+NINE = datetime(2025, 7, 1, 9)
+A = entry(NINE, 60, "a")
+B = entry(NINE, 30, "b", ["same start"])
+C = entry(NINE + timedelta(days=2), 45, "c")
+
+
+def activities(entries) -> list:
+    return sorted(e.activity for e in entries)
+
+
+@pytest.fixture(params=sorted(STORES))
+def store(request, tmp_path):
+    return STORES[request.param](tmp_path)
+
+
+def test_entries_sharing_a_start_are_kept(store):
+    store.append_entry(A)
+    store.append_entry(B)
+    store.append_entry(A)
+
+    assert activities(store.read_log().entries) == ["a", "a", "b"]
+    assert activities(store.iter_log()) == ["a", "a", "b"]
+
+
+def test_remove_and_replace_only_touch_the_matching_entry(store):
+    for e in (A, B, C):
+        store.append_entry(e)
+
+    store.remove_entry(B)
+    assert activities(store.read_log().entries) == ["a", "c"]
+
+    store.append_entry(B)
+    store.replace_entry(A, entry(NINE, 15, "a2"))
+    assert activities(store.read_log().entries) == ["a2", "b", "c"]
+
+
+def test_json_snapshot_with_shared_starts_survives_replay(tmp_path):
+    store = json_store(tmp_path)
+    store.write_log(TimeLog(entries=[A, B]))
+    store.append_entry(C)
+
+    assert activities(store.read_log().entries) == ["a", "b", "c"]
+    assert activities(json_store(tmp_path).iter_log()) == ["a", "b", "c"]
+
+
+def test_json_journal_left_by_interrupted_compaction_is_not_replayed(tmp_path):
+    store = json_store(tmp_path)
+    store.append_entry(A)
+    store.append_entry(A)
+    journal = store.journal_file.read_bytes()
+
+    # Crash between writing the snapshot and clearing the journal.
+    store.write_log(store.read_log())
+    store.journal_file.write_bytes(journal)
+
+    reopened = json_store(tmp_path)
+    assert activities(reopened.read_log().entries) == ["a", "a"]
+    assert reopened.compact() == 0
+
+    reopened.append_entry(B)
+    assert activities(reopened.read_log().entries) == ["a", "a", "b"]
+
+
+def test_json_replays_journals_written_before_full_originals(tmp_path):
+    store = json_store(tmp_path)
+    doc = A.model_dump(mode="json")
+    store.journal_file.write_text(
+        json.dumps({"op": "add", "entry": doc})
+        + "\n"
+        + json.dumps({"op": "edit", "key": doc["start_time"], "entry": dict(doc, activity="z")})
+        + "\n"
+    )
+
+    assert activities(store.read_log().entries) == ["z"]
+
+
+def test_json_edits_replay_across_indexed_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "ITER_CHUNK_BYTES", 1)
+    store = json_store(tmp_path)
+    days = [entry(NINE + timedelta(days=d), 30, f"day{d}") for d in range(5)]
+    store.write_log(TimeLog(entries=list(days)))
+
+    moved = entry(NINE + timedelta(days=3, hours=1), 30, "moved")
+    store.replace_entry(days[0], moved)
+    store.remove_entry(days[4])
+    store.append_entry(entry(NINE + timedelta(days=1), 30, "day1"))
+
+    reopened = json_store(tmp_path)
+    assert reopened._read_index() is not None
+    assert [e.activity for e in reopened.iter_log()] == [
+        "day1",
+        "day1",
+        "day2",
+        "day3",
+        "moved",
+    ]
+
+
+@pytest.mark.parametrize("then", ["append", "insert"])
+def test_binary_write_after_a_torn_append_keeps_records_aligned(tmp_path, then):
+    store = BinaryLogStore(tmp_path / "timelog.bin")
+    store.append_entry(A)
+    store.append_entry(C)
+    with store.bin_file.open("ab") as f:
+        f.write(b"\x01" * 10)  # Crash partway through writing a record.
+
+    later = entry(C.start_time + timedelta(days=1), 15, "d")
+    store.append_entry(later if then == "append" else B)
+
+    expected = ["a", "c", "d"] if then == "append" else ["a", "b", "c"]
+    assert activities(store.read_log().entries) == expected
+    assert store.bin_file.stat().st_size == 3 * store.RECORD.size
+
+
+@pytest.mark.parametrize(
+    "start, end",
+    [
+        (None, None),
+        (NINE + timedelta(days=1), None),
+        (None, NINE + timedelta(days=3)),
+        (NINE, NINE + timedelta(days=3)),
+        (NINE + timedelta(hours=1), NINE + timedelta(days=2, hours=9)),
+        (NINE + timedelta(days=9), NINE + timedelta(days=10)),
+    ],
+)
+def test_iter_log_yields_exactly_the_range(store, monkeypatch, start, end):
+    monkeypatch.setattr(storage, "ITER_CHUNK_BYTES", 1)
+    monkeypatch.setattr(storage, "ITER_CHUNK_RECORDS", 2)
+    days = [entry(NINE + timedelta(days=d, hours=h), 30, f"d{d}h{h}") for d in range(5) for h in (0, 3)]
+    store.write_log(TimeLog(entries=list(days)))
+    store.append_entry(entry(NINE + timedelta(days=2), 15, "journal"))
+
+    everything = store.read_log().entries
+    expected = [
+        e.activity
+        for e in everything
+        if (start is None or e.start_time >= start) and (end is None or e.start_time < end)
+    ]
+    assert [e.activity for e in store.iter_log(start, end)] == expected
+    if start is not None and end is not None:
+        assert [e.activity for e in store.entries_between(start, end)] == expected
+
+
+def exported_rows(track, tmp_path) -> str:
+    out = tmp_path / "rows.json"
+    track("export", "-o", str(out))
+    return out.read_text()
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "shards", "binary"])
+def test_migrate_round_trips_the_log(track, tmp_path, backend):
+    track("add", "review", "--start", "01-07-2025 09:00", "--for", "1h")
+    track("add", "meeting", "--start", "01-07-2025 09:00", "--for", "30m", "--allow-overlap")
+    track("add", "review", "--start", "15-08-2025 14:00", "--for", "45m")
+    track("start", "notes")
+    track("notes", "first note")
+    track("notes", "second, with \"quotes\"")
+    track("stop")
+    before = exported_rows(track, tmp_path)
+
+    assert f"to '{backend}'" in track("storage", "migrate", backend).stdout
+    assert exported_rows(track, tmp_path) == before
+    track("add", "after", "--start", "16-08-2025 09:00", "--for", "15m")
+    after = exported_rows(track, tmp_path)
+
+    track("storage", "migrate", "json")
+    assert exported_rows(track, tmp_path) == after
@@ -1,12 +1,48 @@
 # project/timetrack/cli.py
 """Command-line interface for the timetrack application."""
 
-from typing import Optional
+from pathlib import Path
+from typing import Optional, Tuple
 import click  # type: ignore
-from .core import TimeTracker
 
 
-@click.group()
+def _tracker(local: bool = False):
+    """
+    Returns a client for the trackd daemon if it is running, otherwise a
+    TimeTracker working on the data files directly.
+
+    The core module is only imported when it is needed, which keeps
+    `track --help`, argument errors and daemon-served commands fast.
+
+    Args:
+        local (bool): If True, always use a TimeTracker in this process.
+    """
+    if not local:
+        from .client import DaemonClient
+
+        client = DaemonClient.connect()
+        if client is not None:
+            return client
+
+    from .core import TimeTracker
+
+    return TimeTracker()
+
+
+class _TrackGroup(click.Group):
+    """Reports trackd failures as errors, the way commands report their own."""
+
+    def invoke(self, ctx: click.Context):
+        from .client import DaemonError
+
+        try:
+            return super().invoke(ctx)
+        except DaemonError as e:
+            click.echo(f"❗ Error: {e}", err=True)
+            ctx.exit(1)
+
+
+@click.group(cls=_TrackGroup)
 def main():
     """A simple CLI for time tracking."""
     pass
@@ -22,8 +58,17 @@ def main():
 )
 @click.option("--end", "end_str", help="End time (e.g., 'today 11am').")
 @click.option("--for", "duration_str", help="Duration (e.g., '1h', '30m').")
+@click.option(
+    "--allow-overlap",
+    is_flag=True,
+    help="Log it even if it overlaps time that is already logged.",
+)
 def add(
-    activity: str, start_str: str, end_str: Optional[str], duration_str: Optional[str]
+    activity: str,
+    start_str: str,
+    end_str: Optional[str],
+    duration_str: Optional[str],
+    allow_overlap: bool,
 ):
     """Add a completed time entry retrospectively."""
     if not (end_str or duration_str):
@@ -33,18 +78,25 @@ def add(
         click.echo("❗ Error: You cannot provide both --end and --for.", err=True)
         return
 
-    tracker = TimeTracker()
-    success, message = tracker.add_entry(activity, start_str, end_str, duration_str)
+    tracker = _tracker()
+    success, message = tracker.add_entry(
+        activity, start_str, end_str, duration_str, allow_overlap=allow_overlap
+    )
     click.echo(message)
 
 
 @main.command()
 @click.argument("duration_str")
 @click.argument("activity")
-def backdate(duration_str: str, activity: str):
+@click.option(
+    "--allow-overlap",
+    is_flag=True,
+    help="Log it even if it overlaps time that is already logged.",
+)
+def backdate(duration_str: str, activity: str, allow_overlap: bool):
     """Logs a task that just finished by backdating from the current time."""
-    tracker = TimeTracker()
-    success, message = tracker.backdate_entry(duration_str, activity)
+    tracker = _tracker()
+    success, message = tracker.backdate_entry(duration_str, activity, allow_overlap=allow_overlap)
     click.echo(message)
 
 
@@ -58,7 +110,7 @@ def backdate(duration_str: str, activity: str):
 )
 def start(activity: str, force: bool):
     """Start tracking a new task."""
-    tracker = TimeTracker()
+    tracker = _tracker()
     success, message = tracker.start(activity, force=force)
     click.echo(message)
 
@@ -66,7 +118,7 @@ def start(activity: str, force: bool):
 @main.command()
 def stop():
     """Stop the current task."""
-    tracker = TimeTracker()
+    tracker = _tracker()
     success, message = tracker.stop()
     click.echo(message)
 
@@ -74,7 +126,7 @@ def stop():
 @main.command()
 def pause():
     """Pause the current task."""
-    tracker = TimeTracker()
+    tracker = _tracker()
     success, message = tracker.pause()
     click.echo(message)
 
@@ -82,7 +134,7 @@ def pause():
 @main.command()
 def resume():
     """Resume the current task."""
-    tracker = TimeTracker()
+    tracker = _tracker()
     success, message = tracker.resume()
     click.echo(message)
 
@@ -90,7 +142,7 @@ def resume():
 @main.command()
 def status():
     """Show the current task status."""
-    tracker = TimeTracker()
+    tracker = _tracker()
     message = tracker.status()
     click.echo(message)
 
@@ -99,17 +151,103 @@ def status():
 @click.argument("note_text")
 def notes(note_text: str):
     """Add a note to the active task."""
-    tracker = TimeTracker()
+    tracker = _tracker()
     success, message = tracker.add_note(note_text)
     click.echo(message)
 
 
+WHERE_HELP = (
+    "Only include entries matching an expression, e.g. "
+    "'activity ~ \"review\" and duration > 30 and day >= 2025-07-01'."
+)
+
+
 @main.command()
-@click.argument("when", default="today")
-def log(when: str):
+@click.argument("when", required=False)
+@click.option("--from", "from_str", help="Show every day from this one ('today', 'yesterday', or 'DD-MM-YYYY').")
+@click.option("--to", "to_str", help="Show every day up to this one ('today', 'yesterday', or 'DD-MM-YYYY').")
+@click.option("--where", help=WHERE_HELP + " Without WHEN, searches every day.")
+def log(
+    when: Optional[str],
+    from_str: Optional[str],
+    to_str: Optional[str],
+    where: Optional[str],
+):
     """Show all tasks logged for a specific day (e.g., 'today', 'yesterday', or 'DD-MM-YYYY')."""
-    tracker = TimeTracker()
-    message = tracker.get_log(when)
+    if when and (from_str or to_str):
+        click.echo("❗ Error: Give either a day or --from/--to, not both.", err=True)
+        return
+    tracker = _tracker()
+    if from_str or to_str:
+        message = tracker.get_log(None, where=where, from_str=from_str, to_str=to_str)
+    elif where:
+        message = tracker.get_log(when, where=where)
+    else:
+        message = tracker.get_log(when or "today")
+    click.echo(message)
+
+
+@main.command()
+@click.argument("terms", nargs=-1, required=True)
+@click.option(
+    "--limit",
+    type=click.IntRange(min=1),
+    default=20,
+    show_default=True,
+    help="Show at most this many entries.",
+)
+def search(terms: Tuple[str, ...], limit: int):
+    """Find entries whose activity or notes contain all the given words."""
+    tracker = _tracker()
+    message = tracker.search(" ".join(terms), limit=limit)
+    click.echo(message)
+
+
+@main.command()
+@click.option("--from", "from_str", help="First day to check ('today', 'yesterday', or 'DD-MM-YYYY').")
+@click.option("--to", "to_str", help="Last day to check ('today', 'yesterday', or 'DD-MM-YYYY').")
+def overlaps(from_str: Optional[str], to_str: Optional[str]):
+    """List entries whose times overlap, which would count the same time twice."""
+    tracker = _tracker()
+    message = tracker.get_overlaps(from_str=from_str, to_str=to_str)
+    click.echo(message)
+
+
+EXPORT_FORMATS = ("csv", "xlsx", "json", "parquet", "arrow")
+
+
+def _validate_formats(ctx, param, value: Optional[str]) -> Optional[str]:
+    """Checks a comma-separated list of export formats."""
+    if value is None:
+        return None
+    formats = [f.strip() for f in value.split(",")]
+    for fmt in formats:
+        if fmt not in EXPORT_FORMATS:
+            raise click.BadParameter(
+                f"'{fmt}' is not one of {', '.join(EXPORT_FORMATS)}."
+            )
+    return ",".join(formats)
+
+
+@main.command()
+@click.option("--week", "period", flag_value="week", help="This calendar week (the default).")
+@click.option("--month", "period", flag_value="month", help="This calendar month.")
+@click.option("--from", "from_str", help="First day ('today', 'yesterday', or 'DD-MM-YYYY').")
+@click.option("--to", "to_str", help="Last day ('today', 'yesterday', or 'DD-MM-YYYY').")
+@click.option("--activity", help="Only include this activity (or @alias).")
+@click.option("--where", help=WHERE_HELP)
+def report(
+    period: Optional[str],
+    from_str: Optional[str],
+    to_str: Optional[str],
+    activity: Optional[str],
+    where: Optional[str],
+):
+    """Show time per activity and per day for a week, a month or a range of days."""
+    tracker = _tracker()
+    message = tracker.get_report(
+        period=period, from_str=from_str, to_str=to_str, activity=activity, where=where
+    )
     click.echo(message)
 
 
@@ -117,15 +255,86 @@ def log(when: str):
 @click.option(
     "--format",
     "file_format",
-    default="xlsx",
-    type=click.Choice(["csv", "xlsx"]),
-    help="The file format to export to.",
+    callback=_validate_formats,
+    help="The file format to export to: csv, xlsx, json, parquet or arrow "
+    "(default: the --output extension, or xlsx). "
+    "Separate several with commas (e.g. csv,xlsx,json) to write them all in one pass.",
 )
-def export(file_format: str):
-    """Export all time data to a file."""
-    tracker = TimeTracker()
-    success, message = tracker.export_log(file_format)
-    click.echo(message)
+@click.option(
+    "--since-last",
+    is_flag=True,
+    help="Only export entries added or changed since the last --since-last export.",
+)
+@click.option("--from", "from_str", help="First day to export ('today', 'yesterday', or 'DD-MM-YYYY').")
+@click.option("--to", "to_str", help="Last day to export ('today', 'yesterday', or 'DD-MM-YYYY').")
+@click.option("--activity", help="Only export this activity (or @alias).")
+@click.option("--where", help=WHERE_HELP)
+@click.option(
+    "--output",
+    "-o",
+    help="Write to this file instead of exports/, or '-' for stdout. "
+    "A .gz or .zst extension compresses the output.",
+)
+@click.option(
+    "--partition-by",
+    type=click.Choice(["month", "activity"]),
+    help="Write a separate file per month or per activity, plus a manifest.",
+)
+@click.option(
+    "--max-rows",
+    type=click.IntRange(min=1),
+    help="Start a new file after this many entries.",
+)
+@click.option(
+    "--report",
+    is_flag=True,
+    help="Export a summary workbook (daily, weekly and per-activity totals) instead of raw entries.",
+)
+def export(
+    file_format: Optional[str],
+    since_last: bool,
+    from_str: Optional[str],
+    to_str: Optional[str],
+    activity: Optional[str],
+    output: Optional[str],
+    partition_by: Optional[str],
+    max_rows: Optional[int],
+    report: bool,
+    where: Optional[str],
+):
+    """Export time data to a file (everything, or a range of days)."""
+    if report and (file_format or since_last or partition_by or max_rows):
+        click.echo(
+            "❗ Error: --report cannot be combined with --format, --since-last, "
+            "--partition-by or --max-rows."
+        )
+        return
+    if output == "-":
+        # Only this process can write to our stdout, so don't go through trackd.
+        tracker = _tracker(local=True)
+    else:
+        if output:
+            # trackd may run in another directory, so hand it an absolute path.
+            output = str(Path(output).expanduser().resolve())
+        tracker = _tracker()
+    if report:
+        success, message = tracker.export_report(
+            from_str=from_str, to_str=to_str, activity=activity, output=output, where=where
+        )
+    else:
+        success, message = tracker.export_log(
+            file_format,
+            since_last=since_last,
+            from_str=from_str,
+            to_str=to_str,
+            activity=activity,
+            output=output,
+            partition_by=partition_by,
+            max_rows=max_rows,
+            where=where,
+        )
+    # Keep stdout clean for the exported data.
+    click.echo(message, err=output == "-")
 
 
 @main.command()
@@ -137,7 +346,7 @@ def export(file_format: str):
 )
 def remove(entry_id: int, when: str):
     """Remove a specific log entry by its ID (for a given day)."""
-    tracker = TimeTracker()
+    tracker = _tracker()
     success, message = tracker.remove_entry(entry_id, when)
     click.echo(message)
 
@@ -149,9 +358,14 @@ def remove(entry_id: int, when: str):
     default="today",
     help="Date context: 'today', 'yesterday', or 'DD-MM-YYYY'.",
 )
-def edit(entry_id: int, when: str):
+@click.option(
+    "--allow-overlap",
+    is_flag=True,
+    help="Save it even if it overlaps time that is already logged.",
+)
+def edit(entry_id: int, when: str, allow_overlap: bool):
     """Interactively edit a time entry (for a given day)."""
-    tracker = TimeTracker()
+    tracker = _tracker()
     entry, error_msg = tracker.get_entry_by_id(entry_id, when)
 
     if not entry:
@@ -169,6 +383,7 @@ def edit(entry_id: int, when: str):
         new_activity=new_activity,
         new_start_str=new_start_str,
         new_end_str=new_end_str,
+        allow_overlap=allow_overlap,
     )
     click.echo(message)
 
@@ -176,7 +391,7 @@ def edit(entry_id: int, when: str):
 @main.command()
 def prev():
     """Start a new task based on the previous one."""
-    tracker = TimeTracker()
+    tracker = _tracker()
     success, message = tracker.start_previous()
     click.echo(message)
 
@@ -191,7 +406,7 @@ def prev():
 )
 def memo(text: Optional[str], remove_id: Optional[int]):
     """Manage global memos. Add with TEXT, list without args, remove with --remove ID."""
-    tracker = TimeTracker()
+    tracker = _tracker()
 
     if remove_id is not None:
         success, message = tracker.remove_memo(remove_id)
@@ -207,7 +422,7 @@ def memo(text: Optional[str], remove_id: Optional[int]):
 @main.command()
 def update():
     """Update the application by pulling latest changes from git."""
-    tracker = TimeTracker()
+    tracker = _tracker(local=True)
     success, message = tracker.update()
     click.echo(message)
     if not success:
@@ -225,7 +440,7 @@ def alias():
 @click.argument("activity")
 def add_alias(alias_name: str, activity: str):
     """Add or update an alias for an activity."""
-    tracker = TimeTracker()
+    tracker = _tracker()
     success, message = tracker.add_alias(alias_name, activity)
     click.echo(message)
 
@@ -234,7 +449,7 @@ def add_alias(alias_name: str, activity: str):
 @click.argument("alias_name")
 def remove_alias(alias_name: str):
     """Remove an alias."""
-    tracker = TimeTracker()
+    tracker = _tracker()
     success, message = tracker.remove_alias(alias_name)
     click.echo(message)
 
@@ -242,10 +457,41 @@ def remove_alias(alias_name: str):
 @alias.command("list")
 def list_aliases():
     """List all configured aliases."""
-    tracker = TimeTracker()
+    tracker = _tracker()
     message = tracker.list_aliases()
     click.echo(message)
 
 
+@main.group()
+def storage():
+    """Manage how the time log is stored."""
+    pass
+
+
+@storage.command("compact")
+def compact():
+    """Fold the journal of recent changes back into timelog.json."""
+    tracker = _tracker()
+    success, message = tracker.compact_log()
+    click.echo(message)
+
+
+@storage.command("reindex")
+def reindex():
+    """Rebuild the search index, daily rollups and interval index from the log."""
+    tracker = _tracker()
+    success, message = tracker.rebuild_indexes()
+    click.echo(message)
+
+
+@storage.command("migrate")
+@click.argument("backend", type=click.Choice(["json", "sqlite", "shards", "binary"]))
+def migrate(backend: str):
+    """Move the time log to another storage backend."""
+    tracker = _tracker()
+    success, message = tracker.migrate_storage(backend)
+    click.echo(message)
+
+
 if __name__ == "__main__":
     main()
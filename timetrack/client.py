@@ -0,0 +1,77 @@
+# project/timetrack/client.py
+"""Thin client for talking to a running trackd daemon over its Unix socket."""
+
+import json
+import socket
+from pathlib import Path
+from typing import Any, Optional
+
+# Mirrors core.DATA_DIR; defined here so the client never imports core.
+SOCKET_FILE = Path.home() / ".timetrack" / "trackd.sock"
+
+
+def decode_result(value: Any) -> Any:
+    """Rebuilds the models that trackd encoded in a result."""
+    if isinstance(value, list):
+        return tuple(decode_result(v) for v in value)
+    if isinstance(value, dict) and "__model__" in value:
+        from . import models
+
+        return getattr(models, value["__model__"]).model_validate(value["data"])
+    return value
+
+
+class DaemonError(Exception):
+    """Raised when trackd answers a call with an error, or drops the connection."""
+
+
+class DaemonClient:
+    """
+    Forwards TimeTracker method calls to trackd.
+
+    Any attribute is treated as a remote method, so an instance can be used in
+    place of a TimeTracker. Each call opens its own connection, so a command
+    waiting on user input never holds up other clients.
+
+    Args:
+        socket_file (Path): The daemon's Unix socket.
+    """
+
+    def __init__(self, socket_file: Path = SOCKET_FILE):
+        self.socket_file = socket_file
+
+    @classmethod
+    def connect(cls, socket_file: Path = SOCKET_FILE) -> Optional["DaemonClient"]:
+        """Returns a client if trackd is accepting connections, otherwise None."""
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.connect(str(socket_file))
+        except OSError:
+            return None
+        return cls(socket_file)
+
+    def call(self, method: str, *args, **kwargs) -> Any:
+        """
+        Calls a TimeTracker method inside trackd and returns its result.
+
+        Raises:
+            DaemonError: If trackd reports an error or drops the connection.
+        """
+        request = json.dumps({"method": method, "args": args, "kwargs": kwargs})
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.connect(str(self.socket_file))
+                sock.sendall(request.encode() + b"\n")
+                with sock.makefile("rb") as f:
+                    response = json.loads(f.readline())
+        except (OSError, ValueError):
+            raise DaemonError("trackd closed the connection without answering.") from None
+
+        if "error" in response:
+            raise DaemonError(f"trackd: {response['error']}")
+        return decode_result(response["result"])
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return lambda *args, **kwargs: self.call(name, *args, **kwargs)
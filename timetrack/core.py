@@ -1,17 +1,52 @@
 # project/timetrack/core.py
 """Core logic for the timetrack application."""
 
+import functools
+import itertools
 import json
 import re
 import subprocess
 import shutil
-from datetime import datetime, timedelta, date
+from contextlib import nullcontext
+from datetime import datetime, timedelta, date, time
 from pathlib import Path
-from typing import List, Optional, Tuple
-
-import pandas as pd  # type: ignore
-from .models import ApplicationState, TimeEntry, TimeLog, Config, Memo, MemoList
-from dateutil.parser import parse  # type: ignore
+from typing import Iterator, List, Optional, Tuple
+
+from .export import (
+    STDOUT,
+    WRITERS,
+    changed_entries,
+    format_from_path,
+    open_output,
+    part_targets,
+    split_output_path,
+    write_many,
+    write_partitioned,
+)
+from .models import (
+    ApplicationState,
+    TimeEntry,
+    TimeLog,
+    Config,
+    Memo,
+    MemoList,
+    ExportManifest,
+    ExportWatermark,
+)
+from .indexes import IndexedLogStore
+from .intervals import IntervalIndex, find_overlaps
+from .query import Query, QueryError
+from .rollups import DayTotals, Rollups, tally
+from .search import SearchIndex
+from .storage import (
+    BinaryLogStore,
+    FileLock,
+    JsonLogStore,
+    LogStore,
+    ShardedLogStore,
+    SqliteLogStore,
+    atomic_write,
+)
 
 # =================================
 # CONSTANTS
@@ -19,8 +54,37 @@ from dateutil.parser import parse  # type: ignore
 DATA_DIR = Path.home() / ".timetrack"
 STATE_FILE = DATA_DIR / "state.json"
 LOG_FILE = DATA_DIR / "timelog.json"
+JOURNAL_FILE = DATA_DIR / "timelog.journal.jsonl"
+LOG_INDEX_FILE = DATA_DIR / "timelog.index.json"
+DB_FILE = DATA_DIR / "timelog.db"
+LOG_DIR = DATA_DIR / "log"
+BIN_FILE = DATA_DIR / "timelog.bin"
 CONFIG_FILE = DATA_DIR / "config.json"
 MEMOS_FILE = DATA_DIR / "memos.json"
+LOCK_FILE = DATA_DIR / ".lock"
+EXPORT_WATERMARK_FILE = DATA_DIR / "export_watermark.json"
+SEARCH_INDEX_FILE = DATA_DIR / "search_index.json"
+SEARCH_JOURNAL_FILE = DATA_DIR / "search_index.journal.jsonl"
+ROLLUPS_FILE = DATA_DIR / "rollups.json"
+ROLLUPS_JOURNAL_FILE = DATA_DIR / "rollups.journal.jsonl"
+INTERVALS_FILE = DATA_DIR / "intervals.json"
+INTERVALS_JOURNAL_FILE = DATA_DIR / "intervals.journal.jsonl"
+
+STORAGE_BACKENDS = ("json", "sqlite", "shards", "binary")
+
+
+def _exclusive(method):
+    """
+    Runs a TimeTracker method while holding the data directory lock, so that
+    concurrent `track` processes cannot interleave their read-modify-writes.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+
+    return wrapper
 
 
 class TimeTracker:
@@ -31,6 +95,23 @@ class TimeTracker:
     def __init__(self):
         """Initializes the TimeTracker and ensures data directory exists."""
         DATA_DIR.mkdir(parents=True, exist_ok=True)
+        self._lock = FileLock(LOCK_FILE)
+        self._search_index = SearchIndex(SEARCH_INDEX_FILE, SEARCH_JOURNAL_FILE, self._lock)
+        self._rollups = Rollups(ROLLUPS_FILE, ROLLUPS_JOURNAL_FILE, self._lock)
+        self._intervals = IntervalIndex(INTERVALS_FILE, INTERVALS_JOURNAL_FILE, self._lock)
+        self._store = self._open_store(self._read_config().storage)
+
+    def _open_store(self, backend: str) -> LogStore:
+        """Creates the log store for the given backend name, keeping the derived indexes up to date."""
+        if backend == "sqlite":
+            store: LogStore = SqliteLogStore(DB_FILE)
+        elif backend == "shards":
+            store = ShardedLogStore(LOG_DIR)
+        elif backend == "binary":
+            store = BinaryLogStore(BIN_FILE)
+        else:
+            store = JsonLogStore(LOG_FILE, JOURNAL_FILE, LOG_INDEX_FILE)
+        return IndexedLogStore(store, [self._search_index, self._rollups, self._intervals])
 
     def _read_state(self) -> Optional[ApplicationState]:
         """Reads and validates the current application state."""
@@ -44,60 +125,177 @@ class TimeTracker:
 
     def _write_state(self, state: ApplicationState):
         """Writes the application state to the state file."""
-        STATE_FILE.write_text(state.model_dump_json(indent=4))
+        atomic_write(STATE_FILE, state.model_dump_json(indent=4))
 
     def _read_log(self) -> TimeLog:
         """Reads and validates the time log."""
-        if not LOG_FILE.exists():
-            return TimeLog()
-        try:
-            log_data = json.loads(LOG_FILE.read_text())
-            validated_entries = []
-            for entry_data in log_data.get("entries", []):
-                if (
-                    "start_time" in entry_data
-                    and isinstance(entry_data["start_time"], str)
-                    and "date" in entry_data
-                ):
-                    # Old format, try to convert
-                    try:
-                        start_dt_str = (
-                            f"{entry_data['date']} {entry_data['start_time']}"
-                        )
-                        end_dt_str = f"{entry_data['date']} {entry_data['end_time']}"
-                        entry_data["start_time"] = datetime.fromisoformat(start_dt_str)
-                        entry_data["end_time"] = datetime.fromisoformat(end_dt_str)
-                    except (ValueError, KeyError):
-                        continue  # Skip malformed old entries
-                validated_entries.append(TimeEntry.model_validate(entry_data))
-            return TimeLog(entries=validated_entries)
-        except (json.JSONDecodeError, ValueError):
-            return TimeLog()
+        return self._store.read_log()
 
     def _write_log(self, log: TimeLog):
         """Writes the time log to the log file."""
-        log.entries.sort(key=lambda x: x.start_time)
-        LOG_FILE.write_text(log.model_dump_json(indent=4))
+        self._store.write_log(log)
 
     def _parse_day_filter(self, day_filter: str) -> Optional[date]:
         """
         Parses a day filter string into a date object.
 
         Args:
-            day_filter: 'today', 'yesterday', or 'DD-MM-YYYY'.
+            day_filter: 'today', 'yesterday', 'DD-MM-YYYY' or 'YYYY-MM-DD'.
 
         Returns:
             A date object or None if parsing fails.
         """
+        if day_filter == "today":
+            return date.today()
+        elif day_filter == "yesterday":
+            return date.today() - timedelta(days=1)
+        for fmt in ("%d-%m-%Y", "%Y-%m-%d"):
+            try:
+                return datetime.strptime(day_filter, fmt).date()
+            except ValueError:
+                pass
+        return None
+
+    def _parse_range(
+        self, from_str: Optional[str], to_str: Optional[str]
+    ) -> Optional[Tuple[Optional[datetime], Optional[datetime]]]:
+        """
+        Parses an inclusive range of days into start and end datetimes.
+
+        Args:
+            from_str: The first day ('today', 'yesterday', or 'DD-MM-YYYY'), or
+                None for no lower bound.
+            to_str: The last day, or None for no upper bound.
+
+        Returns:
+            A (start, end) tuple covering start <= time < end, with None for a
+            missing bound, or None if either day fails to parse.
+        """
+        start = end = None
+        if from_str:
+            from_date = self._parse_day_filter(from_str)
+            if from_date is None:
+                return None
+            start = datetime.combine(from_date, time.min)
+        if to_str:
+            to_date = self._parse_day_filter(to_str)
+            if to_date is None:
+                return None
+            end = datetime.combine(to_date + timedelta(days=1), time.min)
+        return start, end
+
+    @staticmethod
+    def _describe_range(start: Optional[datetime], end: Optional[datetime]) -> str:
+        """
+        Describes a range of start times by its days, for use in messages.
+
+        Returns:
+            e.g. 'from 2025-07-01 to 2025-07-31', 'from 2025-07-01 onwards',
+            'up to 2025-07-31', or 'in the log' if both bounds are None.
+        """
+        first_day = start.date() if start is not None else None
+        last_day = (end - timedelta(microseconds=1)).date() if end is not None else None
+        if first_day and last_day:
+            return f"from {first_day} to {last_day}"
+        if first_day:
+            return f"from {first_day} onwards"
+        if last_day:
+            return f"up to {last_day}"
+        return "in the log"
+
+    @staticmethod
+    def _local_time(moment: datetime) -> datetime:
+        """
+        Converts a parsed time with a UTC offset to naive local time, as the log
+        stores it. Naive times are returned unchanged.
+        """
+        if moment.tzinfo is None:
+            return moment
+        return moment.astimezone().replace(tzinfo=None)
+
+    def _resolve_activity(self, activity: Optional[str]) -> Tuple[Optional[str], str]:
+        """
+        Resolves an @alias to its activity.
+
+        Returns:
+            A tuple of (activity, error message).
+        """
+        if activity and activity.startswith("@"):
+            config = self._read_config()
+            if activity not in config.aliases:
+                return None, f"❗ Error: Alias '{activity}' not found."
+            activity = config.aliases[activity]
+        return activity, ""
+
+    def _compile_query(self, where: str) -> Tuple[Optional[Query], str]:
+        """
+        Compiles a --where expression.
+
+        Returns:
+            A tuple of (query, error message). query is None on error.
+        """
         try:
-            if day_filter == "today":
-                return date.today()
-            elif day_filter == "yesterday":
-                return date.today() - timedelta(days=1)
-            else:
-                return datetime.strptime(day_filter, "%d-%m-%Y").date()
-        except ValueError:
-            return None
+            return Query(where), ""
+        except QueryError as e:
+            return None, f"❗ Error: Invalid --where expression: {e}"
+
+    def _select_entries(
+        self,
+        from_str: Optional[str],
+        to_str: Optional[str],
+        activity: Optional[str],
+        where: Optional[str] = None,
+    ) -> Tuple[Optional[Iterator[TimeEntry]], str]:
+        """
+        Streams the entries in a range of days, optionally for one activity or
+        matching a --where expression. Only the part of the log in range,
+        including any range the expression sets on day or start, is read from
+        the store.
+
+        Args:
+            from_str: The first day ('today', 'yesterday', or 'DD-MM-YYYY'), or None.
+            to_str: The last day, or None.
+            activity: An activity name or alias, or None for all activities.
+            where: A --where expression, or None.
+
+        Returns:
+            A tuple of (entries, error message). entries is None on error.
+        """
+        bounds = self._parse_range(from_str, to_str)
+        if bounds is None:
+            return None, "❗ Error: Invalid date format. Please use DD-MM-YYYY."
+        activity, error_msg = self._resolve_activity(activity)
+        if error_msg:
+            return None, error_msg
+        query = None
+        if where:
+            query, error_msg = self._compile_query(where)
+            if query is None:
+                return None, error_msg
+            bounds = query.bounds(*bounds)
+
+        entries = self._store.iter_log(*bounds)
+        if activity:
+            entries = (e for e in entries if e.activity == activity)
+        if query is not None:
+            entries = query.filter(entries)
+        return entries, ""
+
+    def iter_entries(
+        self, start: Optional[datetime] = None, end: Optional[datetime] = None
+    ) -> Iterator[TimeEntry]:
+        """
+        Yields the entries with start <= start_time < end, in start time order.
+
+        The range is located in the sorted log (by bisection, or through the
+        backend's own index) and entries are produced lazily, so only the part
+        of the log in range is read.
+
+        Args:
+            start (Optional[datetime]): The earliest start time, or None for no lower bound.
+            end (Optional[datetime]): The start time to stop before, or None for no upper bound.
+        """
+        yield from self._store.iter_log(start, end)
 
     def _get_entries_for_day(self, day_filter: str) -> Tuple[List[TimeEntry], Optional[date]]:
         """
@@ -114,20 +312,14 @@ class TimeTracker:
         if target_date is None:
             return [], None
 
-        log = self._read_log()
-        target_date_str = target_date.strftime("%Y-%m-%d")
-
-        entries_for_day = sorted(
-            [
-                e
-                for e in log.entries
-                if e.start_time.strftime("%Y-%m-%d") == target_date_str
-            ],
-            key=lambda x: x.start_time,
+        day_start = datetime.combine(target_date, time.min)
+        entries_for_day = self._store.entries_between(
+            day_start, day_start + timedelta(days=1)
         )
 
         return entries_for_day, target_date
 
+    @_exclusive
     def start(self, activity: str, force: bool = False) -> Tuple[bool, str]:
         """
         Starts a new task.
@@ -173,6 +365,7 @@ class TimeTracker:
 
         return True, "\n".join(messages)
 
+    @_exclusive
     def stop(self) -> Tuple[bool, str]:
         """
         Stops the current task and logs the time.
@@ -217,9 +410,7 @@ class TimeTracker:
             notes=state.notes,
         )
 
-        log = self._read_log()
-        log.entries.append(log_entry)
-        self._write_log(log)
+        self._store.append_entry(log_entry)
 
         STATE_FILE.unlink()
         return (
@@ -227,6 +418,7 @@ class TimeTracker:
             f"✅ Stopped tracking '{log_entry.activity}'. Logged {duration_minutes} minutes.",
         )
 
+    @_exclusive
     def pause(self) -> Tuple[bool, str]:
         """
         Pauses the current running task.
@@ -257,6 +449,7 @@ class TimeTracker:
             f"⏸️ Paused '{state.activity}'. ({active_minutes} minutes logged so far).",
         )
 
+    @_exclusive
     def resume(self) -> Tuple[bool, str]:
         """
         Resumes the current paused task.
@@ -300,8 +493,16 @@ class TimeTracker:
             A string describing the current status.
         """
         state = self._read_state()
+        logged_today = sum(
+            minutes
+            for totals in self._rollups.between(self._store, date.today(), date.today()).values()
+            for minutes, _ in totals.values()
+        )
         if not state:
-            return "⚪ No task is currently running."
+            message = "⚪ No task is currently running."
+            if logged_today:
+                message += f"\n   Logged today: {self._format_duration(timedelta(minutes=logged_today))}"
+            return message
 
         output = []
         if state.status == "paused":
@@ -326,6 +527,8 @@ class TimeTracker:
             output.append(
                 f"🟢 Active Task: '{state.activity}' (started at {start_time_str}, {elapsed_minutes} minutes so far)"
             )
+        today_so_far = timedelta(minutes=logged_today + max(elapsed_minutes, 0))
+        output.append(f"   Today so far: {self._format_duration(today_so_far)} including this task")
 
         if state.notes:
             output.append("   Notes:")
@@ -334,44 +537,19 @@ class TimeTracker:
 
         return "\n".join(output)
 
-    def get_log(self, day_filter: str) -> str:
+    def _format_day(self, target_date: date, entries: List[Tuple[int, TimeEntry]]) -> List[str]:
         """
-        Gets a formatted log for a specific day.
+        Formats one day of the log as a table.
 
         Args:
-            day_filter (str): 'today', 'yesterday', or a 'DD-MM-YYYY' date.
+            target_date: The day.
+            entries: The entries to show, each with its ID for that day.
 
         Returns:
-            A formatted string of the log entries.
+            The lines of the table, ending with the day's total.
         """
-        log = self._read_log()
-        if not log.entries:
-            return "No entries found in the log."
-
-        try:
-            if day_filter == "today":
-                target_date = date.today()
-            elif day_filter == "yesterday":
-                target_date = date.today() - timedelta(days=1)
-            else:
-                target_date = datetime.strptime(day_filter, "%d-%m-%Y").date()
-        except ValueError:
-            return "❗ Error: Invalid date format. Please use DD-MM-YYYY."
-
         target_date_str = target_date.strftime("%Y-%m-%d")
 
-        entries_for_day = sorted(
-            [
-                e
-                for e in log.entries
-                if e.start_time.strftime("%Y-%m-%d") == target_date_str
-            ],
-            key=lambda x: x.start_time,
-        )
-
-        if not entries_for_day:
-            return f"No log entries for {target_date.strftime('%Y-%m-%d')}."
-
         output = [f"--- Time Log for {target_date_str} ---"]
         output.append(
             "{:<5} {:<10} {:<10} {:<45} {:>10}".format(
@@ -381,7 +559,7 @@ class TimeTracker:
         output.append("-" * 82)
 
         total_minutes = 0
-        for i, entry in enumerate(entries_for_day):
+        for i, entry in entries:
             duration_str = f"{entry.duration_minutes} min"
             output.append(
                 f"{i:<5} {entry.start_time.strftime('%H:%M:%S'):<10} {entry.end_time.strftime('%H:%M:%S'):<10} {entry.activity:<45} {duration_str:>10}"
@@ -401,52 +579,580 @@ class TimeTracker:
 
         output.append(f"Total time for {target_date_str}: {total_str}")
 
+        return output
+
+    def get_log(
+        self,
+        day_filter: Optional[str] = "today",
+        where: Optional[str] = None,
+        from_str: Optional[str] = None,
+        to_str: Optional[str] = None,
+    ) -> str:
+        """
+        Gets a formatted log for a specific day, for a range of days, or for
+        every day with entries matching a --where expression.
+
+        Args:
+            day_filter (Optional[str]): 'today', 'yesterday', or a 'DD-MM-YYYY'
+                date. With where, None searches the whole log (or the range the
+                expression sets). Ignored when from_str or to_str is given.
+            where (Optional[str]): Only show entries matching this expression.
+            from_str (Optional[str]): The first day of a range to show.
+            to_str (Optional[str]): The last day of a range to show.
+
+        Returns:
+            A formatted string of the log entries.
+        """
+        query = None
+        if where:
+            query, error_msg = self._compile_query(where)
+            if query is None:
+                return error_msg
+
+        if from_str or to_str:
+            bounds = self._parse_range(from_str, to_str)
+            if bounds is None:
+                return "❗ Error: Invalid date format. Please use DD-MM-YYYY."
+            if query is not None:
+                bounds = query.bounds(*bounds)
+            return self._get_range_log(*bounds, query=query)
+        if query is not None and day_filter is None:
+            return self._get_range_log(*query.bounds(), query=query)
+        day_filter = day_filter or "today"
+
+        entries_for_day, target_date = self._get_entries_for_day(day_filter)
+        if target_date is None:
+            return "❗ Error: Invalid date format. Please use DD-MM-YYYY."
+
+        indexed = list(enumerate(entries_for_day))
+        if query is not None:
+            indexed = [(i, e) for i, e in indexed if query.matches(e)]
+
+        if not indexed:
+            if query is not None:
+                return f"No log entries for {target_date.strftime('%Y-%m-%d')} match the query."
+            if not self._store.has_entries():
+                return "No entries found in the log."
+            return f"No log entries for {target_date.strftime('%Y-%m-%d')}."
+
+        return "\n".join(self._format_day(target_date, indexed))
+
+    def _get_range_log(
+        self,
+        start: Optional[datetime],
+        end: Optional[datetime],
+        query: Optional[Query] = None,
+    ) -> str:
+        """
+        Formats every day with entries in a range, optionally only those
+        matching a query, keeping each entry's ID within its day so it can be
+        used with edit and remove.
+
+        Args:
+            start: The earliest start time, or None for no lower bound.
+            end: The start time to stop before, or None for no upper bound.
+            query: Only show entries matching this query.
+        """
+        range_str = self._describe_range(start, end)
+
+        # Read whole days so that IDs count from each day's first entry.
+        if start is not None:
+            start = datetime.combine(start.date(), time.min)
+        if end is not None and end.time() != time.min:
+            end = datetime.combine(end.date() + timedelta(days=1), time.min)
+
+        output: List[str] = []
+        total_minutes = 0
+        days = 0
+        current_day: Optional[date] = None
+        day_index = 0
+        matches: List[Tuple[int, TimeEntry]] = []
+
+        def flush():
+            nonlocal days
+            if matches:
+                if output:
+                    output.append("")
+                output.extend(self._format_day(current_day, matches))  # type: ignore[arg-type]
+                days += 1
+
+        for entry in self.iter_entries(start, end):
+            entry_day = entry.start_time.date()
+            if entry_day != current_day:
+                flush()
+                current_day, day_index, matches = entry_day, 0, []
+            if query is None or query.matches(entry):
+                matches.append((day_index, entry))
+                total_minutes += entry.duration_minutes
+            day_index += 1
+        flush()
+
+        if not output:
+            if query is not None:
+                return "No log entries match the query."
+            return f"No log entries {range_str}."
+        if days > 1:
+            output.append("")
+            output.append(
+                f"Total time across {days} days: "
+                f"{self._format_duration(timedelta(minutes=total_minutes))}"
+            )
         return "\n".join(output)
 
-    def export_log(self, file_format: str) -> Tuple[bool, str]:
+    def get_report(
+        self,
+        period: Optional[str] = None,
+        from_str: Optional[str] = None,
+        to_str: Optional[str] = None,
+        activity: Optional[str] = None,
+        where: Optional[str] = None,
+    ) -> str:
         """
-        Exports the entire time log to a file.
+        Gets a summary of the time spent per activity and per day over a range.
 
         Args:
-            file_format (str): The format to export to (csv or xlsx).
+            period (Optional[str]): 'week' or 'month' for the current calendar
+                week or month. Cannot be combined with from_str or to_str;
+                defaults to 'week' when neither is given.
+            from_str (Optional[str]): The first day ('today', 'yesterday', or
+                'DD-MM-YYYY').
+            to_str (Optional[str]): The last day.
+            activity (Optional[str]): Only include this activity (or alias).
+            where (Optional[str]): Only include entries matching this expression.
 
         Returns:
-            A tuple containing a success flag and a message.
+            A formatted string of the totals.
         """
-        log_data = self._read_log()
-        if not log_data.entries:
-            return False, "No log entries to export."
+        if period and (from_str or to_str):
+            return "❗ Error: Give either --week/--month or --from/--to, not both."
+        if not (from_str or to_str):
+            today = date.today()
+            if period == "month":
+                first_day = today.replace(day=1)
+                next_month = (first_day + timedelta(days=32)).replace(day=1)
+                last_day = next_month - timedelta(days=1)
+            else:
+                first_day = today - timedelta(days=today.weekday())
+                last_day = first_day + timedelta(days=6)
+            from_str = first_day.strftime("%d-%m-%Y")
+            to_str = last_day.strftime("%d-%m-%Y")
+
+        first_day, last_day = (self._parse_day_filter(s) if s else None for s in (from_str, to_str))
+        if where:
+            entries, error_msg = self._select_entries(from_str, to_str, activity, where)
+            if entries is None:
+                return error_msg
+            days = tally(entries)
+        else:
+            # Without --where, the totals come from the rollups and no entries are read.
+            if (from_str and first_day is None) or (to_str and last_day is None):
+                return "❗ Error: Invalid date format. Please use DD-MM-YYYY."
+            activity, error_msg = self._resolve_activity(activity)
+            if error_msg:
+                return error_msg
+            days = self._rollups.between(self._store, first_day, last_day)
+            if activity:
+                days = {d: {activity: t[activity]} for d, t in days.items() if activity in t}
+
+        range_str = self._describe_range(
+            datetime.combine(first_day, time.min) if first_day else None,
+            datetime.combine(last_day + timedelta(days=1), time.min) if last_day else None,
+        )
+        if not days:
+            return f"No log entries {range_str}."
+        return "\n".join(self._format_report(range_str, days))
+
+    def _format_report(self, range_str: str, days: DayTotals) -> List[str]:
+        """Formats per-day, per-activity totals as activity and day tables."""
+        by_activity: dict = {}
+        for totals in days.values():
+            for name, (minutes, count) in totals.items():
+                running = by_activity.setdefault(name, [0, 0])
+                running[0] += minutes
+                running[1] += count
+        total_minutes = sum(minutes for minutes, _ in by_activity.values())
+
+        def fmt(minutes: int) -> str:
+            return self._format_duration(timedelta(minutes=int(minutes)))
+
+        output = [f"--- Report {range_str} ---"]
+        output.append("{:<50} {:>10} {:>8} {:>8}".format("Activity", "Time", "Entries", "Share"))
+        output.append("-" * 79)
+        for name, (minutes, count) in sorted(by_activity.items(), key=lambda item: (-item[1][0], item[0])):
+            share = round(minutes / total_minutes * 100, 1) if total_minutes else 0.0
+            output.append(f"{name:<50} {fmt(minutes):>10} {count:>8} {share:>7.1f}%")
+
+        output.append("")
+        output.append("{:<16} {:>10} {:>8}".format("Day", "Time", "Entries"))
+        output.append("-" * 36)
+        for day in sorted(days):
+            day_str = date.fromisoformat(day).strftime("%Y-%m-%d %a")
+            minutes = sum(m for m, _ in days[day].values())
+            count = sum(c for _, c in days[day].values())
+            output.append(f"{day_str:<16} {fmt(minutes):>10} {count:>8}")
+
+        output.append("-" * 79)
+        output.append(f"Total time: {fmt(total_minutes)}")
+        return output
+
+    def search(self, text: str, limit: Optional[int] = 20) -> str:
+        """
+        Finds the entries whose activity or notes contain every given word.
 
-        processed_entries = []
-        for entry in log_data.entries:
-            entry_dict = entry.model_dump()
-            entry_dict["notes"] = "\n".join(entry.notes) if entry.notes else ""
-            processed_entries.append(entry_dict)
+        Args:
+            text (str): The words to look for. A word also matches longer
+                words it starts, so 'migrat' finds 'migration'.
+            limit (Optional[int]): Show at most this many entries, or None for all.
 
-        df = pd.DataFrame(processed_entries)
+        Returns:
+            A formatted string of the matching entries, newest first.
+        """
+        results = self._search_index.search(self._store, text)
+        if not results:
+            return f"No log entries match '{text}'."
 
-        # Define the output directory and create it if it doesn't exist
-        project_dir = Path(__file__).parent.parent
-        output_dir = project_dir / "exports"
-        output_dir.mkdir(parents=True, exist_ok=True)
+        noun = "entry" if len(results) == 1 else "entries"
+        output = [f"--- {len(results)} {noun} matching '{text}' (newest first) ---"]
+        output.append(
+            "{:<12} {:<7} {:<7} {:<42} {:>10}".format(
+                "Date", "Start", "End", "Activity", "Duration"
+            )
+        )
+        output.append("-" * 82)
+        for entry in results[:limit]:
+            duration_str = f"{entry.duration_minutes} min"
+            output.append(
+                f"{entry.start_time.strftime('%Y-%m-%d'):<12} {entry.start_time.strftime('%H:%M'):<7} "
+                f"{entry.end_time.strftime('%H:%M'):<7} {entry.activity:<42} {duration_str:>10}"
+            )
+            for note in entry.notes:
+                output.append(f"      - {note}")
+        output.append("-" * 82)
+        if limit is not None and len(results) > limit:
+            output.append(f"... and {len(results) - limit} more (use --limit to see them).")
+
+        total_minutes = sum(e.duration_minutes for e in results)
+        output.append(f"Total time: {self._format_duration(timedelta(minutes=total_minutes))}")
+        return "\n".join(output)
+
+    def get_overlaps(self, from_str: Optional[str] = None, to_str: Optional[str] = None) -> str:
+        """
+        Lists every pair of entries whose times overlap, in a range of days or
+        the whole log, with each entry's day and ID so it can be edited or removed.
+
+        Args:
+            from_str (Optional[str]): The first day ('today', 'yesterday', or 'DD-MM-YYYY').
+            to_str (Optional[str]): The last day.
+
+        Returns:
+            A formatted string of the overlapping pairs.
+        """
+        bounds = self._parse_range(from_str, to_str)
+        if bounds is None:
+            return "❗ Error: Invalid date format. Please use DD-MM-YYYY."
+        start, end = bounds
+
+        def labelled(entries: List[TimeEntry]) -> Iterator[Tuple[TimeEntry, Tuple[date, int]]]:
+            current_day, day_index = None, 0
+            for entry in entries:
+                if entry.start_time.date() != current_day:
+                    current_day, day_index = entry.start_time.date(), 0
+                yield entry, (current_day, day_index)
+                day_index += 1
+
+        # Entries from before the range that are still running when it starts.
+        seeds = []
+        if start is not None:
+            running = self._intervals.overlapping(
+                self._store, start, start + timedelta(microseconds=1)
+            )
+            seed_times = sorted({datetime.fromisoformat(s) for s, _, _ in running})
+            for seed_time in seed_times:
+                if seed_time >= start:
+                    continue
+                day_entries, day = self._get_entries_for_day(seed_time.strftime("%d-%m-%Y"))
+                for i, entry in enumerate(day_entries):
+                    if entry.start_time == seed_time and entry.end_time > start:
+                        seeds.append((entry, (day, i)))
+
+        items = itertools.chain(seeds, labelled(self.iter_entries(start, end)))
+        output = []
+        total = timedelta()
+        count = 0
+        for (a, a_label), (b, b_label) in find_overlaps(items):
+            if start is not None and b.start_time < start:
+                continue  # Both started before the range.
+            overlap = min(a.end_time, b.end_time) - b.start_time
+            total += overlap
+            count += 1
+            if output:
+                output.append("")
+            for entry, (day, i) in ((a, a_label), (b, b_label)):
+                output.append(
+                    f"{day.strftime('%Y-%m-%d')} #{i:<3} {entry.start_time.strftime('%H:%M')}-"
+                    f"{entry.end_time.strftime('%H:%M')}  {entry.activity}"
+                )
+            output.append(f"    overlap: {self._format_duration(overlap)}")
+
+        range_str = self._describe_range(start, end)
+        if not count:
+            return f"✅ No overlapping entries {range_str}."
+        header = f"--- Overlapping entries {range_str} ---"
+        footer = (
+            f"Found {count} overlap{'s' if count != 1 else ''}, "
+            f"double-counting {self._format_duration(total)}. "
+            "Fix them with 'track edit ID --when DAY' or 'track remove ID --when DAY'."
+        )
+        return "\n".join([header] + output + ["", footer])
+
+    def _read_watermark(self) -> Optional[ExportWatermark]:
+        """Reads the watermark left by the last incremental export."""
+        if not EXPORT_WATERMARK_FILE.exists():
+            return None
+        try:
+            return ExportWatermark.model_validate_json(EXPORT_WATERMARK_FILE.read_bytes())
+        except ValueError:
+            return None
+
+    def _write_watermark(self, watermark: ExportWatermark):
+        """Writes the incremental export watermark."""
+        atomic_write(EXPORT_WATERMARK_FILE, watermark.model_dump_json())
+
+    def export_log(
+        self,
+        file_format: Optional[str] = None,
+        since_last: bool = False,
+        from_str: Optional[str] = None,
+        to_str: Optional[str] = None,
+        activity: Optional[str] = None,
+        output: Optional[str] = None,
+        partition_by: Optional[str] = None,
+        max_rows: Optional[int] = None,
+        where: Optional[str] = None,
+    ) -> Tuple[bool, str]:
+        """
+        Exports the time log to a file.
+
+        Only the part of the log between from_str and to_str is read from the
+        store, so exporting a short range of a long history stays fast.
+
+        Args:
+            file_format (Optional[str]): The format to export to (csv, xlsx,
+                json, parquet or arrow), or several separated by commas.
+                Several formats are written from a single read of the log.
+                Defaults to the output's extension, or xlsx.
+            since_last (bool): If True, only export entries added or changed
+                since the last export that used since_last.
+            from_str (Optional[str]): The first day to export ('today',
+                'yesterday', or 'DD-MM-YYYY').
+            to_str (Optional[str]): The last day to export.
+            activity (Optional[str]): Only export this activity (or alias).
+            output (Optional[str]): The file to write instead of a timestamped
+                file in exports/, or '-' for stdout. A .gz or .zst extension
+                compresses the output.
+            partition_by (Optional[str]): Write one file per 'month' or per
+                'activity', plus a manifest listing them.
+            max_rows (Optional[int]): Start a new file after this many entries.
+            where (Optional[str]): Only export entries matching this expression.
+
+        Returns:
+            A tuple containing a success flag and a message.
+        """
+        # An incremental export reads the watermark and writes the next one, so
+        # hold the data lock throughout, as other read-modify-writes do. Two
+        # exports at once would otherwise both write the same delta.
+        with self._lock if since_last else nullcontext():
+            return self._export_log(
+                file_format,
+                since_last,
+                from_str,
+                to_str,
+                activity,
+                output,
+                partition_by,
+                max_rows,
+                where,
+            )
+
+    def _export_log(
+        self,
+        file_format: Optional[str] = None,
+        since_last: bool = False,
+        from_str: Optional[str] = None,
+        to_str: Optional[str] = None,
+        activity: Optional[str] = None,
+        output: Optional[str] = None,
+        partition_by: Optional[str] = None,
+        max_rows: Optional[int] = None,
+        where: Optional[str] = None,
+    ) -> Tuple[bool, str]:
+        """Exports the time log; see export_log."""
+        if file_format is None:
+            file_format = (output and format_from_path(output)) or "xlsx"
+        file_formats = list(dict.fromkeys(f.strip() for f in file_format.split(",")))
+        for fmt in file_formats:
+            if fmt not in WRITERS:
+                return False, f"Unsupported format: {fmt}"
+        if output and len(file_formats) > 1:
+            return False, "❗ Error: --output can only be used with a single format."
+        partitioned = bool(partition_by or max_rows)
+        if partitioned:
+            if len(file_formats) > 1:
+                return False, "❗ Error: Partitioned exports can only use a single format."
+            if output == STDOUT:
+                return False, "❗ Error: Partitioned exports cannot be written to stdout."
+            if max_rows is not None and max_rows < 1:
+                return False, "❗ Error: --max-rows must be at least 1."
+
+        selected, error_msg = self._select_entries(from_str, to_str, activity, where)
+        if selected is None:
+            return False, error_msg
+        entries: Iterator[TimeEntry] = selected
+        filtered = bool(from_str or to_str or activity or where)
+
+        watermark = None
+        if since_last:
+            previous = self._read_watermark()
+            previous_fingerprints = previous.fingerprints if previous else {}
+            # A filtered export only sees part of the log, so keep what the
+            # watermark already knows about the rest.
+            watermark = ExportWatermark(
+                exported_at=datetime.now(),
+                fingerprints=dict(previous_fingerprints) if filtered else {},
+            )
+            entries = changed_entries(entries, previous_fingerprints, watermark.fingerprints)
+
+        first_entry = next(entries, None)
+        if first_entry is None:
+            if watermark is not None:
+                self._write_watermark(watermark)
+                return True, "✅ No new or changed entries since the last export."
+            if filtered:
+                return False, "No log entries match the given filters."
+            return False, "No log entries to export."
+        entries = itertools.chain([first_entry], entries)
+
+        if output and output != STDOUT:
+            output_dir, base_name, extension = split_output_path(output)
+            if not format_from_path(output):
+                extension = f".{file_formats[0]}{extension}"
+        else:
+            # Define the output directory and create it if it doesn't exist
+            project_dir = Path(__file__).parent.parent
+            output_dir = project_dir / "exports"
+            output_dir.mkdir(parents=True, exist_ok=True)
+
+            # Create a timestamp for the filename
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            suffix = "_delta" if since_last else ""
+            base_name = f"timetrack_export_{timestamp}{suffix}"
+            extension = f".{file_formats[0]}"
+
+        if partitioned:
+            manifest = ExportManifest(
+                created_at=datetime.now(),
+                format=file_formats[0],
+                partition_by=partition_by,
+                max_rows=max_rows,
+            )
+            try:
+                manifest.files = write_partitioned(
+                    entries,
+                    WRITERS[file_formats[0]],
+                    part_targets(output_dir, base_name, extension),
+                    partition_by=partition_by,
+                    max_rows=max_rows,
+                )
+            except Exception as e:
+                return False, f"An error occurred during export: {e}"
+
+            manifest_path = output_dir / f"{base_name}_manifest.json"
+            atomic_write(manifest_path, manifest.model_dump_json(indent=4))
+            if watermark is not None:
+                self._write_watermark(watermark)
+            rows = sum(part.rows for part in manifest.files)
+            return (
+                True,
+                f"✅ Exported {rows} entries into {len(manifest.files)} files. "
+                f"Manifest: {manifest_path}",
+            )
 
-        # Create a timestamp for the filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_filename = f"timetrack_export_{timestamp}.{file_format}"
-        output_path = output_dir / output_filename
+        if output:
+            targets = [output]
+        else:
+            targets = [str(output_dir / f"{base_name}.{fmt}") for fmt in file_formats]
 
         try:
-            if file_format == "csv":
-                df.to_csv(output_path, index=False)
-            elif file_format == "xlsx":
-                df.to_excel(output_path, index=False, engine="openpyxl")
+            if len(file_formats) == 1:
+                with open_output(targets[0]) as f:
+                    WRITERS[file_formats[0]](entries, f)
             else:
-                return False, f"Unsupported format: {file_format}"
+                write_many(
+                    entries, [(WRITERS[fmt], target) for fmt, target in zip(file_formats, targets)]
+                )
         except Exception as e:
             return False, f"An error occurred during export: {e}"
 
+        output_path = ", ".join("stdout" if t == STDOUT else t for t in targets)
+        if watermark is not None:
+            self._write_watermark(watermark)
+            return True, f"✅ Exported new and changed entries to {output_path}"
+        if filtered:
+            return True, f"✅ Successfully exported the selected entries to {output_path}"
         return True, f"✅ Successfully exported all data to {output_path}"
 
+    def export_report(
+        self,
+        from_str: Optional[str] = None,
+        to_str: Optional[str] = None,
+        activity: Optional[str] = None,
+        output: Optional[str] = None,
+        where: Optional[str] = None,
+    ) -> Tuple[bool, str]:
+        """
+        Exports a summary workbook: daily totals, weekly totals, minutes per
+        activity for each day, and activity totals.
+
+        Args:
+            from_str (Optional[str]): The first day to include ('today',
+                'yesterday', or 'DD-MM-YYYY').
+            to_str (Optional[str]): The last day to include.
+            activity (Optional[str]): Only include this activity (or alias).
+            output (Optional[str]): The file to write instead of a timestamped
+                file in exports/, or '-' for stdout.
+            where (Optional[str]): Only include entries matching this expression.
+
+        Returns:
+            A tuple containing a success flag and a message.
+        """
+        from .report import write_report
+
+        entries, error_msg = self._select_entries(from_str, to_str, activity, where)
+        if entries is None:
+            return False, error_msg
+        first_entry = next(entries, None)
+        if first_entry is None:
+            return False, "No log entries to report on."
+        entries = itertools.chain([first_entry], entries)
+
+        if output:
+            output_path = output
+        else:
+            output_dir = Path(__file__).parent.parent / "exports"
+            output_dir.mkdir(parents=True, exist_ok=True)
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            output_path = str(output_dir / f"timetrack_report_{timestamp}.xlsx")
+
+        try:
+            with open_output(output_path) as f:
+                write_report(entries, f)
+        except Exception as e:
+            return False, f"An error occurred during export: {e}"
+
+        destination = "stdout" if output_path == STDOUT else output_path
+        return True, f"✅ Successfully exported the report to {destination}"
+
+    @_exclusive
     def remove_entry(self, entry_id: int, day_filter: str = "today") -> Tuple[bool, str]:
         """
         Removes a specific entry from the log by its day-specific ID.
@@ -471,10 +1177,7 @@ class TimeTracker:
 
         entry_to_remove = entries_for_day[entry_id]
 
-        # Find and remove from the full log by matching start_time
-        log = self._read_log()
-        log.entries = [e for e in log.entries if e.start_time != entry_to_remove.start_time]
-        self._write_log(log)
+        self._store.remove_entry(entry_to_remove)
 
         return True, f"✅ Removed entry: '{entry_to_remove.activity}'"
 
@@ -504,6 +1207,7 @@ class TimeTracker:
 
         return entries_for_day[entry_id], ""
 
+    @_exclusive
     def edit_entry(
         self,
         entry_id: int,
@@ -511,6 +1215,7 @@ class TimeTracker:
         new_activity: Optional[str] = None,
         new_start_str: Optional[str] = None,
         new_end_str: Optional[str] = None,
+        allow_overlap: bool = False,
     ) -> Tuple[bool, str]:
         """Edits an existing time entry by its day-specific ID."""
         original_entry, error_msg = self.get_entry_by_id(entry_id, day_filter)
@@ -518,6 +1223,8 @@ class TimeTracker:
         if not original_entry:
             return False, error_msg
 
+        from dateutil.parser import parse  # type: ignore
+
         # Use new values if provided, otherwise keep original values
         activity = new_activity if new_activity is not None else original_entry.activity
 
@@ -534,10 +1241,16 @@ class TimeTracker:
             )
         except ValueError:
             return False, "❗ Error: Invalid time format."
+        start_time, end_time = self._local_time(start_time), self._local_time(end_time)
 
         if end_time <= start_time:
             return False, "❗ Error: End time must be after start time."
 
+        if not allow_overlap:
+            error_msg = self._check_overlap(start_time, end_time, ignore=original_entry)
+            if error_msg:
+                return False, error_msg
+
         duration_minutes = round((end_time - start_time).total_seconds() / 60)
 
         # Create a new entry with the updated details
@@ -549,17 +1262,11 @@ class TimeTracker:
             notes=original_entry.notes,  # Preserve original notes
         )
 
-        # Find and replace in the full log by matching original start_time
-        log = self._read_log()
-        for i, entry in enumerate(log.entries):
-            if entry.start_time == original_entry.start_time:
-                log.entries[i] = updated_entry
-                break
-
-        self._write_log(log)
+        self._store.replace_entry(original_entry, updated_entry)
 
         return True, f"✅ Entry {entry_id} updated."
 
+    @_exclusive
     def add_note(self, note_text: str) -> Tuple[bool, str]:
         """Adds a note to the current task."""
         state = self._read_state()
@@ -605,12 +1312,44 @@ class TimeTracker:
             return f"{hours}h {minutes}m"
         return f"{minutes}m"
 
+    def _check_overlap(
+        self, start_time: datetime, end_time: datetime, ignore: Optional[TimeEntry] = None
+    ) -> str:
+        """
+        Checks whether a new or edited entry would overlap logged time.
+
+        Args:
+            start_time: The entry's start time.
+            end_time: The entry's end time.
+            ignore: The entry being edited, if any.
+
+        Returns:
+            An error message naming the overlapping entries, or "" if there are none.
+        """
+        found = self._intervals.overlapping(self._store, start_time, end_time, ignore)
+        if not found:
+            return ""
+        described = []
+        for start, end, activity in reversed(found[:3]):
+            start_dt, end_dt = datetime.fromisoformat(start), datetime.fromisoformat(end)
+            described.append(
+                f"'{activity}' ({start_dt.strftime('%Y-%m-%d %H:%M')}-{end_dt.strftime('%H:%M')})"
+            )
+        if len(found) > 3:
+            described.append(f"and {len(found) - 3} more")
+        return (
+            f"❗ Error: This overlaps {', '.join(described)}. "
+            "Use --allow-overlap to log it anyway."
+        )
+
+    @_exclusive
     def add_entry(
         self,
         activity: str,
         start_str: str,
         end_str: Optional[str],
         duration_str: Optional[str],
+        allow_overlap: bool = False,
     ) -> Tuple[bool, str]:
         """
         Adds a time entry retrospectively.
@@ -620,10 +1359,12 @@ class TimeTracker:
             start_str (str): The start time string.
             end_str (Optional[str]): The end time string.
             duration_str (Optional[str]): The duration string.
+            allow_overlap (bool): If True, log it even if it overlaps other entries.
 
         Returns:
             A tuple containing a success flag and a message.
         """
+        from dateutil.parser import parse  # type: ignore
 
         today_str = date.today().strftime("%Y-%m-%d")
         yesterday_str = (date.today() - timedelta(days=1)).strftime("%Y-%m-%d")
@@ -636,13 +1377,13 @@ class TimeTracker:
             end_str = end_str.lower().replace("yesterday", yesterday_str)
 
         try:
-            start_time = parse(start_str, dayfirst=True)
+            start_time = self._local_time(parse(start_str, dayfirst=True))
         except ValueError:
             return False, "❗ Error: Invalid start time format."
 
         if end_str:
             try:
-                end_time = parse(end_str, dayfirst=True)
+                end_time = self._local_time(parse(end_str, dayfirst=True))
             except ValueError:
                 return False, "❗ Error: Invalid end time format."
         elif duration_str:
@@ -656,6 +1397,11 @@ class TimeTracker:
         if end_time <= start_time:
             return False, "❗ Error: End time must be after start time."
 
+        if not allow_overlap:
+            error_msg = self._check_overlap(start_time, end_time)
+            if error_msg:
+                return False, error_msg
+
         duration_minutes = round((end_time - start_time).total_seconds() / 60)
 
         new_entry = TimeEntry(
@@ -665,23 +1411,24 @@ class TimeTracker:
             duration_minutes=duration_minutes,
         )
 
-        log = self._read_log()
-        log.entries.append(new_entry)
-        log.entries.sort(key=lambda x: x.start_time)
-        self._write_log(log)
+        self._store.append_entry(new_entry)
 
         return (
             True,
             f"✅ Logged '{activity}' for {self._format_duration(end_time - start_time)}.",
         )
 
-    def backdate_entry(self, duration_str: str, activity: str) -> Tuple[bool, str]:
+    @_exclusive
+    def backdate_entry(
+        self, duration_str: str, activity: str, allow_overlap: bool = False
+    ) -> Tuple[bool, str]:
         """
         Logs a task that just finished by backdating from the current time.
 
         Args:
             duration_str (str): The duration of the task (e.g., '1h', '30m').
             activity (str): The name of the task.
+            allow_overlap (bool): If True, log it even if it overlaps other entries.
 
         Returns:
             A tuple containing a success flag and a message.
@@ -692,6 +1439,10 @@ class TimeTracker:
 
         end_time = datetime.now()
         start_time = end_time - duration
+        if not allow_overlap:
+            error_msg = self._check_overlap(start_time, end_time)
+            if error_msg:
+                return False, error_msg
         duration_minutes = round(duration.total_seconds() / 60)
 
         new_entry = TimeEntry(
@@ -701,16 +1452,76 @@ class TimeTracker:
             duration_minutes=duration_minutes,
         )
 
-        log = self._read_log()
-        log.entries.append(new_entry)
-        log.entries.sort(key=lambda x: x.start_time)
-        self._write_log(log)
+        self._store.append_entry(new_entry)
 
         return (
             True,
             f"✅ Logged '{activity}' for {self._format_duration(duration)}.",
         )
 
+    @_exclusive
+    def compact_log(self) -> Tuple[bool, str]:
+        """
+        Folds the journal of pending changes into the log snapshot.
+
+        Returns:
+            A tuple containing a success flag and a message.
+        """
+        folded = self._store.compact()
+        if not folded:
+            return True, "✅ Log is already compact."
+        return True, f"✅ Compacted {folded} journal records into the log."
+
+    @_exclusive
+    def rebuild_indexes(self) -> Tuple[bool, str]:
+        """
+        Rebuilds the search index, daily rollups and interval index from the log.
+
+        Returns:
+            A tuple containing a success flag and a message.
+        """
+        self._search_index.rebuild(self._store)
+        self._rollups.rebuild(self._store)
+        entries = len(self._intervals.rebuild(self._store)["starts"])
+        return (
+            True,
+            f"✅ Rebuilt the search index, daily rollups and interval index from {entries} entries.",
+        )
+
+    @_exclusive
+    def migrate_storage(self, backend: str) -> Tuple[bool, str]:
+        """
+        Copies the time log into another storage backend and switches to it.
+
+        The old backend's files are left in place as a backup.
+
+        Args:
+            backend (str): The backend to migrate to ('json', 'sqlite', 'shards' or 'binary').
+
+        Returns:
+            A tuple containing a success flag and a message.
+        """
+        if backend not in STORAGE_BACKENDS:
+            return False, f"❗ Error: Unknown storage backend '{backend}'."
+
+        config = self._read_config()
+        if config.storage == backend:
+            return False, f"❗ The log is already stored as '{backend}'."
+
+        previous = config.storage
+        log = self._read_log()
+        target = self._open_store(backend)
+        target.write_log(log)
+
+        config.storage = backend
+        self._write_config(config)
+        self._store = target
+
+        return (
+            True,
+            f"✅ Migrated {len(log.entries)} entries from '{previous}' to '{backend}'.",
+        )
+
     def _read_config(self) -> Config:
         """Reads and validates the configuration file."""
         if not CONFIG_FILE.exists():
@@ -723,8 +1534,9 @@ class TimeTracker:
 
     def _write_config(self, config: Config):
         """Writes the configuration to the config file."""
-        CONFIG_FILE.write_text(config.model_dump_json(indent=4))
+        atomic_write(CONFIG_FILE, config.model_dump_json(indent=4))
 
+    @_exclusive
     def add_alias(self, alias: str, activity: str) -> Tuple[bool, str]:
         """Adds or updates an alias."""
         if not alias.startswith("@"):
@@ -736,6 +1548,7 @@ class TimeTracker:
 
         return True, f"✅ Alias '{alias}' set to '{activity}'."
 
+    @_exclusive
     def remove_alias(self, alias: str) -> Tuple[bool, str]:
         """Removes an alias."""
         config = self._read_config()
@@ -771,8 +1584,9 @@ class TimeTracker:
 
     def _write_memos(self, memos: MemoList):
         """Writes the memos to the memos file."""
-        MEMOS_FILE.write_text(memos.model_dump_json(indent=4))
+        atomic_write(MEMOS_FILE, memos.model_dump_json(indent=4))
 
+    @_exclusive
     def add_memo(self, text: str) -> Tuple[bool, str]:
         """
         Adds a new global memo.
@@ -817,6 +1631,7 @@ class TimeTracker:
 
         return "\n".join(output)
 
+    @_exclusive
     def remove_memo(self, memo_id: int) -> Tuple[bool, str]:
         """
         Removes a memo by its ID.
@@ -0,0 +1,311 @@
+# project/timetrack/daemon.py
+"""trackd: a resident daemon that serves TimeTracker over a Unix socket."""
+
+import json
+import os
+import signal
+import socketserver
+import sys
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import click  # type: ignore
+from pydantic import BaseModel  # type: ignore
+
+from . import core
+from .client import SOCKET_FILE, DaemonClient
+from .core import TimeTracker
+from .models import ApplicationState, Config, MemoList, TimeEntry, TimeLog
+from .storage import LogStore
+
+# The TimeTracker methods the CLI calls, which are the only ones trackd serves.
+# 'update' is not among them: it must run in the caller's own process.
+SERVED_METHODS = frozenset(
+    {
+        "add_alias",
+        "add_entry",
+        "add_memo",
+        "add_note",
+        "backdate_entry",
+        "compact_log",
+        "edit_entry",
+        "export_log",
+        "export_report",
+        "get_entry_by_id",
+        "get_log",
+        "get_overlaps",
+        "get_report",
+        "list_aliases",
+        "list_memos",
+        "migrate_storage",
+        "pause",
+        "rebuild_indexes",
+        "remove_alias",
+        "remove_entry",
+        "remove_memo",
+        "resume",
+        "search",
+        "start",
+        "start_previous",
+        "status",
+        "stop",
+    }
+)
+
+
+def _signature(paths: List[Path]) -> tuple:
+    """Returns a cheap fingerprint of the files, changing whenever any of them does."""
+    stats = []
+    for path in paths:
+        try:
+            st = path.stat()
+            stats.append((str(path), st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            stats.append((str(path), None, None))
+    return tuple(stats)
+
+
+def _encode(value: Any) -> Any:
+    """Encodes a TimeTracker result as JSON-compatible data."""
+    if isinstance(value, BaseModel):
+        return {"__model__": type(value).__name__, "data": value.model_dump(mode="json")}
+    if isinstance(value, (tuple, list)):
+        return [_encode(v) for v in value]
+    return value
+
+
+class CachedLogStore(LogStore):
+    """
+    Wraps a LogStore, keeping the parsed log and recently used day ranges in
+    memory.
+
+    The cache is dropped after every write and whenever the store's files change
+    on disk, so edits made without going through trackd are still picked up.
+
+    trackd serves requests on several threads, so the cache and the wrapped
+    store are used by one thread at a time. Writers already hold the tracker's
+    data lock, and readers never take it, so the two locks are always taken in
+    that order.
+
+    Args:
+        store (LogStore): The store to cache.
+    """
+
+    MAX_RANGES = 32
+
+    def __init__(self, store: LogStore):
+        self.store = store
+        self._signature: Optional[tuple] = None
+        self._log: Optional[TimeLog] = None
+        self._ranges: "OrderedDict[Tuple[datetime, datetime], List[TimeEntry]]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def _check(self):
+        """Drops the cache if the store's files have changed."""
+        signature = _signature(self.store.files())
+        if signature != self._signature:
+            self._signature = signature
+            self._log = None
+            self._ranges.clear()
+
+    def _invalidate(self):
+        """Forces the cache to be dropped on the next access."""
+        self._signature = None
+
+    def files(self) -> List[Path]:
+        """Returns the wrapped store's files."""
+        return self.store.files()
+
+    def read_log(self) -> TimeLog:
+        """
+        Returns a copy of the cached log, reading it on first use.
+
+        Callers may add, remove or reorder entries in what they read, so each
+        gets its own list. The entries themselves are shared, as with
+        entries_between: TimeTracker never changes an entry in place, it
+        replaces it through the store. A deep copy would cost more than
+        reading the log again.
+        """
+        with self._lock:
+            self._check()
+            if self._log is None:
+                self._log = self.store.read_log()
+            return self._log.model_copy(update={"entries": list(self._log.entries)})
+
+    def write_log(self, log: TimeLog):
+        """Writes the log through to the store."""
+        with self._lock:
+            self.store.write_log(log)
+            self._invalidate()
+
+    def has_entries(self) -> bool:
+        """Answers from the cached log when it is loaded."""
+        with self._lock:
+            self._check()
+            if self._log is not None:
+                return bool(self._log.entries)
+            return self.store.has_entries()
+
+    def entries_between(self, start: datetime, end: datetime) -> List[TimeEntry]:
+        """Returns a range from the LRU cache, reading it on a miss."""
+        with self._lock:
+            self._check()
+            key = (start, end)
+            if key in self._ranges:
+                self._ranges.move_to_end(key)
+            else:
+                self._ranges[key] = self.store.entries_between(start, end)
+                if len(self._ranges) > self.MAX_RANGES:
+                    self._ranges.popitem(last=False)
+            return list(self._ranges[key])
+
+    def append_entry(self, entry: TimeEntry):
+        """Appends the entry through to the store."""
+        with self._lock:
+            self.store.append_entry(entry)
+            self._invalidate()
+
+    def replace_entry(self, original: TimeEntry, updated: TimeEntry):
+        """Replaces the entry through to the store."""
+        with self._lock:
+            self.store.replace_entry(original, updated)
+            self._invalidate()
+
+    def remove_entry(self, entry: TimeEntry):
+        """Removes the entry through to the store."""
+        with self._lock:
+            self.store.remove_entry(entry)
+            self._invalidate()
+
+    def compact(self) -> int:
+        """Compacts the wrapped store."""
+        with self._lock:
+            folded = self.store.compact()
+            self._invalidate()
+            return folded
+
+
+class ResidentTimeTracker(TimeTracker):
+    """
+    A TimeTracker that keeps the state, config, memos and log in memory between
+    calls instead of re-reading and re-validating them from disk each time.
+    """
+
+    def __init__(self):
+        self._file_cache: Dict[Path, Tuple[tuple, Any]] = {}
+        super().__init__()
+
+    def _open_store(self, backend: str) -> LogStore:
+        """Wraps the backend's store in a CachedLogStore."""
+        return CachedLogStore(super()._open_store(backend))
+
+    def _cached(self, path: Path, read: Callable[[], Any]) -> Any:
+        """Returns a copy of the parsed file, re-reading it only when it has changed."""
+        signature = _signature([path])
+        hit = self._file_cache.get(path)
+        if hit is None or hit[0] != signature:
+            hit = (signature, read())
+            self._file_cache[path] = hit
+        value = hit[1]
+        # Callers mutate what they read, so never hand out the cached object.
+        return value.model_copy(deep=True) if value is not None else None
+
+    def _read_state(self) -> Optional[ApplicationState]:
+        """Returns the cached state."""
+        return self._cached(core.STATE_FILE, super()._read_state)
+
+    def _write_state(self, state: ApplicationState):
+        """Writes the state and drops its cache entry."""
+        super()._write_state(state)
+        self._file_cache.pop(core.STATE_FILE, None)
+
+    def _read_config(self) -> Config:
+        """Returns the cached config."""
+        return self._cached(core.CONFIG_FILE, super()._read_config)
+
+    def _write_config(self, config: Config):
+        """Writes the config and drops its cache entry."""
+        super()._write_config(config)
+        self._file_cache.pop(core.CONFIG_FILE, None)
+
+    def _read_memos(self) -> MemoList:
+        """Returns the cached memos."""
+        return self._cached(core.MEMOS_FILE, super()._read_memos)
+
+    def _write_memos(self, memos: MemoList):
+        """Writes the memos and drops their cache entry."""
+        super()._write_memos(memos)
+        self._file_cache.pop(core.MEMOS_FILE, None)
+
+    def prewarm(self):
+        """Loads everything a typical command needs, including today and yesterday."""
+        self._read_state()
+        self._read_config()
+        self._read_memos()
+        self._read_log()
+        self._get_entries_for_day("today")
+        self._get_entries_for_day("yesterday")
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Handles one newline-delimited JSON request per connection."""
+
+    def handle(self):
+        """Reads a request, calls the tracker and writes back the result."""
+        line = self.rfile.readline()
+        if not line:
+            return  # A client checking whether trackd is up.
+
+        tracker = self.server.tracker  # type: ignore[attr-defined]
+        try:
+            request = json.loads(line)
+            method_name = request["method"]
+            if not isinstance(method_name, str) or method_name not in SERVED_METHODS:
+                raise ValueError(f"Unknown method '{method_name}'.")
+            method = getattr(tracker, method_name)
+            result = method(*request.get("args", []), **request.get("kwargs", {}))
+            response = json.dumps({"result": _encode(result)})
+        except Exception as e:
+            response = json.dumps({"error": str(e)})
+
+        self.wfile.write(response.encode() + b"\n")
+
+
+@click.command()
+def main():
+    """Run the trackd daemon in the foreground."""
+    if DaemonClient.connect() is not None:
+        click.echo("❗ Error: trackd is already running.", err=True)
+        raise SystemExit(1)
+
+    tracker = ResidentTimeTracker()
+    tracker.prewarm()
+
+    SOCKET_FILE.unlink(missing_ok=True)
+    # Create the socket private to the user, with no window in which others
+    # could connect. Each connection gets its own thread, so a long export
+    # does not hold up other commands.
+    umask = os.umask(0o177)
+    try:
+        server = socketserver.ThreadingUnixStreamServer(str(SOCKET_FILE), _RequestHandler)
+    finally:
+        os.umask(umask)
+    server.daemon_threads = True
+    server.tracker = tracker  # type: ignore[attr-defined]
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    click.echo(f"🟢 trackd listening on {SOCKET_FILE}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        SOCKET_FILE.unlink(missing_ok=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,593 @@
+# project/timetrack/export.py
+"""Writers for exporting the time log to files."""
+
+import csv
+import gzip
+import hashlib
+import io
+import itertools
+import queue
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import (
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    TextIO,
+    Tuple,
+)
+
+from .models import ExportPart, TimeEntry
+
+EXPORT_COLUMNS = ("start_time", "end_time", "activity", "duration_minutes", "notes")
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+# Entries per Parquet row group / Arrow record batch.
+ARROW_BATCH_ROWS = 65536
+# When writing several formats at once, entries are handed to each writer in
+# batches of this size, with at most FANOUT_QUEUE_BATCHES waiting per writer.
+FANOUT_BATCH_ROWS = 1024
+FANOUT_QUEUE_BATCHES = 16
+# Partitions are written concurrently, one thread each, so cap how many can be
+# open at the same time.
+MAX_OPEN_PARTITIONS = 128
+
+# Output path suffixes that select a compressed stream, and '-' for stdout.
+COMPRESSION_SUFFIXES = (".gz", ".zst")
+STDOUT = "-"
+
+Writer = Callable[[Iterable[TimeEntry], BinaryIO], None]
+
+
+def _import_zstandard():
+    """Imports zstandard, which is only needed for .zst outputs."""
+    try:
+        import zstandard  # type: ignore
+    except ImportError:
+        raise RuntimeError(
+            "Writing .zst files needs zstandard. "
+            "Install it with 'pip install zstandard'."
+        ) from None
+    return zstandard
+
+
+@contextmanager
+def open_output(target: str) -> Iterator[BinaryIO]:
+    """
+    Opens an export destination for binary writing.
+
+    Args:
+        target (str): A file path, or '-' for stdout. Paths ending in .gz or
+            .zst are compressed with gzip or zstd on the fly.
+    """
+    if target == STDOUT:
+        yield sys.stdout.buffer
+        sys.stdout.buffer.flush()
+        return
+
+    path = Path(target)
+    if path.suffix == ".gz":
+        with gzip.open(path, "wb") as f:
+            yield f  # type: ignore[misc]
+    elif path.suffix == ".zst":
+        zstandard = _import_zstandard()
+        with path.open("wb") as raw:
+            with zstandard.ZstdCompressor().stream_writer(raw, closefd=False) as f:
+                yield f
+    else:
+        with path.open("wb") as f:
+            yield f
+
+
+def split_output_path(target: str) -> Tuple[Path, str, str]:
+    """
+    Splits an output path into its directory, base name and the extensions
+    that name its format and compression, e.g. ('out', 'week', '.csv.gz').
+    """
+    path = Path(target)
+    extension = ""
+    if path.suffix in COMPRESSION_SUFFIXES:
+        extension = path.suffix
+        path = path.with_suffix("")
+    if path.suffix.lstrip(".") in WRITERS:
+        extension = path.suffix + extension
+        path = path.with_suffix("")
+    return path.parent, path.name, extension
+
+
+def format_from_path(target: str) -> Optional[str]:
+    """Returns the export format named by a path's extension, ignoring compression."""
+    extension = split_output_path(target)[2]
+    fmt = extension.split(".")[1] if extension else ""
+    return fmt if fmt in WRITERS else None
+
+
+@contextmanager
+def _text(f: BinaryIO) -> Iterator[TextIO]:
+    """Writes UTF-8 text to a binary stream without closing it afterwards."""
+    text = io.TextIOWrapper(f, encoding="utf-8", newline="")
+    try:
+        yield text
+    finally:
+        text.flush()
+        text.detach()
+
+
+class _StreamOnly:
+    """
+    Exposes only write and flush, so zipfile streams the archive instead of
+    seeking back to patch headers. Compressed streams such as GzipFile claim to
+    be seekable but cannot seek backwards.
+    """
+
+    def __init__(self, f: BinaryIO):
+        self._f = f
+
+    def write(self, data: bytes) -> int:
+        return self._f.write(data)
+
+    def flush(self):
+        self._f.flush()
+
+
+def zip_output(output: BinaryIO) -> BinaryIO:
+    """Returns output, or a write-only view of it if zipfile must stream to it."""
+    if isinstance(output, io.BufferedWriter):
+        return output
+    return _StreamOnly(output)  # type: ignore[return-value]
+
+
+def fingerprint(entry: TimeEntry) -> str:
+    """Returns a short hash of everything in an entry, used to spot changes."""
+    return hashlib.blake2b(entry.model_dump_json().encode(), digest_size=8).hexdigest()
+
+
+def changed_entries(
+    entries: Iterable[TimeEntry],
+    previous: Dict[str, List[str]],
+    current: Dict[str, List[str]],
+) -> Iterator[TimeEntry]:
+    """
+    Yields only the entries that are new or changed since previous was taken.
+
+    Entries that share a start time are matched to previous hashes one for
+    one, so each is exported once and not again on later runs.
+
+    Args:
+        entries (Iterable[TimeEntry]): All entries, in order.
+        previous (Dict[str, List[str]]): Fingerprints from the last export.
+        current (Dict[str, List[str]]): Filled with the fingerprints of every
+            entry seen, to be saved as the next watermark. Start times that
+            are seen replace what current held for them.
+    """
+    unmatched: Dict[str, List[str]] = {}
+    for entry in entries:
+        key = entry.start_time.isoformat()
+        if key not in unmatched:
+            unmatched[key] = list(previous.get(key, ()))
+            current[key] = []
+        hashed = fingerprint(entry)
+        current[key].append(hashed)
+        if hashed in unmatched[key]:
+            unmatched[key].remove(hashed)
+        else:
+            yield entry
+
+
+def write_csv(entries: Iterable[TimeEntry], output: BinaryIO):
+    """
+    Streams entries into a CSV file, one row at a time.
+
+    Memory use does not depend on the number of entries. Multiple notes are
+    joined with newlines into a single column.
+
+    Args:
+        entries (Iterable[TimeEntry]): The entries to export, in order.
+        output (BinaryIO): The stream to write to.
+    """
+    with _text(output) as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(EXPORT_COLUMNS)
+        for entry in entries:
+            writer.writerow(
+                (
+                    entry.start_time.strftime(TIMESTAMP_FORMAT),
+                    entry.end_time.strftime(TIMESTAMP_FORMAT),
+                    entry.activity,
+                    entry.duration_minutes,
+                    "\n".join(entry.notes),
+                )
+            )
+
+
+def write_json(entries: Iterable[TimeEntry], output: BinaryIO):
+    """
+    Streams entries into a JSON array, one entry object per line.
+
+    Args:
+        entries (Iterable[TimeEntry]): The entries to export, in order.
+        output (BinaryIO): The stream to write to.
+    """
+    with _text(output) as f:
+        f.write("[")
+        for i, entry in enumerate(entries):
+            f.write(",\n" if i else "\n")
+            f.write(entry.model_dump_json())
+        f.write("\n]\n")
+
+
+def write_xlsx(entries: Iterable[TimeEntry], output: BinaryIO):
+    """
+    Streams entries into an XLSX workbook using openpyxl's write-only mode.
+
+    Rows are written as they arrive instead of building the workbook in memory.
+    Timestamps are stored as native Excel datetimes and durations as numbers.
+
+    Args:
+        entries (Iterable[TimeEntry]): The entries to export, in order.
+        output (BinaryIO): The stream to write to.
+    """
+    # openpyxl is slow to import, so only load it when actually exporting.
+    from openpyxl import Workbook  # type: ignore
+    from openpyxl.cell import WriteOnlyCell  # type: ignore
+    from openpyxl.styles import Font  # type: ignore
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Sheet1")
+
+    header = []
+    for column in EXPORT_COLUMNS:
+        cell = WriteOnlyCell(sheet, value=column)
+        cell.font = Font(bold=True)
+        header.append(cell)
+    sheet.append(header)
+
+    for entry in entries:
+        sheet.append(
+            (
+                entry.start_time,
+                entry.end_time,
+                entry.activity,
+                entry.duration_minutes,
+                "\n".join(entry.notes),
+            )
+        )
+
+    workbook.save(zip_output(output))
+
+
+def _import_pyarrow():
+    """Imports pyarrow, which is only needed for the columnar formats."""
+    try:
+        import pyarrow  # type: ignore
+    except ImportError:
+        raise RuntimeError(
+            "The parquet and arrow formats need pyarrow. "
+            "Install it with 'pip install pyarrow'."
+        ) from None
+    return pyarrow
+
+
+def _arrow_schema(pa):
+    """Returns the Arrow schema used by the columnar formats."""
+    return pa.schema(
+        [
+            ("start_time", pa.timestamp("us")),
+            ("end_time", pa.timestamp("us")),
+            ("activity", pa.dictionary(pa.int32(), pa.string())),
+            ("duration_minutes", pa.int64()),
+            ("notes", pa.list_(pa.string())),
+        ]
+    )
+
+
+def _arrow_batches(pa, schema, entries: Iterable[TimeEntry]):
+    """
+    Yields record batches of up to ARROW_BATCH_ROWS entries.
+
+    Every batch shares one growing activity dictionary, so later batches only
+    add to it. This keeps activity codes stable across row groups and lets the
+    Arrow IPC writer emit dictionary deltas instead of replacements.
+    """
+    activities: List[str] = []
+    codes: Dict[str, int] = {}
+
+    def batch(rows: List[TimeEntry]):
+        indices = []
+        for entry in rows:
+            code = codes.get(entry.activity)
+            if code is None:
+                code = codes[entry.activity] = len(activities)
+                activities.append(entry.activity)
+            indices.append(code)
+        return pa.record_batch(
+            [
+                pa.array([e.start_time for e in rows], pa.timestamp("us")),
+                pa.array([e.end_time for e in rows], pa.timestamp("us")),
+                pa.DictionaryArray.from_arrays(
+                    pa.array(indices, pa.int32()), pa.array(activities, pa.string())
+                ),
+                pa.array([e.duration_minutes for e in rows], pa.int64()),
+                pa.array([e.notes for e in rows], pa.list_(pa.string())),
+            ],
+            schema=schema,
+        )
+
+    rows: List[TimeEntry] = []
+    for entry in entries:
+        rows.append(entry)
+        if len(rows) == ARROW_BATCH_ROWS:
+            yield batch(rows)
+            rows = []
+    if rows:
+        yield batch(rows)
+
+
+def write_parquet(entries: Iterable[TimeEntry], output: BinaryIO):
+    """
+    Streams entries into a Parquet file, one row group per batch.
+
+    Timestamps are typed, activity is dictionary-encoded and notes are a
+    list-of-strings column. Requires pyarrow.
+
+    Args:
+        entries (Iterable[TimeEntry]): The entries to export, in order.
+        output (BinaryIO): The stream to write to.
+    """
+    pa = _import_pyarrow()
+    import pyarrow.parquet as pq  # type: ignore
+
+    schema = _arrow_schema(pa)
+    with pq.ParquetWriter(output, schema) as writer:
+        for batch in _arrow_batches(pa, schema, entries):
+            writer.write_batch(batch)
+
+
+def write_arrow(entries: Iterable[TimeEntry], output: BinaryIO):
+    """
+    Streams entries into an Arrow IPC (Feather v2) file, one record batch at a
+    time, with the same columns as write_parquet. Requires pyarrow.
+
+    Args:
+        entries (Iterable[TimeEntry]): The entries to export, in order.
+        output (BinaryIO): The stream to write to.
+    """
+    pa = _import_pyarrow()
+
+    schema = _arrow_schema(pa)
+    options = pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+    with pa.ipc.new_file(output, schema, options=options) as writer:
+        for batch in _arrow_batches(pa, schema, entries):
+            writer.write_batch(batch)
+
+
+WRITERS: Dict[str, Writer] = {
+    "csv": write_csv,
+    "xlsx": write_xlsx,
+    "json": write_json,
+    "parquet": write_parquet,
+    "arrow": write_arrow,
+}
+
+
+class _Feed:
+    """A bounded queue of entry batches that one writer thread consumes."""
+
+    def __init__(self):
+        self.queue: "queue.Queue" = queue.Queue(maxsize=FANOUT_QUEUE_BATCHES)
+        self.closed = False
+
+    def __iter__(self) -> Iterator[TimeEntry]:
+        while True:
+            batch = self.queue.get()
+            if batch is None:
+                self.closed = True
+                return
+            yield from batch
+
+    def discard(self):
+        """Consumes whatever is left, so the reader never blocks on this feed."""
+        while not self.closed:
+            if self.queue.get() is None:
+                self.closed = True
+
+
+def _run_writer(writer: Writer, target: str, feed: _Feed):
+    """Writes everything from a feed to target; run in a writer thread."""
+    try:
+        with open_output(target) as output:
+            writer(feed, output)
+    finally:
+        feed.discard()
+
+
+def write_many(entries: Iterable[TimeEntry], targets: List[Tuple[Writer, str]]):
+    """
+    Reads entries once and writes them with several writers concurrently.
+
+    Each writer runs in its own thread and is fed the same batches of entries
+    through a bounded queue, so the log is only read and validated once and
+    memory use stays flat however many entries there are.
+
+    Args:
+        entries (Iterable[TimeEntry]): The entries to export, in order.
+        targets (List[Tuple[Writer, str]]): The writers and the destination
+            each one writes, as accepted by open_output.
+
+    Raises:
+        Exception: The first error raised by reading or by any writer.
+    """
+    feeds = [_Feed() for _ in targets]
+
+    with ThreadPoolExecutor(max_workers=len(targets)) as pool:
+        futures = [
+            pool.submit(_run_writer, writer, target, feed)
+            for (writer, target), feed in zip(targets, feeds)
+        ]
+        entries = iter(entries)
+        try:
+            while True:
+                batch = list(itertools.islice(entries, FANOUT_BATCH_ROWS))
+                if not batch:
+                    break
+                for feed in feeds:
+                    if not feed.closed:
+                        feed.queue.put(batch)
+        finally:
+            for feed in feeds:
+                if not feed.closed:
+                    feed.queue.put(None)
+        for future in futures:
+            future.result()
+
+
+# How each --partition-by option labels an entry, and whether its partitions
+# follow one another in start time order (so each can be closed once the next
+# one begins) or are interleaved.
+PARTITIONS: Dict[str, Tuple[Callable[[TimeEntry], str], bool]] = {
+    "month": (lambda entry: entry.start_time.strftime("%Y-%m"), True),
+    "activity": (lambda entry: entry.activity, False),
+}
+
+
+def partition_label(name: str) -> str:
+    """Turns a partition label into something safe to put in a file name."""
+    return re.sub(r"[^\w.-]+", "_", name).strip("_.") or "_"
+
+
+def part_targets(
+    directory: Path, base: str, extension: str
+) -> Callable[[Optional[str], Optional[int]], str]:
+    """
+    Returns a function naming each file of a partitioned export, e.g.
+    'base_2025-07_part002.csv'. Labels that clash once made file-name safe get
+    a numeric suffix.
+    """
+    names: Dict[str, str] = {}
+
+    def target_for(label: Optional[str], part: Optional[int]) -> str:
+        name = base
+        if label is not None:
+            if label not in names:
+                safe = unique = partition_label(label)
+                n = 2
+                while unique in names.values():
+                    unique = f"{safe}_{n}"
+                    n += 1
+                names[label] = unique
+            name += f"_{names[label]}"
+        if part is not None:
+            name += f"_part{part:03d}"
+        return str(directory / f"{name}{extension}")
+
+    return target_for
+
+
+class _Partition:
+    """One output file of a partitioned export, fed by its own writer thread."""
+
+    def __init__(self, info: ExportPart):
+        self.info = info
+        self.feed = _Feed()
+        self.batch: List[TimeEntry] = []
+
+    def add(self, entry: TimeEntry):
+        """Queues an entry, handing it to the writer once a batch is full."""
+        if self.info.first_start is None:
+            self.info.first_start = entry.start_time
+        self.info.last_start = entry.start_time
+        self.info.rows += 1
+        self.batch.append(entry)
+        if len(self.batch) == FANOUT_BATCH_ROWS:
+            self.flush()
+
+    def flush(self):
+        """Hands the pending batch to the writer."""
+        if self.batch and not self.feed.closed:
+            self.feed.queue.put(self.batch)
+        self.batch = []
+
+    def close(self):
+        """Flushes and tells the writer that no more entries are coming."""
+        self.flush()
+        if not self.feed.closed:
+            self.feed.queue.put(None)
+
+
+def write_partitioned(
+    entries: Iterable[TimeEntry],
+    writer: Writer,
+    target_for: Callable[[Optional[str], Optional[int]], str],
+    partition_by: Optional[str] = None,
+    max_rows: Optional[int] = None,
+) -> List[ExportPart]:
+    """
+    Splits entries into several files, writing them concurrently.
+
+    Entries are routed to a file per partition (see PARTITIONS) and, with
+    max_rows, a new numbered part is started whenever a file is full. Each file
+    is written by its own thread, so finished partitions keep writing while the
+    log is still being read.
+
+    Args:
+        entries (Iterable[TimeEntry]): The entries to export, in order.
+        writer (Writer): The writer for every file.
+        target_for (Callable): Returns the destination for a partition label
+            and part number (each None when not used).
+        partition_by (Optional[str]): A key of PARTITIONS, or None.
+        max_rows (Optional[int]): The most entries to put in one file.
+
+    Returns:
+        A description of every file written, in the order they were started.
+
+    Raises:
+        RuntimeError: If more than MAX_OPEN_PARTITIONS files would be open.
+        Exception: The first error raised by reading or by any writer.
+    """
+    label_of, sequential = PARTITIONS[partition_by] if partition_by else (None, True)
+    parts: List[ExportPart] = []
+    open_partitions: Dict[Tuple[Optional[str], Optional[int]], _Partition] = {}
+    rows_per_label: Dict[Optional[str], int] = {}
+    current_label: Optional[str] = None
+
+    with ThreadPoolExecutor(max_workers=MAX_OPEN_PARTITIONS) as pool:
+        futures = []
+        try:
+            for entry in entries:
+                label = label_of(entry) if label_of else None
+                if sequential and label != current_label:
+                    for key in [k for k in open_partitions if k[0] == current_label]:
+                        open_partitions.pop(key).close()
+                    current_label = label
+
+                count = rows_per_label.get(label, 0)
+                rows_per_label[label] = count + 1
+                part = count // max_rows + 1 if max_rows else None
+
+                partition = open_partitions.get((label, part))
+                if partition is None:
+                    if len(open_partitions) == MAX_OPEN_PARTITIONS:
+                        raise RuntimeError(
+                            f"More than {MAX_OPEN_PARTITIONS} partitions would be open at once."
+                        )
+                    info = ExportPart(path=target_for(label, part), partition=label, part=part)
+                    parts.append(info)
+                    partition = open_partitions[(label, part)] = _Partition(info)
+                    futures.append(pool.submit(_run_writer, writer, info.path, partition.feed))
+
+                partition.add(entry)
+                if max_rows and partition.info.rows == max_rows:
+                    open_partitions.pop((label, part)).close()
+        finally:
+            for partition in open_partitions.values():
+                partition.close()
+        for future in futures:
+            future.result()
+
+    return parts
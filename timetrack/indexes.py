@@ -0,0 +1,337 @@
+# project/timetrack/indexes.py
+"""Indexes derived from the time log, kept up to date as the log changes."""
+
+import hashlib
+import json
+import uuid
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from pathlib import Path
+from typing import ContextManager, Iterable, Iterator, List, Optional, Tuple
+
+from .models import TimeEntry, TimeLog
+from .storage import JOURNAL_COMPACT_BYTES, FileLock, LogStore, atomic_write
+
+INDEX_VERSION = 4
+
+
+def _signature(store: LogStore) -> str:
+    """
+    Returns a cheap fingerprint of the store's files, changing whenever any of
+    them does.
+
+    The files' paths, mtimes and sizes are hashed, so the fingerprint stays
+    the same size however many files the store has, such as one per day for
+    the shards backend.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for path in store.files():
+        try:
+            st = path.stat()
+            digest.update(f"{path}\0{st.st_mtime_ns}\0{st.st_size}\n".encode())
+        except FileNotFoundError:
+            digest.update(f"{path}\0-\n".encode())
+    return digest.hexdigest()
+
+
+class DerivedIndex:
+    """
+    Base class for data derived from the time log, such as the search index.
+
+    Like the JSON log store, an index is kept as a snapshot plus an
+    append-only journal: each change to the log appends one small record, and
+    the journal is folded into the snapshot once it grows past
+    JOURNAL_COMPACT_BYTES. The snapshot's first line is a header, so a write
+    can check the index is current without parsing the rest. Each snapshot
+    gets a new id, which the journal's first line names, so a journal left
+    behind by an interrupted fold is recognised and not replayed twice.
+
+    The index records a fingerprint of the log store's files and is rebuilt
+    from the log if they were changed by anything that did not update it.
+    Rebuilds, folds and journal appends happen under the data directory's
+    lock, like every other write, so they cannot interleave with a change to
+    the log.
+
+    Subclasses implement _empty, _add and _remove. Entries are passed to them
+    as docs, lists of [start, end, activity, notes, duration_minutes] with the
+    times in ISO format. Subclasses that need to read part of the snapshot
+    without loading it can lay it out themselves by overriding _dump and
+    _parse.
+
+    Args:
+        path (Path): The index snapshot.
+        journal_file (Path): The JSONL journal of changes since the snapshot.
+        lock (Optional[FileLock]): The lock writers to the log hold. Without
+            one, writes to the index are not serialized.
+    """
+
+    def __init__(self, path: Path, journal_file: Path, lock: Optional[FileLock] = None):
+        self.path = path
+        self.journal_file = journal_file
+        self._lock = lock
+
+    def _locked(self) -> ContextManager:
+        """Returns a context holding the lock, if there is one."""
+        return self._lock if self._lock is not None else nullcontext()
+
+    def _empty(self) -> dict:
+        """Returns the data of an index with no entries."""
+        raise NotImplementedError
+
+    def _add(self, data: dict, doc: list):
+        """Adds an entry to the data."""
+        raise NotImplementedError
+
+    def _remove(self, data: dict, doc: list):
+        """Removes an entry from the data."""
+        raise NotImplementedError
+
+    @staticmethod
+    def _doc(entry: TimeEntry) -> list:
+        """Returns an entry as a doc."""
+        return [
+            entry.start_time.isoformat(),
+            entry.end_time.isoformat(),
+            entry.activity,
+            entry.notes,
+            entry.duration_minutes,
+        ]
+
+    def exists(self) -> bool:
+        """Returns True if the index has been built."""
+        return self.path.exists()
+
+    def _read_header(self) -> Optional[dict]:
+        """Reads the snapshot's header line, or returns None if there is no usable index."""
+        try:
+            with self.path.open("rb") as f:
+                header = json.loads(f.readline())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if header.get("version") != INDEX_VERSION:
+            return None
+        return header
+
+    def _read_journal(self, header: dict) -> Optional[List[dict]]:
+        """
+        Reads the journal records, skipping any torn or malformed lines.
+
+        Returns:
+            The records, or None if there is no journal for this snapshot.
+        """
+        if not self.journal_file.exists():
+            return None
+        records = []
+        with self.journal_file.open(encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+        if not records or records[0].get("base") != header["id"]:
+            return None
+        return records[1:]
+
+    def _current_journal(self, header: dict, store: LogStore) -> Optional[List[dict]]:
+        """
+        Returns the journal records on top of the snapshot with header, or
+        None if together they are stale for the store.
+        """
+        records = self._read_journal(header) or []
+        current = records[-1]["signature"] if records else header["signature"]
+        return records if current == _signature(store) else None
+
+    def _dump(self, body: dict) -> Tuple[dict, bytes]:
+        """
+        Serializes the index data for the snapshot.
+
+        Returns:
+            A tuple of (fields to add to the header, snapshot body).
+        """
+        return {}, json.dumps(body, separators=(",", ":")).encode()
+
+    def _parse(self, header: dict, body: bytes) -> dict:
+        """Reads the index data back from the snapshot body."""
+        return json.loads(body)
+
+    def _load(self) -> Optional[dict]:
+        """Reads the snapshot and replays the journal, or returns None if there is no usable index."""
+        try:
+            header_line, _, body = self.path.read_bytes().partition(b"\n")
+            header = json.loads(header_line)
+            if header.get("version") != INDEX_VERSION:
+                return None
+            data = self._parse(header, body)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        data["signature"] = header["signature"]
+
+        for record in self._read_journal(header) or []:
+            for doc in record["remove"]:
+                self._remove(data, doc)
+            for doc in record["add"]:
+                self._add(data, doc)
+            data["signature"] = record["signature"]
+        return data
+
+    def _save(self, data: dict):
+        """Writes a full snapshot of the index and clears the journal."""
+        fields, body = self._dump({k: v for k, v in data.items() if k != "signature"})
+        header = {
+            "version": INDEX_VERSION,
+            "id": uuid.uuid4().hex,
+            "signature": data["signature"],
+            **fields,
+        }
+        atomic_write(self.path, json.dumps(header).encode() + b"\n" + body)
+        self.journal_file.unlink(missing_ok=True)
+
+    def build(self, entries: Iterable[TimeEntry], signature: str) -> dict:
+        """Builds the index from scratch and saves it."""
+        data = self._empty()
+        for entry in entries:
+            self._add(data, self._doc(entry))
+        data["signature"] = signature
+        with self._locked():
+            self._save(data)
+        return data
+
+    def rebuild(self, store: LogStore) -> dict:
+        """Builds the index from the store's log."""
+        with self._locked():
+            return self.build(store.iter_log(), _signature(store))
+
+    def load_current(self, store: LogStore) -> dict:
+        """Returns the index for the store, rebuilding it if it is missing or stale."""
+        data = self._load()
+        if data is not None and data["signature"] == _signature(store):
+            return data
+        with self._locked():
+            # Another process may have brought it up to date while we waited.
+            data = self._load()
+            if data is None or data["signature"] != _signature(store):
+                data = self.rebuild(store)
+            return data
+
+    def update(
+        self,
+        before: str,
+        after: str,
+        removed: Iterable[TimeEntry] = (),
+        added: Iterable[TimeEntry] = (),
+    ):
+        """
+        Records a change to the log in the index's journal.
+
+        Nothing is done if there is no index yet, or if it was already stale
+        before the change; it is then rebuilt the next time it is used.
+
+        Args:
+            before: The store's fingerprint before the change.
+            after: The store's fingerprint after the change.
+            removed: The entries the change removed.
+            added: The entries the change added.
+        """
+        with self._locked():
+            header = self._read_header()
+            if header is None:
+                return
+            records = self._read_journal(header)
+            current = records[-1]["signature"] if records else header["signature"]
+            if current != before:
+                return
+
+            # Start a new journal if there is none for this snapshot.
+            mode, lines = ("a", []) if records is not None else ("w", [{"base": header["id"]}])
+            lines.append(
+                {
+                    "signature": after,
+                    "remove": [self._doc(e) for e in removed],
+                    "add": [self._doc(e) for e in added],
+                }
+            )
+            with self.journal_file.open(mode, encoding="utf-8") as f:
+                f.write("".join(json.dumps(line) + "\n" for line in lines))
+                journal_size = f.tell()
+            if journal_size > JOURNAL_COMPACT_BYTES:
+                data = self._load()
+                if data is not None:
+                    self._save(data)
+
+
+class IndexedLogStore(LogStore):
+    """
+    Wraps a LogStore, keeping derived indexes up to date as entries are added,
+    replaced and removed.
+
+    Args:
+        store (LogStore): The store to wrap.
+        indexes (List[DerivedIndex]): The indexes to keep up to date.
+    """
+
+    def __init__(self, store: LogStore, indexes: List[DerivedIndex]):
+        self.store = store
+        self.indexes = indexes
+
+    def files(self) -> List[Path]:
+        """Returns the wrapped store's files."""
+        return self.store.files()
+
+    def read_log(self) -> TimeLog:
+        """Reads the log from the wrapped store."""
+        return self.store.read_log()
+
+    def write_log(self, log: TimeLog):
+        """Writes the log and rebuilds the indexes that exist from it."""
+        self.store.write_log(log)
+        signature = _signature(self.store)
+        for index in self.indexes:
+            if index.exists():
+                index.build(log.entries, signature)
+
+    def has_entries(self) -> bool:
+        """Asks the wrapped store."""
+        return self.store.has_entries()
+
+    def entries_between(self, start: datetime, end: datetime) -> List[TimeEntry]:
+        """Reads a range from the wrapped store."""
+        return self.store.entries_between(start, end)
+
+    def iter_log(
+        self, start: Optional[datetime] = None, end: Optional[datetime] = None
+    ) -> Iterator[TimeEntry]:
+        """Streams a range from the wrapped store."""
+        return self.store.iter_log(start, end)
+
+    @contextmanager
+    def _updating(self, removed: Iterable[TimeEntry] = (), added: Iterable[TimeEntry] = ()):
+        """Applies the change made in the block to the indexes that exist."""
+        indexes = [index for index in self.indexes if index.exists()]
+        if not indexes:
+            yield
+            return
+        before = _signature(self.store)
+        yield
+        after = _signature(self.store)
+        for index in indexes:
+            index.update(before, after, removed, added)
+
+    def append_entry(self, entry: TimeEntry):
+        """Appends the entry and adds it to the indexes."""
+        with self._updating(added=[entry]):
+            self.store.append_entry(entry)
+
+    def replace_entry(self, original: TimeEntry, updated: TimeEntry):
+        """Replaces the entry and re-indexes it."""
+        with self._updating(removed=[original], added=[updated]):
+            self.store.replace_entry(original, updated)
+
+    def remove_entry(self, entry: TimeEntry):
+        """Removes the entry and drops it from the indexes."""
+        with self._updating(removed=[entry]):
+            self.store.remove_entry(entry)
+
+    def compact(self) -> int:
+        """Compacts the wrapped store, which changes its files but not the entries."""
+        with self._updating():
+            return self.store.compact()
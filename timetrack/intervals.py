@@ -0,0 +1,178 @@
+# project/timetrack/intervals.py
+"""Finding entries whose times overlap."""
+
+import heapq
+import json
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+from .indexes import INDEX_VERSION, DerivedIndex
+from .models import TimeEntry
+from .storage import LogStore
+
+T = TypeVar("T")
+
+# (start, end, activity), with the times in ISO format.
+Interval = Tuple[str, str, str]
+
+
+class IntervalIndex(DerivedIndex):
+    """
+    Every entry's start time, end time and activity, sorted by start.
+
+    ISO timestamps sort in time order, so they are compared as strings. The
+    snapshot stores the entries in blocks of BLOCK_ROWS, and its header lists
+    each block's first start, latest end and byte range. Only a block that
+    starts before the end of the time being checked and ends after its start
+    can hold an overlap, so a check reads the header, the journal and just
+    those blocks rather than the whole index. A long entry only pulls in the
+    block it starts in.
+    """
+
+    BLOCK_ROWS = 512
+
+    def _empty(self) -> dict:
+        return {"starts": [], "ends": [], "activities": []}
+
+    def _add(self, data: dict, doc: list):
+        i = bisect_right(data["starts"], doc[0])
+        data["starts"].insert(i, doc[0])
+        data["ends"].insert(i, doc[1])
+        data["activities"].insert(i, doc[2])
+
+    def _remove(self, data: dict, doc: list):
+        starts = data["starts"]
+        i = bisect_left(starts, doc[0])
+        while i < len(starts) and starts[i] == doc[0]:
+            if data["ends"][i] == doc[1] and data["activities"][i] == doc[2]:
+                del starts[i], data["ends"][i], data["activities"][i]
+                return
+            i += 1
+
+    def _dump(self, body: dict) -> Tuple[dict, bytes]:
+        starts, ends, activities = body["starts"], body["ends"], body["activities"]
+        blocks, parts, offset = [], [], 0
+        for lo in range(0, len(starts), self.BLOCK_ROWS):
+            hi = lo + self.BLOCK_ROWS
+            rows = list(zip(starts[lo:hi], ends[lo:hi], activities[lo:hi]))
+            raw = json.dumps(rows, separators=(",", ":")).encode() + b"\n"
+            blocks.append([starts[lo], max(ends[lo:hi]), offset, len(raw)])
+            parts.append(raw)
+            offset += len(raw)
+        return {"blocks": blocks}, b"".join(parts)
+
+    def _parse(self, header: dict, body: bytes) -> dict:
+        data = self._empty()
+        for _, _, offset, length in header["blocks"]:
+            for start, end, activity in json.loads(body[offset:offset + length]):
+                data["starts"].append(start)
+                data["ends"].append(end)
+                data["activities"].append(activity)
+        return data
+
+    def _read_candidates(
+        self, store: LogStore, start_key: str, end_key: str
+    ) -> Optional[List[list]]:
+        """
+        Reads the entries that may overlap start_key to end_key from the
+        blocks that can hold them, plus the journal.
+
+        Returns:
+            The entries as [start, end, activity], or None if there is no
+            index or it is stale for the store.
+        """
+        try:
+            f = self.path.open("rb")
+        except FileNotFoundError:
+            return None
+        with f:
+            try:
+                header = json.loads(f.readline())
+            except json.JSONDecodeError:
+                return None
+            if header.get("version") != INDEX_VERSION:
+                return None
+            records = self._current_journal(header, store)
+            if records is None:
+                return None
+
+            body_start = f.tell()
+            rows = []
+            for first_start, max_end, offset, length in header["blocks"]:
+                if first_start >= end_key:
+                    break
+                if max_end <= start_key:
+                    continue
+                f.seek(body_start + offset)
+                rows.extend(json.loads(f.read(length)))
+
+        # An entry that can overlap is always in a block that was read, so a
+        # removal of one that was not read does not matter.
+        for record in records:
+            for doc in record["remove"]:
+                if doc[:3] in rows:
+                    rows.remove(doc[:3])
+            for doc in record["add"]:
+                rows.append(doc[:3])
+        return rows
+
+    def overlapping(
+        self,
+        store: LogStore,
+        start: datetime,
+        end: datetime,
+        ignore: Optional[TimeEntry] = None,
+    ) -> List[Interval]:
+        """
+        Finds the entries that overlap start to end. Entries that only touch
+        it, ending exactly at start or starting exactly at end, do not count.
+
+        Args:
+            store: The log store the index is for.
+            start: The start of the time to check.
+            end: The end of the time to check.
+            ignore: An entry to leave out, such as the one being edited.
+
+        Returns:
+            The overlapping entries as (start, end, activity), latest start first.
+        """
+        start_key, end_key = start.isoformat(), end.isoformat()
+        rows = self._read_candidates(store, start_key, end_key)
+        if rows is None:
+            data = self.load_current(store)
+            rows = [list(row) for row in zip(data["starts"], data["ends"], data["activities"])]
+
+        found: List[Interval] = [
+            (row[0], row[1], row[2]) for row in rows if row[0] < end_key and row[1] > start_key
+        ]
+        if ignore is not None:
+            ignored = (ignore.start_time.isoformat(), ignore.end_time.isoformat(), ignore.activity)
+            if ignored in found:
+                found.remove(ignored)
+        found.sort(reverse=True)
+        return found
+
+
+def find_overlaps(
+    items: Iterable[Tuple[TimeEntry, T]]
+) -> Iterator[Tuple[Tuple[TimeEntry, T], Tuple[TimeEntry, T]]]:
+    """
+    Finds every pair of overlapping entries with a sweep line.
+
+    Args:
+        items: Entries in start time order, each with a label that is passed
+            through to the results.
+
+    Yields:
+        Each overlapping pair, earlier start first, ordered by the later start.
+    """
+    # Entries still running at the sweep position, by end time.
+    active: List[Tuple[datetime, int, Tuple[TimeEntry, T]]] = []
+    for n, item in enumerate(items):
+        entry = item[0]
+        while active and active[0][0] <= entry.start_time:
+            heapq.heappop(active)
+        for _, _, other in sorted(active, key=lambda a: (a[2][0].start_time, a[1])):
+            yield other, item
+        heapq.heappush(active, (entry.end_time, n, item))
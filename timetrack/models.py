@@ -2,7 +2,7 @@
 """Pydantic models for the timetrack application."""
 
 from typing import Dict, List, Optional
-from pydantic import BaseModel, Field  # type: ignore
+from pydantic import BaseModel, Field, field_validator  # type: ignore
 from datetime import datetime
 
 
@@ -62,9 +62,11 @@ class Config(BaseModel):
 
     Args:
         aliases (Dict[str, str]): A mapping of alias names to full activity names.
+        storage (str): The time log storage backend: 'json', 'sqlite', 'shards' or 'binary'.
     """
 
     aliases: Dict[str, str] = Field(default_factory=dict)
+    storage: str = "json"
 
 
 class Memo(BaseModel):
@@ -89,3 +91,66 @@ class MemoList(BaseModel):
     """
 
     memos: List[Memo] = Field(default_factory=list)
+
+
+class ExportWatermark(BaseModel):
+    """
+    Records what the last incremental export wrote (export_watermark.json).
+
+    Args:
+        exported_at (datetime): When the last incremental export ran.
+        fingerprints (Dict[str, List[str]]): A content hash of every entry at
+            that time, grouped by the entry's ISO start time. Entries that share
+            a start time each keep their own hash.
+    """
+
+    exported_at: datetime
+    fingerprints: Dict[str, List[str]] = Field(default_factory=dict)
+
+    @field_validator("fingerprints", mode="before")
+    @classmethod
+    def _one_hash_per_start(cls, value):
+        """Reads watermarks written with a single hash per start time."""
+        if isinstance(value, dict):
+            return {k: [v] if isinstance(v, str) else v for k, v in value.items()}
+        return value
+
+
+class ExportPart(BaseModel):
+    """
+    Describes one file written by a partitioned export.
+
+    Args:
+        path (str): Where the file was written.
+        partition (Optional[str]): The month or activity it holds, if partitioned.
+        part (Optional[int]): Its number within the partition, if split by rows.
+        rows (int): The number of entries in the file.
+        first_start (Optional[datetime]): The start time of its first entry.
+        last_start (Optional[datetime]): The start time of its last entry.
+    """
+
+    path: str
+    partition: Optional[str] = None
+    part: Optional[int] = None
+    rows: int = 0
+    first_start: Optional[datetime] = None
+    last_start: Optional[datetime] = None
+
+
+class ExportManifest(BaseModel):
+    """
+    Lists the files written by a partitioned export (*_manifest.json).
+
+    Args:
+        created_at (datetime): When the export ran.
+        format (str): The file format of every part.
+        partition_by (Optional[str]): 'month', 'activity', or None.
+        max_rows (Optional[int]): The row cap per file, if any.
+        files (List[ExportPart]): The files, in the order they were started.
+    """
+
+    created_at: datetime
+    format: str
+    partition_by: Optional[str] = None
+    max_rows: Optional[int] = None
+    files: List[ExportPart] = Field(default_factory=list)
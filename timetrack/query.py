@@ -0,0 +1,298 @@
+# project/timetrack/query.py
+"""A small filter language over time entries, used by --where."""
+
+import operator
+import re
+from datetime import date, datetime, time, timedelta
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+from .models import TimeEntry
+
+Predicate = Callable[[TimeEntry], bool]
+
+_TOKEN = re.compile(
+    r"""\s*(?:
+        (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+      | (?P<op>==|!=|<=|>=|!~|=|<|>|~)
+      | (?P<paren>[()])
+      | (?P<word>[^\s()=!<>~"']+)
+    )""",
+    re.VERBOSE,
+)
+_KEYWORDS = {"and", "or", "not"}
+_ORDERING = {
+    "=": operator.eq,
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+_DURATION = re.compile(r"^(?:(?P<hours>\d+)h)?(?:(?P<minutes>\d+)m?)?$")
+
+
+class QueryError(ValueError):
+    """Raised when a --where expression cannot be parsed."""
+
+
+def _parse_date(text: str) -> date:
+    """Parses 'today', 'yesterday', 'YYYY-MM-DD' or 'DD-MM-YYYY'."""
+    lowered = text.lower()
+    if lowered == "today":
+        return date.today()
+    if lowered == "yesterday":
+        return date.today() - timedelta(days=1)
+    for fmt in ("%Y-%m-%d", "%d-%m-%Y"):
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            pass
+    raise QueryError(f"'{text}' is not a date (use YYYY-MM-DD or DD-MM-YYYY).")
+
+
+def _parse_datetime(text: str) -> datetime:
+    """
+    Parses a date as above, or an ISO date and time such as '2025-07-01T09:30'.
+
+    A time with a UTC offset is converted to naive local time, as 'track add'
+    stores it.
+    """
+    try:
+        return datetime.combine(_parse_date(text), time.min)
+    except QueryError:
+        pass
+    try:
+        moment = datetime.fromisoformat(text)
+    except ValueError:
+        raise QueryError(f"'{text}' is not a date or time.") from None
+    if moment.tzinfo is not None:
+        moment = moment.astimezone().replace(tzinfo=None)
+    return moment
+
+
+def _parse_minutes(text: str) -> int:
+    """Parses minutes given as '90', '90m', '1h' or '1h30m'."""
+    match = _DURATION.match(text)
+    if not text or not match:
+        raise QueryError(f"'{text}' is not a duration (use e.g. 90, 45m or 1h30m).")
+    return int(match.group("hours") or 0) * 60 + int(match.group("minutes") or 0)
+
+
+# Each field: how to read it from an entry, and how to parse a value for it.
+# String fields support =, != and the regex match operators ~ and !~; the
+# others support ordering comparisons.
+_FIELDS: dict = {
+    "activity": (lambda e: e.activity, str),
+    "notes": (lambda e: e.notes, str),
+    "duration": (lambda e: e.duration_minutes, _parse_minutes),
+    "day": (lambda e: e.start_time.date(), _parse_date),
+    "start": (lambda e: e.start_time, _parse_datetime),
+    "end": (lambda e: e.end_time, _parse_datetime),
+}
+_STRING_FIELDS = {"activity", "notes"}
+
+
+class Query:
+    """
+    A compiled --where expression.
+
+    Comparisons on 'day' and 'start' that apply to every match (those joined
+    to the rest by 'and') are turned into start/end bounds on start_time, so
+    stores can read just that range, and are not re-checked per entry.
+
+    Args:
+        text (str): The expression, e.g.
+            'activity ~ "review" and duration > 30 and day >= 2025-07-01'.
+
+    Raises:
+        QueryError: If the expression is invalid.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.start: Optional[datetime] = None
+        self.end: Optional[datetime] = None
+        self._tokens = self._tokenize(text)
+        self._pos = 0
+
+        conjuncts = self._parse_and_chain()
+        while self._accept("word", "or"):
+            # Anything or-ed at the top level cannot be turned into bounds.
+            rest = self._parse_and_chain()
+            conjuncts = [self._any([self._all(conjuncts), self._all(rest)])]
+        if self._pos < len(self._tokens):
+            raise QueryError(f"Unexpected '{self._tokens[self._pos][1]}'.")
+
+        residual = []
+        for term in conjuncts:
+            if isinstance(term, tuple):
+                self._narrow(*term)
+            else:
+                residual.append(term)
+        self._predicate: Optional[Predicate] = self._all(residual) if residual else None
+
+    @staticmethod
+    def _tokenize(text: str) -> List[Tuple[str, str]]:
+        tokens = []
+        pos = 0
+        text = text.strip()
+        while pos < len(text):
+            match = _TOKEN.match(text, pos)
+            if not match or match.end() == pos:
+                raise QueryError(f"Cannot read '{text[pos:]}'.")
+            kind = match.lastgroup or ""
+            value = match.group(kind)
+            if kind == "string":
+                value = re.sub(r"\\(.)", r"\1", value[1:-1])
+            elif kind == "word" and value.lower() in _KEYWORDS:
+                value = value.lower()
+            tokens.append((kind, value))
+            pos = match.end()
+        if not tokens:
+            raise QueryError("The expression is empty.")
+        return tokens
+
+    def _peek(self) -> Tuple[str, str]:
+        return self._tokens[self._pos] if self._pos < len(self._tokens) else ("end", "")
+
+    def _accept(self, kind: str, value: Optional[str] = None) -> Optional[str]:
+        token_kind, token_value = self._peek()
+        if token_kind == kind and (value is None or token_value == value):
+            self._pos += 1
+            return token_value
+        return None
+
+    def _expect(self, kind: str, what: str) -> str:
+        value = self._accept(kind)
+        if value is None:
+            found = self._peek()[1] or "the end"
+            raise QueryError(f"Expected {what}, found '{found}'.")
+        return value
+
+    @staticmethod
+    def _all(terms: List[Any]) -> Predicate:
+        checks = [Query._as_predicate(t) for t in terms]
+        return lambda e: all(check(e) for check in checks)
+
+    @staticmethod
+    def _any(terms: List[Any]) -> Predicate:
+        checks = [Query._as_predicate(t) for t in terms]
+        return lambda e: any(check(e) for check in checks)
+
+    @staticmethod
+    def _as_predicate(term: Any) -> Predicate:
+        """Turns a range term back into a predicate where bounds cannot be used."""
+        if not isinstance(term, tuple):
+            return term
+        field, op, value = term
+        get = _FIELDS[field][0]
+        compare = _ORDERING[op]
+        return lambda e: compare(get(e), value)
+
+    def _parse_and_chain(self) -> List[Any]:
+        """Parses 'a and b and ...', returning each operand."""
+        terms = [self._parse_unary()]
+        while self._accept("word", "and"):
+            terms.append(self._parse_unary())
+        return terms
+
+    def _parse_or(self) -> Predicate:
+        terms = [self._all(self._parse_and_chain())]
+        while self._accept("word", "or"):
+            terms.append(self._all(self._parse_and_chain()))
+        return terms[0] if len(terms) == 1 else self._any(terms)
+
+    def _parse_unary(self) -> Any:
+        if self._accept("word", "not"):
+            inner = self._as_predicate(self._parse_unary())
+            return lambda e: not inner(e)
+        if self._accept("paren", "("):
+            inner = self._parse_or()
+            self._expect("paren", "')'")
+            return inner
+        return self._parse_comparison()
+
+    def _parse_comparison(self) -> Any:
+        field = self._expect("word", "a field name").lower()
+        if field not in _FIELDS:
+            raise QueryError(f"Unknown field '{field}'. Use one of: {', '.join(_FIELDS)}.")
+        op = self._expect("op", f"an operator after '{field}'")
+        kind, raw = self._peek()
+        if kind not in ("string", "word") or (kind == "word" and raw in _KEYWORDS):
+            raise QueryError(f"Expected a value after '{field} {op}'.")
+        self._pos += 1
+
+        get, parse = _FIELDS[field]
+        if op in ("~", "!~"):
+            if field not in _STRING_FIELDS:
+                raise QueryError(f"'{op}' only works on activity and notes.")
+            try:
+                pattern = re.compile(raw, re.IGNORECASE)
+            except re.error as e:
+                raise QueryError(f"Bad pattern '{raw}': {e}.") from None
+            if field == "notes":
+                found: Predicate = lambda e: any(pattern.search(n) for n in e.notes)
+            else:
+                found = lambda e: pattern.search(e.activity) is not None
+            return found if op == "~" else (lambda e: not found(e))
+
+        value = parse(raw)
+        compare = _ORDERING[op]
+        if field in _STRING_FIELDS:
+            if op not in ("=", "==", "!="):
+                raise QueryError(f"'{op}' does not work on {field}; use =, !=, ~ or !~.")
+            if field == "notes":
+                if op == "!=":
+                    return lambda e: value not in e.notes
+                return lambda e: value in e.notes
+        if field in ("day", "start") and op != "!=":
+            return (field, op, value)
+        return lambda e: compare(get(e), value)
+
+    def _narrow(self, field: str, op: str, value: Any):
+        """Intersects the bounds with a range term on day or start."""
+        if field == "day":
+            day_start = datetime.combine(value, time.min)
+            day_end = day_start + timedelta(days=1)
+            lower = {">=": day_start, ">": day_end, "=": day_start, "==": day_start}.get(op)
+            upper = {"<": day_start, "<=": day_end, "=": day_end, "==": day_end}.get(op)
+        else:
+            tick = timedelta(microseconds=1)
+            lower = {">=": value, ">": value + tick, "=": value, "==": value}.get(op)
+            upper = {"<": value, "<=": value + tick, "=": value + tick, "==": value + tick}.get(op)
+        if lower is not None and (self.start is None or lower > self.start):
+            self.start = lower
+        if upper is not None and (self.end is None or upper < self.end):
+            self.end = upper
+
+    def bounds(
+        self, start: Optional[datetime] = None, end: Optional[datetime] = None
+    ) -> Tuple[Optional[datetime], Optional[datetime]]:
+        """Intersects the query's start_time bounds with another range."""
+        if self.start is not None and (start is None or self.start > start):
+            start = self.start
+        if self.end is not None and (end is None or self.end < end):
+            end = self.end
+        return start, end
+
+    def matches(self, entry: TimeEntry) -> bool:
+        """Checks an entry against the whole expression, bounds included."""
+        if self.start is not None and entry.start_time < self.start:
+            return False
+        if self.end is not None and entry.start_time >= self.end:
+            return False
+        return self._predicate is None or self._predicate(entry)
+
+    def filter(self, entries: Iterable[TimeEntry]) -> Iterator[TimeEntry]:
+        """
+        Yields the entries that match, assuming they were already read within
+        bounds(), so only the rest of the expression is checked.
+        """
+        if self._predicate is None:
+            yield from entries
+            return
+        predicate = self._predicate
+        for entry in entries:
+            if predicate(entry):
+                yield entry
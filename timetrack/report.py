@@ -0,0 +1,131 @@
+# project/timetrack/report.py
+"""Summary reports over the time log, aggregated with pandas."""
+
+from typing import BinaryIO, Dict, Iterable
+
+from .export import zip_output
+from .models import TimeEntry
+
+
+def entries_frame(entries: Iterable[TimeEntry]):
+    """
+    Builds a DataFrame with start_time, activity and duration_minutes columns.
+
+    The columns are collected as plain lists and converted in one go, rather
+    than creating a dict per entry.
+
+    Args:
+        entries (Iterable[TimeEntry]): The entries to include.
+
+    Returns:
+        A pandas DataFrame with one row per entry.
+    """
+    # pandas is slow to import, so only load it when building a report.
+    import pandas as pd  # type: ignore
+
+    starts, activities, minutes = [], [], []
+    for entry in entries:
+        starts.append(entry.start_time)
+        activities.append(entry.activity)
+        minutes.append(entry.duration_minutes)
+
+    return pd.DataFrame(
+        {
+            "start_time": pd.to_datetime(pd.Series(starts, dtype="object")),
+            "activity": pd.Categorical(activities),
+            "duration_minutes": pd.Series(minutes, dtype="int64"),
+        }
+    )
+
+
+def _days(df):
+    """Returns each entry's start date, as midnight timestamps."""
+    return df["start_time"].dt.normalize().rename("date")
+
+
+def _totals(df, by):
+    """Sums minutes and counts entries per group, adding an hours column."""
+    grouped = df.groupby(by, observed=True)["duration_minutes"].agg(
+        minutes="sum", entries="size"
+    )
+    grouped.insert(1, "hours", (grouped["minutes"] / 60).round(2))
+    return grouped
+
+
+def daily_totals(df):
+    """Returns minutes, hours and entries per day, indexed by date."""
+    daily = _totals(df, _days(df))
+    daily.index = daily.index.date
+    daily.index.name = "date"
+    return daily
+
+
+def weekly_totals(df):
+    """Returns minutes, hours and entries per week, indexed by its Monday."""
+    import pandas as pd  # type: ignore
+
+    day = _days(df)
+    week = (day - pd.to_timedelta(day.dt.weekday, unit="D")).rename("week_start")
+    weekly = _totals(df, week)
+    weekly.index = weekly.index.date
+    weekly.index.name = "week_start"
+    return weekly
+
+
+def activity_by_day(df):
+    """Returns a date x activity table of minutes."""
+    by_day = df.pivot_table(
+        index=_days(df),
+        columns="activity",
+        values="duration_minutes",
+        aggfunc="sum",
+        fill_value=0,
+        observed=True,
+    )
+    by_day.index = by_day.index.date
+    by_day.index.name = "date"
+    return by_day
+
+
+def activity_totals(df):
+    """Returns minutes, hours, entries and share of the total per activity, largest first."""
+    totals = _totals(df, "activity").sort_values("minutes", ascending=False)
+    total_minutes = totals["minutes"].sum()
+    totals["share_%"] = (
+        (totals["minutes"] / total_minutes * 100).round(1) if total_minutes else 0.0
+    )
+    return totals
+
+
+def summarize(df) -> Dict[str, "object"]:
+    """
+    Aggregates a frame from entries_frame into the report workbook's tables.
+
+    Args:
+        df (pd.DataFrame): The entries, as returned by entries_frame.
+
+    Returns:
+        A dict of sheet name to DataFrame.
+    """
+    return {
+        "Daily Totals": daily_totals(df),
+        "Weekly Totals": weekly_totals(df),
+        "Activity by Day": activity_by_day(df),
+        "Activity Totals": activity_totals(df),
+    }
+
+
+def write_report(entries: Iterable[TimeEntry], output: BinaryIO):
+    """
+    Writes a workbook with one sheet per table from summarize.
+
+    Args:
+        entries (Iterable[TimeEntry]): The entries to report on.
+        output (BinaryIO): The stream to write the workbook to.
+    """
+    import pandas as pd  # type: ignore
+
+    sheets = summarize(entries_frame(entries))
+    with pd.ExcelWriter(zip_output(output), engine="openpyxl") as writer:
+        for name, frame in sheets.items():
+            frame.to_excel(writer, sheet_name=name)
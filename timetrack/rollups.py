@@ -0,0 +1,71 @@
+# project/timetrack/rollups.py
+"""Daily rollups: minutes and entry counts per day and activity."""
+
+from datetime import date
+from typing import Dict, Iterable, List, Optional
+
+from .indexes import DerivedIndex
+from .models import TimeEntry
+from .storage import LogStore
+
+# Day ('YYYY-MM-DD') -> activity -> [minutes, entries].
+DayTotals = Dict[str, Dict[str, List[int]]]
+
+
+def _add_doc(days: DayTotals, doc: list):
+    totals = days.setdefault(doc[0][:10], {}).setdefault(doc[2], [0, 0])
+    totals[0] += doc[4]
+    totals[1] += 1
+
+
+def tally(entries: Iterable[TimeEntry]) -> DayTotals:
+    """Totals entries per day and activity, in the same shape as Rollups.between."""
+    days: DayTotals = {}
+    for entry in entries:
+        _add_doc(days, DerivedIndex._doc(entry))
+    return days
+
+
+class Rollups(DerivedIndex):
+    """
+    Minutes and entry counts per day and activity, by the day each entry
+    started, so totals over a range of days do not need to read the entries.
+    """
+
+    def _empty(self) -> dict:
+        return {"days": {}}
+
+    def _add(self, data: dict, doc: list):
+        _add_doc(data["days"], doc)
+
+    def _remove(self, data: dict, doc: list):
+        day = doc[0][:10]
+        activities = data["days"].get(day)
+        if activities is None or doc[2] not in activities:
+            return
+        totals = activities[doc[2]]
+        totals[0] -= doc[4]
+        totals[1] -= 1
+        if totals[1] <= 0:
+            del activities[doc[2]]
+            if not activities:
+                del data["days"][day]
+
+    def between(
+        self, store: LogStore, first: Optional[date] = None, last: Optional[date] = None
+    ) -> DayTotals:
+        """
+        Returns the totals for each day with entries from first to last.
+
+        Args:
+            store: The log store the rollups are for.
+            first: The first day, or None for no lower bound.
+            last: The last day (inclusive), or None for no upper bound.
+
+        Returns:
+            A dict of day ('YYYY-MM-DD') to a dict of activity to [minutes, entries].
+        """
+        days: DayTotals = self.load_current(store)["days"]
+        low = first.isoformat() if first else ""
+        high = last.isoformat() if last else "9999-12-31"
+        return {day: totals for day, totals in days.items() if low <= day <= high}
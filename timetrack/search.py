@@ -0,0 +1,109 @@
+# project/timetrack/search.py
+"""Full-text search over activities and notes, backed by an inverted index."""
+
+import re
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+
+from .indexes import DerivedIndex
+from .models import TimeEntry
+from .storage import LogStore
+
+_WORD = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Splits text into lowercase words."""
+    return _WORD.findall(text.lower())
+
+
+def _entry_tokens(activity: str, notes: List[str]) -> Set[str]:
+    """Returns the words in an entry's activity and notes."""
+    tokens = set(tokenize(activity))
+    for note in notes:
+        tokens.update(tokenize(note))
+    return tokens
+
+
+class SearchIndex(DerivedIndex):
+    """
+    An inverted index from words to the entries whose activity or notes
+    contain them.
+
+    Entries are keyed by their start time, with a list of entries per key as
+    several can share one. Each entry's end time, activity, notes and
+    duration are kept alongside, so results can be shown without reading the
+    log. A word's postings hold a key once for each entry there containing it.
+    """
+
+    def _empty(self) -> dict:
+        return {"docs": {}, "postings": {}}
+
+    def _add(self, data: dict, doc: list):
+        key = doc[0]
+        data["docs"].setdefault(key, []).append(doc[1:])
+        for token in _entry_tokens(doc[2], doc[3]):
+            data["postings"].setdefault(token, []).append(key)
+
+    def _remove(self, data: dict, doc: list):
+        key = doc[0]
+        stored = data["docs"].get(key)
+        if stored is None or doc[1:] not in stored:
+            return
+        stored.remove(doc[1:])
+        if not stored:
+            del data["docs"][key]
+        postings = data["postings"]
+        for token in _entry_tokens(doc[2], doc[3]):
+            keys = postings.get(token)
+            if keys is None:
+                continue
+            keys.remove(key)
+            if not keys:
+                del postings[token]
+
+    def search(self, store: LogStore, text: str) -> List[TimeEntry]:
+        """
+        Finds the entries containing every word in text, newest first. A word
+        also matches longer words it starts, so 'migrat' finds 'migration'.
+
+        Args:
+            store: The log store the index is for.
+            text: The words to look for.
+
+        Returns:
+            The matching entries.
+        """
+        terms = tokenize(text)
+        if not terms:
+            return []
+        data = self.load_current(store)
+        postings: Dict[str, List[str]] = data["postings"]
+
+        matches: Optional[Set[str]] = None
+        for term in terms:
+            keys: Set[str] = set()
+            for token, token_keys in postings.items():
+                if token.startswith(term):
+                    keys.update(token_keys)
+            matches = keys if matches is None else matches & keys
+            if not matches:
+                return []
+
+        results = []
+        for key in sorted(matches or (), reverse=True):
+            for end, activity, notes, duration_minutes in data["docs"][key]:
+                # Other entries at this key may hold only some of the words.
+                tokens = _entry_tokens(activity, notes)
+                if not all(any(t.startswith(term) for t in tokens) for term in terms):
+                    continue
+                results.append(
+                    TimeEntry(
+                        start_time=datetime.fromisoformat(key),
+                        end_time=datetime.fromisoformat(end),
+                        activity=activity,
+                        duration_minutes=duration_minutes,
+                        notes=notes,
+                    )
+                )
+        return results
@@ -0,0 +1,1214 @@
+# project/timetrack/storage.py
+"""Storage backends for the time log."""
+
+import hashlib
+import json
+import mmap
+import os
+import sqlite3
+import struct
+import tempfile
+import threading
+from bisect import bisect_left
+from contextlib import ExitStack, contextmanager
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from pydantic import TypeAdapter  # type: ignore
+
+from .models import TimeEntry, TimeLog
+
+# Once the journal grows past this size it is folded back into the snapshot.
+JOURNAL_COMPACT_BYTES = 256 * 1024
+
+# Streaming reads decode the log in chunks of roughly this many bytes or records.
+ITER_CHUNK_BYTES = 1024 * 1024
+ITER_CHUNK_RECORDS = 4096
+
+_ENTRY_LIST = TypeAdapter(List[TimeEntry])
+
+try:
+    import fcntl
+except ImportError:  # Windows: writes stay atomic but are not serialized.
+    fcntl = None  # type: ignore
+
+
+def atomic_write(path: Path, data: Union[str, bytes]):
+    """
+    Replaces a file's contents atomically.
+
+    The data is written and synced to a temporary file next to path, which is
+    then renamed over it, so readers see either the old or the new contents and
+    never a partial write.
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def _in_range(entry: TimeEntry, start: Optional[datetime], end: Optional[datetime]) -> bool:
+    """Returns True if start <= entry.start_time < end, treating None as unbounded."""
+    return (start is None or entry.start_time >= start) and (
+        end is None or entry.start_time < end
+    )
+
+
+def _same_entry(a: TimeEntry, b: TimeEntry) -> bool:
+    """Returns True if two entries hold the same times, activity, duration and notes."""
+    return (
+        a.start_time == b.start_time
+        and a.end_time == b.end_time
+        and a.activity == b.activity
+        and a.duration_minutes == b.duration_minutes
+        and a.notes == b.notes
+    )
+
+
+def _bisect_start(entries: List[TimeEntry], when: datetime) -> int:
+    """Returns the index of the first entry starting at or after when, in entries sorted by start time."""
+    lo, hi = 0, len(entries)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if entries[mid].start_time < when:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+class FileLock:
+    """
+    An exclusive advisory lock on a file, shared between processes via flock.
+
+    The lock is re-entrant within one FileLock instance, so a locked method can
+    call another locked method. Threads sharing an instance take turns.
+
+    Args:
+        path (Path): The lock file. It is created if it does not exist.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._fd: Optional[int] = None
+        self._depth = 0
+        self._thread_lock = threading.RLock()
+
+    def __enter__(self) -> "FileLock":
+        self._thread_lock.acquire()
+        if self._depth == 0:
+            try:
+                fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+            except BaseException:
+                self._thread_lock.release()
+                raise
+            self._fd = fd
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc_info):
+        self._depth -= 1
+        if self._depth == 0 and self._fd is not None:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+        self._thread_lock.release()
+
+
+class LogStore:
+    """
+    Base class for time log storage backends.
+
+    Subclasses must implement read_log and write_log. The remaining operations
+    fall back to a full read-modify-write and should be overridden by backends
+    that can do better.
+    """
+
+    def read_log(self) -> TimeLog:
+        """Reads the whole log, sorted by start time."""
+        raise NotImplementedError
+
+    def write_log(self, log: TimeLog):
+        """Replaces the whole log."""
+        raise NotImplementedError
+
+    def files(self) -> List[Path]:
+        """Returns the files that hold the log, used to detect outside changes."""
+        raise NotImplementedError
+
+    def has_entries(self) -> bool:
+        """Returns True if the log holds at least one entry."""
+        return bool(self.read_log().entries)
+
+    def entries_between(self, start: datetime, end: datetime) -> List[TimeEntry]:
+        """Returns the entries with start <= start_time < end, sorted by start time."""
+        return list(self.iter_log(start, end))
+
+    def iter_log(
+        self, start: Optional[datetime] = None, end: Optional[datetime] = None
+    ) -> Iterator[TimeEntry]:
+        """
+        Yields every entry with start <= start_time < end, in start time order.
+        A missing bound leaves that side of the range open.
+
+        Backends that can decode the log piece by piece override this, so that
+        callers streaming the log do not need to hold it in memory, and only the
+        part of the log in range is read. Here the range is located in the
+        sorted log by bisection.
+        """
+        entries = self.read_log().entries
+        first = 0 if start is None else _bisect_start(entries, start)
+        last = len(entries) if end is None else _bisect_start(entries, end)
+        for i in range(first, max(first, last)):
+            yield entries[i]
+
+    def append_entry(self, entry: TimeEntry):
+        """Appends a new entry to the log."""
+        log = self.read_log()
+        log.entries.append(entry)
+        self.write_log(log)
+
+    def replace_entry(self, original: TimeEntry, updated: TimeEntry):
+        """Replaces the entry equal to original with updated."""
+        log = self.read_log()
+        for i, entry in enumerate(log.entries):
+            if _same_entry(entry, original):
+                log.entries[i] = updated
+                break
+        self.write_log(log)
+
+    def remove_entry(self, entry: TimeEntry):
+        """Removes the entry equal to entry."""
+        log = self.read_log()
+        for i, other in enumerate(log.entries):
+            if _same_entry(other, entry):
+                del log.entries[i]
+                break
+        self.write_log(log)
+
+    def compact(self) -> int:
+        """
+        Folds any pending changes into the primary storage.
+
+        Returns:
+            The number of pending changes that were folded in.
+        """
+        return 0
+
+
+class JsonLogStore(LogStore):
+    """
+    Stores the time log as a JSON snapshot plus an append-only JSONL journal.
+
+    Appends, edits and removals are written as single journal records, so the
+    cost of a write does not depend on the size of the log. Reads load the
+    snapshot and replay the journal on top of it. Compaction folds the journal
+    back into the snapshot once it grows past JOURNAL_COMPACT_BYTES.
+
+    The parsed snapshot is kept in memory keyed on the file's mtime, size and
+    content hash, so a command that reads the log several times only parses it
+    once.
+
+    Whenever the snapshot is written, a sidecar index records the byte range of
+    each day's entries. Range lookups seek to and decode only those bytes, as
+    long as the index still matches the snapshot's mtime and size.
+
+    The journal's first record names the snapshot it applies to. A journal
+    left behind by a crash between writing a snapshot and clearing the journal
+    names an older snapshot, and is ignored rather than replayed twice.
+
+    Args:
+        log_file (Path): The JSON snapshot (timelog.json).
+        journal_file (Path): The JSONL journal of changes since the snapshot.
+        index_file (Path): The per-day byte range index of the snapshot.
+    """
+
+    def __init__(self, log_file: Path, journal_file: Path, index_file: Path):
+        self.log_file = log_file
+        self.journal_file = journal_file
+        self.index_file = index_file
+        self._snapshot_stat: Optional[Tuple[int, int]] = None
+        self._snapshot_hash: Optional[bytes] = None
+        self._snapshot_entries: List[TimeEntry] = []
+
+    def files(self) -> List[Path]:
+        """Returns the snapshot and journal files."""
+        return [self.log_file, self.journal_file]
+
+    def _snapshot_is_cached(self) -> bool:
+        """Returns True if the parsed snapshot in memory is still current."""
+        try:
+            st = self.log_file.stat()
+        except FileNotFoundError:
+            return False
+        return (st.st_mtime_ns, st.st_size) == self._snapshot_stat
+
+    def _read_snapshot(self) -> List[TimeEntry]:
+        """Reads the snapshot file, reusing the last parse if it is unchanged."""
+        try:
+            st = self.log_file.stat()
+        except FileNotFoundError:
+            return []
+        if (st.st_mtime_ns, st.st_size) == self._snapshot_stat:
+            return list(self._snapshot_entries)
+
+        raw = self.log_file.read_bytes()
+        digest = hashlib.blake2b(raw, digest_size=16).digest()
+        if digest != self._snapshot_hash:
+            self._snapshot_hash = digest
+            self._snapshot_entries = self._parse_snapshot(raw)
+        self._snapshot_stat = (st.st_mtime_ns, st.st_size)
+        return list(self._snapshot_entries)
+
+    def _parse_snapshot(self, raw: bytes) -> List[TimeEntry]:
+        """
+        Validates the raw snapshot.
+
+        The whole file is validated in a single pydantic-core call. Only files
+        that fail it, such as logs still holding entries in the old date/time
+        format, go through the slower per-entry path.
+        """
+        try:
+            return TimeLog.model_validate_json(raw).entries
+        except ValueError:
+            pass
+
+        try:
+            log_data = json.loads(raw)
+            validated_entries = []
+            for entry_data in log_data.get("entries", []):
+                if (
+                    "start_time" in entry_data
+                    and isinstance(entry_data["start_time"], str)
+                    and "date" in entry_data
+                ):
+                    # Old format, try to convert
+                    try:
+                        start_dt_str = (
+                            f"{entry_data['date']} {entry_data['start_time']}"
+                        )
+                        end_dt_str = f"{entry_data['date']} {entry_data['end_time']}"
+                        entry_data["start_time"] = datetime.fromisoformat(start_dt_str)
+                        entry_data["end_time"] = datetime.fromisoformat(end_dt_str)
+                    except (ValueError, KeyError):
+                        continue  # Skip malformed old entries
+                validated_entries.append(TimeEntry.model_validate(entry_data))
+            return validated_entries
+        except (json.JSONDecodeError, ValueError):
+            return []
+
+    def _snapshot_id(self) -> Optional[List[int]]:
+        """Returns the snapshot's inode, mtime and size, which every snapshot write changes."""
+        try:
+            st = self.log_file.stat()
+        except FileNotFoundError:
+            return None
+        return [st.st_ino, st.st_mtime_ns, st.st_size]
+
+    def _read_journal(self) -> List[dict]:
+        """
+        Reads the journal records, skipping any torn or malformed lines.
+
+        Returns no records if the journal was written against an older
+        snapshot, which already holds its changes.
+        """
+        if not self.journal_file.exists():
+            return []
+        records = []
+        with self.journal_file.open(encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+        if records and records[0].get("op") == "base":
+            if records[0].get("snapshot") != self._snapshot_id():
+                return []
+            records = records[1:]
+        return records
+
+    def _journal_is_current(self) -> bool:
+        """Returns True if the journal exists and applies to the current snapshot."""
+        try:
+            with self.journal_file.open(encoding="utf-8") as f:
+                first = json.loads(f.readline())
+        except FileNotFoundError:
+            return False
+        except json.JSONDecodeError:
+            return True
+        # Journals from before base records were written have none.
+        return first.get("op") != "base" or first.get("snapshot") == self._snapshot_id()
+
+    def _append_record(self, record: dict):
+        """Appends one record to the journal, compacting if it has grown too large."""
+        if self._journal_is_current():
+            mode, lines = "a", [record]
+        else:
+            base = {"op": "base", "snapshot": self._snapshot_id()}
+            mode, lines = "w", [base, record]
+        with self.journal_file.open(mode, encoding="utf-8") as f:
+            f.write("".join(json.dumps(line) + "\n" for line in lines))
+            journal_size = f.tell()
+        if journal_size > JOURNAL_COMPACT_BYTES:
+            self.compact()
+
+    def _read_changes(
+        self,
+    ) -> List[Tuple[Optional[datetime], Optional[TimeEntry], Optional[TimeEntry]]]:
+        """
+        Reads the journal as a list of changes.
+
+        Each change is a tuple of (start time of the entry it replaces or
+        removes, that entry, new entry). Adds have no replaced entry; removals
+        have no new entry. Records written before the replaced entry was
+        recorded in full only carry its start time.
+        """
+        changes = []
+        for record in self._read_journal():
+            try:
+                op = record["op"]
+                if op == "add":
+                    changes.append((None, None, TimeEntry.model_validate(record["entry"])))
+                    continue
+                if op not in ("edit", "remove"):
+                    continue
+                if "original" in record:
+                    original = TimeEntry.model_validate(record["original"])
+                    key, target = original.start_time, original
+                else:
+                    key, target = datetime.fromisoformat(record["key"]), None
+                entry = TimeEntry.model_validate(record["entry"]) if op == "edit" else None
+                changes.append((key, target, entry))
+            except (KeyError, ValueError):
+                continue  # Skip malformed records
+        return changes
+
+    @staticmethod
+    def _replay(
+        entries: List[TimeEntry],
+        changes: List[Tuple[Optional[datetime], Optional[TimeEntry], Optional[TimeEntry]]],
+    ) -> List[TimeEntry]:
+        """
+        Applies journal changes to entries, returning them sorted by start time.
+
+        Several entries may share a start time, so adds are always kept, and an
+        edit or removal drops only the first entry equal to the one it names.
+        A change whose entry is not among entries, such as one for another
+        chunk of the log, only adds its new entry.
+        """
+        if not changes:
+            return entries
+
+        result = list(entries)
+        positions: Dict[datetime, List[int]] = {}
+        for i, entry in enumerate(result):
+            positions.setdefault(entry.start_time, []).append(i)
+        dropped = set()
+        for key, target, entry in changes:
+            if key is not None:
+                for i in positions.get(key, ()):
+                    if i not in dropped and (target is None or _same_entry(result[i], target)):
+                        dropped.add(i)
+                        break
+            if entry is not None:
+                positions.setdefault(entry.start_time, []).append(len(result))
+                result.append(entry)
+
+        kept = [entry for i, entry in enumerate(result) if i not in dropped]
+        kept.sort(key=lambda x: x.start_time)
+        return kept
+
+    def read_log(self) -> TimeLog:
+        """Reads the snapshot and replays the journal on top of it."""
+        return TimeLog(entries=self._replay(self._read_snapshot(), self._read_changes()))
+
+    def has_entries(self) -> bool:
+        """Returns True if the log holds an entry, decoding at most its first chunk."""
+        return next(self.iter_log(), None) is not None
+
+    def _read_index(self) -> Optional[dict]:
+        """Reads the day index, returning None if it is missing or stale."""
+        try:
+            st = self.log_file.stat()
+            index = json.loads(self.index_file.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if (index.get("mtime_ns"), index.get("size")) != (st.st_mtime_ns, st.st_size):
+            return None
+        return index
+
+    @staticmethod
+    def _read_span(f, first: List[int], last: List[int]) -> List[TimeEntry]:
+        """
+        Decodes the snapshot entries from the start of one day's span to the end
+        of another's. Days are stored in order, so this is one contiguous slice.
+        """
+        f.seek(first[0])
+        raw = f.read(last[1] - first[0])
+        return _ENTRY_LIST.validate_json(b"[" + raw + b"]")
+
+    def _read_indexed(self, start: datetime, end: datetime) -> Optional[List[TimeEntry]]:
+        """
+        Reads the snapshot entries for the days in [start, end) via the index.
+
+        Returns:
+            The entries of those days, or None if the index is missing or stale.
+        """
+        index = self._read_index()
+        if index is None:
+            return None
+
+        first_day = start.date().isoformat()
+        last_day = (end - timedelta(microseconds=1)).date().isoformat()
+        spans = [
+            span for day, span in index["days"].items() if first_day <= day <= last_day
+        ]
+        if not spans:
+            return []
+
+        try:
+            with self.log_file.open("rb") as f:
+                return self._read_span(f, spans[0], spans[-1])
+        except ValueError:
+            return None
+
+    def entries_between(self, start: datetime, end: datetime) -> List[TimeEntry]:
+        """Returns the entries in range, decoding only the indexed days when possible."""
+        entries = None
+        if not self._snapshot_is_cached():
+            entries = self._read_indexed(start, end)
+        if entries is None:
+            entries = self._read_snapshot()
+
+        entries = self._replay(entries, self._read_changes())
+        return [e for e in entries if start <= e.start_time < end]
+
+    def iter_log(
+        self, start: Optional[datetime] = None, end: Optional[datetime] = None
+    ) -> Iterator[TimeEntry]:
+        """
+        Yields the entries in range, decoding only the indexed days in range and
+        about ITER_CHUNK_BYTES at a time. Falls back to a full read without an
+        index.
+        """
+        index = None if self._snapshot_is_cached() else self._read_index()
+        if index is None:
+            yield from super().iter_log(start, end)
+            return
+
+        lower = start or datetime.min
+        final_upper = end or datetime.max
+        first_day = lower.date().isoformat()
+        last_day = (final_upper - timedelta(microseconds=1)).date().isoformat()
+        changes = self._read_changes()
+        days = [
+            (day, span)
+            for day, span in index["days"].items()
+            if first_day <= day <= last_day
+        ]
+        if not days:
+            for entry in self._replay([], changes):
+                if lower <= entry.start_time < final_upper:
+                    yield entry
+            return
+
+        with self.log_file.open("rb") as f:
+            # The open handle keeps reading the indexed file even if it is
+            # replaced mid-stream, but it must be the file the index describes.
+            st = os.fstat(f.fileno())
+            if (st.st_mtime_ns, st.st_size) != (index["mtime_ns"], index["size"]):
+                yield from super().iter_log(start, end)
+                return
+
+            chunk_start = 0
+            for i, (day, span) in enumerate(days):
+                is_last = i == len(days) - 1
+                if not is_last and span[1] - days[chunk_start][1][0] < ITER_CHUNK_BYTES:
+                    continue
+
+                # Journal changes are applied to the time range this chunk
+                # covers, so entries added between indexed days are not lost.
+                if is_last:
+                    upper = final_upper
+                else:
+                    upper = datetime.combine(date.fromisoformat(days[i + 1][0]), time.min)
+                entries = self._read_span(f, days[chunk_start][1], span)
+                for entry in self._replay(entries, changes):
+                    if lower <= entry.start_time < upper:
+                        yield entry
+
+                chunk_start = i + 1
+                lower = upper
+
+    @staticmethod
+    def _dump_snapshot(entries: List[TimeEntry]) -> Tuple[bytes, Dict[str, List[int]]]:
+        """
+        Serializes entries exactly like TimeLog.model_dump_json(indent=4),
+        recording the byte range each day's entries occupy.
+
+        Returns:
+            A tuple of (file contents, mapping of ISO day to [start, end) offsets).
+        """
+        if not entries:
+            return b'{\n    "entries": []\n}', {}
+
+        parts = [b'{\n    "entries": [\n']
+        offset = len(parts[0])
+        days: Dict[str, List[int]] = {}
+        for i, entry in enumerate(entries):
+            if i:
+                parts.append(b",\n")
+                offset += 2
+            body = b"        " + entry.model_dump_json(indent=4).encode().replace(
+                b"\n", b"\n        "
+            )
+            span = days.setdefault(entry.start_time.date().isoformat(), [offset, offset])
+            offset += len(body)
+            span[1] = offset
+            parts.append(body)
+        parts.append(b"\n    ]\n}")
+        return b"".join(parts), days
+
+    def write_log(self, log: TimeLog):
+        """Writes a full snapshot of the log and clears the journal."""
+        log.entries.sort(key=lambda x: x.start_time)
+        raw, days = self._dump_snapshot(log.entries)
+        atomic_write(self.log_file, raw)
+        self.journal_file.unlink(missing_ok=True)
+
+        st = self.log_file.stat()
+        atomic_write(
+            self.index_file,
+            json.dumps({"mtime_ns": st.st_mtime_ns, "size": st.st_size, "days": days}),
+        )
+        self._snapshot_stat = (st.st_mtime_ns, st.st_size)
+        self._snapshot_hash = hashlib.blake2b(raw, digest_size=16).digest()
+        self._snapshot_entries = list(log.entries)
+
+    def append_entry(self, entry: TimeEntry):
+        """Appends a new entry to the log."""
+        self._append_record({"op": "add", "entry": entry.model_dump(mode="json")})
+
+    def replace_entry(self, original: TimeEntry, updated: TimeEntry):
+        """Replaces the entry equal to original with updated."""
+        self._append_record(
+            {
+                "op": "edit",
+                "original": original.model_dump(mode="json"),
+                "entry": updated.model_dump(mode="json"),
+            }
+        )
+
+    def remove_entry(self, entry: TimeEntry):
+        """Removes the entry equal to entry."""
+        self._append_record({"op": "remove", "original": entry.model_dump(mode="json")})
+
+    def compact(self) -> int:
+        """Folds the journal into the snapshot."""
+        records = self._read_journal()
+        if records:
+            self.write_log(self.read_log())
+        return len(records)
+
+
+class ShardedLogStore(LogStore):
+    """
+    Stores the time log as one JSON file per day, e.g. log/2025/07/26.json.
+
+    Entries are sharded by the date of their start time. Day lookups and
+    single-entry changes only touch the shards for the affected dates, so their
+    cost is proportional to one day's data rather than the whole history.
+
+    Args:
+        log_dir (Path): The root directory of the shards.
+    """
+
+    # Ranges longer than this list existing shards instead of probing each day.
+    MAX_PROBED_DAYS = 62
+
+    def __init__(self, log_dir: Path):
+        self.log_dir = log_dir
+
+    def files(self) -> List[Path]:
+        """
+        Returns the shard directories rather than every shard file.
+
+        Shards are only ever replaced by renaming a new file over them or
+        deleted, and both change the mtime of the month directory holding
+        them, so checking one directory per month still detects every change.
+        """
+        return [
+            self.log_dir,
+            *sorted(self.log_dir.glob("[0-9][0-9][0-9][0-9]")),
+            *sorted(self.log_dir.glob("[0-9][0-9][0-9][0-9]/[0-9][0-9]")),
+        ]
+
+    def _shard_path(self, day: date) -> Path:
+        """Returns the path of the shard holding entries for day."""
+        return self.log_dir / f"{day.year:04d}" / f"{day.month:02d}" / f"{day.day:02d}.json"
+
+    def _shard_paths(self) -> Iterator[Path]:
+        """Yields the existing shard paths in date order."""
+        return iter(sorted(self.log_dir.glob("[0-9][0-9][0-9][0-9]/[0-9][0-9]/[0-9][0-9].json")))
+
+    @staticmethod
+    def _shard_day(path: Path) -> date:
+        """Returns the date a shard path stands for."""
+        return date(int(path.parent.parent.name), int(path.parent.name), int(path.stem))
+
+    def _read_shard(self, path: Path) -> List[TimeEntry]:
+        """Reads and validates a single shard."""
+        if not path.exists():
+            return []
+        try:
+            return TimeLog.model_validate_json(path.read_bytes()).entries
+        except ValueError:
+            return []
+
+    def _write_shard(self, path: Path, entries: List[TimeEntry]):
+        """Writes a single shard, deleting it once it has no entries left."""
+        if not entries:
+            path.unlink(missing_ok=True)
+            return
+        entries.sort(key=lambda x: x.start_time)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(path, TimeLog(entries=entries).model_dump_json(indent=4))
+
+    def read_log(self) -> TimeLog:
+        """Reads every shard in date order."""
+        entries = []
+        for path in self._shard_paths():
+            entries.extend(self._read_shard(path))
+        return TimeLog(entries=entries)
+
+    def write_log(self, log: TimeLog):
+        """Replaces every shard with the entries of log, grouped by day."""
+        by_day: Dict[date, List[TimeEntry]] = {}
+        for entry in log.entries:
+            by_day.setdefault(entry.start_time.date(), []).append(entry)
+
+        for path in self._shard_paths():
+            if self._shard_day(path) not in by_day:
+                path.unlink()
+        for day, entries in by_day.items():
+            self._write_shard(self._shard_path(day), entries)
+
+    def has_entries(self) -> bool:
+        """Returns True if any shard exists."""
+        return next(self._shard_paths(), None) is not None
+
+    def _shards_between(
+        self, start: Optional[datetime], end: Optional[datetime]
+    ) -> Iterator[Path]:
+        """Yields the shard paths that can hold entries in range, in day order."""
+        if start is None or end is None:
+            for path in self._shard_paths():
+                day = self._shard_day(path)
+                if (start is None or day >= start.date()) and (
+                    end is None or day <= (end - timedelta(microseconds=1)).date()
+                ):
+                    yield path
+            return
+
+        first_day = start.date()
+        last_day = (end - timedelta(microseconds=1)).date()
+        if (last_day - first_day).days < self.MAX_PROBED_DAYS:
+            for i in range((last_day - first_day).days + 1):
+                yield self._shard_path(first_day + timedelta(days=i))
+        else:
+            for path in self._shard_paths():
+                if first_day <= self._shard_day(path) <= last_day:
+                    yield path
+
+    def iter_log(
+        self, start: Optional[datetime] = None, end: Optional[datetime] = None
+    ) -> Iterator[TimeEntry]:
+        """Yields the entries in range, reading one shard at a time."""
+        for path in self._shards_between(start, end):
+            for entry in self._read_shard(path):
+                if _in_range(entry, start, end):
+                    yield entry
+
+    def entries_between(self, start: datetime, end: datetime) -> List[TimeEntry]:
+        """Returns the entries with start <= start_time < end, reading only the shards in range."""
+        return list(self.iter_log(start, end))
+
+    def append_entry(self, entry: TimeEntry):
+        """Adds an entry to the shard for its day."""
+        path = self._shard_path(entry.start_time.date())
+        entries = self._read_shard(path)
+        entries.append(entry)
+        self._write_shard(path, entries)
+
+    def replace_entry(self, original: TimeEntry, updated: TimeEntry):
+        """Replaces an entry, moving it to another shard if its day changed."""
+        self.remove_entry(original)
+        self.append_entry(updated)
+
+    def remove_entry(self, entry: TimeEntry):
+        """Removes the entry equal to entry from the shard for its day."""
+        path = self._shard_path(entry.start_time.date())
+        entries = self._read_shard(path)
+        for i, other in enumerate(entries):
+            if _same_entry(other, entry):
+                del entries[i]
+                break
+        self._write_shard(path, entries)
+
+
+class SqliteLogStore(LogStore):
+    """
+    Stores the time log in a SQLite database with indexed start_time and
+    activity columns, so day lookups and single-entry changes never load the
+    whole log.
+
+    Timestamps are stored as fixed-width ISO 8601 strings, which sort in the
+    same order as the datetimes they represent.
+
+    Args:
+        db_file (Path): The SQLite database file (timelog.db).
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS entries (
+            id INTEGER PRIMARY KEY,
+            start_time TEXT NOT NULL,
+            end_time TEXT NOT NULL,
+            activity TEXT NOT NULL,
+            duration_minutes INTEGER NOT NULL,
+            notes TEXT NOT NULL DEFAULT '[]'
+        );
+        CREATE INDEX IF NOT EXISTS idx_entries_start_time ON entries (start_time);
+        CREATE INDEX IF NOT EXISTS idx_entries_activity ON entries (activity);
+    """
+    COLUMNS = "start_time, end_time, activity, duration_minutes, notes"
+    # The id of one row equal to an entry; several entries may share a start time.
+    MATCH_ID = (
+        "SELECT id FROM entries WHERE start_time = ? AND end_time = ? "
+        "AND activity = ? AND duration_minutes = ? AND notes = ? LIMIT 1"
+    )
+
+    def __init__(self, db_file: Path):
+        self.db_file = db_file
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def files(self) -> List[Path]:
+        """Returns the database file and its write-ahead log."""
+        return [self.db_file, self.db_file.with_name(self.db_file.name + "-wal")]
+
+    def _connect(self) -> sqlite3.Connection:
+        """Opens the database on first use and makes sure the schema exists."""
+        if self._conn is None:
+            # trackd may call in from several threads, one at a time.
+            self._conn = sqlite3.connect(self.db_file, check_same_thread=False)
+            self._conn.executescript(self.SCHEMA)
+        return self._conn
+
+    @staticmethod
+    def _to_key(dt: datetime) -> str:
+        """Formats a datetime as a sortable, fixed-width ISO 8601 string."""
+        return dt.isoformat(timespec="microseconds")
+
+    def _to_row(self, entry: TimeEntry) -> tuple:
+        """Converts an entry into a row tuple matching COLUMNS."""
+        return (
+            self._to_key(entry.start_time),
+            self._to_key(entry.end_time),
+            entry.activity,
+            entry.duration_minutes,
+            json.dumps(entry.notes),
+        )
+
+    @staticmethod
+    def _from_row(row: tuple) -> TimeEntry:
+        """Converts a row tuple matching COLUMNS into an entry."""
+        return TimeEntry(
+            start_time=datetime.fromisoformat(row[0]),
+            end_time=datetime.fromisoformat(row[1]),
+            activity=row[2],
+            duration_minutes=row[3],
+            notes=json.loads(row[4]),
+        )
+
+    def read_log(self) -> TimeLog:
+        """Reads the whole log in start time order."""
+        rows = self._connect().execute(
+            f"SELECT {self.COLUMNS} FROM entries ORDER BY start_time"
+        )
+        return TimeLog(entries=[self._from_row(row) for row in rows])
+
+    def write_log(self, log: TimeLog):
+        """Replaces every entry in the database with the entries of log."""
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM entries")
+            conn.executemany(
+                f"INSERT INTO entries ({self.COLUMNS}) VALUES (?, ?, ?, ?, ?)",
+                [self._to_row(e) for e in log.entries],
+            )
+
+    def has_entries(self) -> bool:
+        """Returns True if the log holds at least one entry."""
+        row = self._connect().execute("SELECT 1 FROM entries LIMIT 1").fetchone()
+        return row is not None
+
+    def iter_log(
+        self, start: Optional[datetime] = None, end: Optional[datetime] = None
+    ) -> Iterator[TimeEntry]:
+        """Yields the entries in range, fetching rows from the cursor as they are consumed."""
+        clauses, params = [], []
+        if start is not None:
+            clauses.append("start_time >= ?")
+            params.append(self._to_key(start))
+        if end is not None:
+            clauses.append("start_time < ?")
+            params.append(self._to_key(end))
+        where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
+
+        rows = self._connect().execute(
+            f"SELECT {self.COLUMNS} FROM entries {where}ORDER BY start_time", params
+        )
+        for row in rows:
+            yield self._from_row(row)
+
+    def entries_between(self, start: datetime, end: datetime) -> List[TimeEntry]:
+        """Returns the entries with start <= start_time < end via the start_time index."""
+        rows = self._connect().execute(
+            f"SELECT {self.COLUMNS} FROM entries "
+            "WHERE start_time >= ? AND start_time < ? ORDER BY start_time",
+            (self._to_key(start), self._to_key(end)),
+        )
+        return [self._from_row(row) for row in rows]
+
+    def append_entry(self, entry: TimeEntry):
+        """Inserts a new entry."""
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                f"INSERT INTO entries ({self.COLUMNS}) VALUES (?, ?, ?, ?, ?)",
+                self._to_row(entry),
+            )
+
+    def replace_entry(self, original: TimeEntry, updated: TimeEntry):
+        """Replaces the entry equal to original with updated."""
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "UPDATE entries SET start_time = ?, end_time = ?, activity = ?, "
+                f"duration_minutes = ?, notes = ? WHERE id = ({self.MATCH_ID})",
+                self._to_row(updated) + self._to_row(original),
+            )
+
+    def remove_entry(self, entry: TimeEntry):
+        """Removes the entry equal to entry."""
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                f"DELETE FROM entries WHERE id = ({self.MATCH_ID})", self._to_row(entry)
+            )
+
+
+class _StartColumn:
+    """A read-only sequence view of the start times in a binary log, for bisect."""
+
+    def __init__(self, buf, record: struct.Struct):
+        self.buf = buf
+        self.record = record
+
+    def __len__(self) -> int:
+        return len(self.buf) // self.record.size
+
+    def __getitem__(self, index: int) -> int:
+        if index < 0:
+            index += len(self)
+        return self.record.unpack_from(self.buf, index * self.record.size)[0]
+
+
+class BinaryLogStore(LogStore):
+    """
+    Stores the time log as fixed-width binary records sorted by start time.
+
+    Each record holds the start and end time (microseconds since the epoch,
+    naive local time), the duration, an id into the activity dictionary and the
+    offset and length of the entry's notes in the notes file. The record file is
+    memory-mapped, so a date lookup is a binary search over the records and
+    only the rows in range are decoded into TimeEntry objects.
+
+    Args:
+        bin_file (Path): The record file (timelog.bin). The activity dictionary
+            and notes are kept next to it in timelog.activities.json and
+            timelog.notes.
+    """
+
+    RECORD = struct.Struct("<qqiIQI")
+    EPOCH = datetime(1970, 1, 1)
+
+    def __init__(self, bin_file: Path):
+        self.bin_file = bin_file
+        self.activities_file = bin_file.with_suffix(".activities.json")
+        self.notes_file = bin_file.with_suffix(".notes")
+
+    def files(self) -> List[Path]:
+        """Returns the record, activity and notes files."""
+        return [self.bin_file, self.activities_file, self.notes_file]
+
+    @classmethod
+    def _to_micros(cls, dt: datetime) -> int:
+        """Converts a naive datetime into microseconds since the epoch."""
+        return (dt - cls.EPOCH) // timedelta(microseconds=1)
+
+    @classmethod
+    def _from_micros(cls, micros: int) -> datetime:
+        """Converts microseconds since the epoch back into a naive datetime."""
+        return cls.EPOCH + timedelta(microseconds=micros)
+
+    @contextmanager
+    def _records(self) -> Iterator[Optional[mmap.mmap]]:
+        """Memory-maps the record file, yielding None if it is missing or empty."""
+        if not self.bin_file.exists() or self.bin_file.stat().st_size == 0:
+            yield None
+            return
+        with self.bin_file.open("rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                yield buf
+
+    def _read_activities(self) -> List[str]:
+        """Reads the activity dictionary."""
+        if not self.activities_file.exists():
+            return []
+        return json.loads(self.activities_file.read_text())
+
+    def _decode(
+        self, buf: mmap.mmap, lo: int, hi: int, activities: List[str]
+    ) -> List[TimeEntry]:
+        """Decodes the records in [lo, hi) into entries."""
+        if lo >= hi:
+            return []
+        entries = []
+        # The notes file only exists once an entry with notes has been stored.
+        with ExitStack() as stack:
+            notes = None
+            for index in range(lo, hi):
+                start, end, duration, activity_id, notes_offset, notes_length = (
+                    self.RECORD.unpack_from(buf, index * self.RECORD.size)
+                )
+                entry_notes = []
+                if notes_length:
+                    if notes is None:
+                        notes = stack.enter_context(self.notes_file.open("rb"))
+                    notes.seek(notes_offset)
+                    entry_notes = json.loads(notes.read(notes_length))
+                entries.append(
+                    TimeEntry(
+                        start_time=self._from_micros(start),
+                        end_time=self._from_micros(end),
+                        activity=activities[activity_id],
+                        duration_minutes=duration,
+                        notes=entry_notes,
+                    )
+                )
+        return entries
+
+    def _encode(
+        self,
+        entry: TimeEntry,
+        activity_ids: Dict[str, int],
+        activities: List[str],
+        notes_offset: int,
+    ) -> Tuple[bytes, bytes]:
+        """
+        Encodes an entry into a record, registering its activity if needed.
+
+        Returns:
+            A tuple of (record bytes, notes bytes to append at notes_offset).
+        """
+        if entry.activity not in activity_ids:
+            activity_ids[entry.activity] = len(activities)
+            activities.append(entry.activity)
+        notes = json.dumps(entry.notes).encode() if entry.notes else b""
+        record = self.RECORD.pack(
+            self._to_micros(entry.start_time),
+            self._to_micros(entry.end_time),
+            entry.duration_minutes,
+            activity_ids[entry.activity],
+            notes_offset,
+            len(notes),
+        )
+        return record, notes
+
+    def read_log(self) -> TimeLog:
+        """Decodes every record."""
+        with self._records() as buf:
+            if buf is None:
+                return TimeLog()
+            activities = self._read_activities()
+            return TimeLog(entries=self._decode(buf, 0, len(buf) // self.RECORD.size, activities))
+
+    def write_log(self, log: TimeLog):
+        """Rewrites the record, activity and notes files from log."""
+        log.entries.sort(key=lambda x: x.start_time)
+        activities: List[str] = []
+        activity_ids: Dict[str, int] = {}
+        records = bytearray()
+        notes_blob = bytearray()
+        for entry in log.entries:
+            record, notes = self._encode(entry, activity_ids, activities, len(notes_blob))
+            records += record
+            notes_blob += notes
+
+        atomic_write(self.notes_file, bytes(notes_blob))
+        atomic_write(self.activities_file, json.dumps(activities))
+        atomic_write(self.bin_file, bytes(records))
+
+    def has_entries(self) -> bool:
+        """Returns True if the record file holds at least one record."""
+        return self.bin_file.exists() and self.bin_file.stat().st_size > 0
+
+    def iter_log(
+        self, start: Optional[datetime] = None, end: Optional[datetime] = None
+    ) -> Iterator[TimeEntry]:
+        """
+        Yields the entries in range, binary-searching for its bounds and decoding
+        ITER_CHUNK_RECORDS records at a time.
+        """
+        with self._records() as buf:
+            if buf is None:
+                return
+            activities = self._read_activities()
+            starts = _StartColumn(buf, self.RECORD)
+            first, last = 0, len(starts)
+            if start is not None:
+                first = bisect_left(starts, self._to_micros(start))
+            if end is not None:
+                last = bisect_left(starts, self._to_micros(end), first)
+            for lo in range(first, last, ITER_CHUNK_RECORDS):
+                yield from self._decode(
+                    buf, lo, min(lo + ITER_CHUNK_RECORDS, last), activities
+                )
+
+    def entries_between(self, start: datetime, end: datetime) -> List[TimeEntry]:
+        """Binary-searches the records and decodes only those in range."""
+        with self._records() as buf:
+            if buf is None:
+                return []
+            starts = _StartColumn(buf, self.RECORD)
+            lo = bisect_left(starts, self._to_micros(start))
+            hi = bisect_left(starts, self._to_micros(end), lo)
+            return self._decode(buf, lo, hi, self._read_activities())
+
+    def _store_payload(self, entry: TimeEntry) -> bytes:
+        """
+        Appends an entry's notes and activity to the side files.
+
+        Returns:
+            The encoded record for the entry.
+        """
+        activities = self._read_activities()
+        activity_ids = {name: i for i, name in enumerate(activities)}
+        known_activities = len(activities)
+        notes_offset = self.notes_file.stat().st_size if self.notes_file.exists() else 0
+        record, notes = self._encode(entry, activity_ids, activities, notes_offset)
+
+        if notes:
+            with self.notes_file.open("ab") as f:
+                f.write(notes)
+        if len(activities) != known_activities:
+            atomic_write(self.activities_file, json.dumps(activities))
+        return record
+
+    def _find_record(self, data: bytearray, entry: TimeEntry) -> Optional[int]:
+        """
+        Finds the record holding entry among those sharing its start time,
+        comparing the end time, duration and activity, then the notes.
+
+        Returns:
+            The record's index, or None if there is no such record.
+        """
+        starts = _StartColumn(data, self.RECORD)
+        key = self._to_micros(entry.start_time)
+        activity_id = {name: i for i, name in enumerate(self._read_activities())}.get(
+            entry.activity
+        )
+        if activity_id is None:
+            return None
+        expected = (self._to_micros(entry.end_time), entry.duration_minutes, activity_id)
+        notes = json.dumps(entry.notes).encode() if entry.notes else b""
+
+        index = bisect_left(starts, key)
+        while index < len(starts) and starts[index] == key:
+            _, end, duration, record_activity, notes_offset, notes_length = (
+                self.RECORD.unpack_from(data, index * self.RECORD.size)
+            )
+            if (end, duration, record_activity) == expected and notes_length == len(notes):
+                if not notes:
+                    return index
+                with self.notes_file.open("rb") as f:
+                    f.seek(notes_offset)
+                    if f.read(notes_length) == notes:
+                        return index
+            index += 1
+        return None
+
+    def _splice(self, remove: Optional[TimeEntry], insert: Optional[TimeEntry]):
+        """
+        Removes the record holding remove and/or inserts a new one in sorted
+        position, without decoding any other records.
+
+        The notes of a removed record stay in the notes file until the next
+        full rewrite.
+        """
+        with self._records() as buf:
+            data = bytearray(buf) if buf is not None else bytearray()
+        size = self.RECORD.size
+        del data[len(data) - len(data) % size:]  # A partial record from a crash.
+        starts = _StartColumn(data, self.RECORD)
+
+        if remove is not None:
+            index = self._find_record(data, remove)
+            if index is not None:
+                del data[index * size:(index + 1) * size]
+
+        if insert is not None:
+            record = self._store_payload(insert)
+            index = bisect_left(starts, self._to_micros(insert.start_time))
+            data[index * size:index * size] = record
+
+        atomic_write(self.bin_file, bytes(data))
+
+    def append_entry(self, entry: TimeEntry):
+        """Adds an entry, appending in place when it is the latest one."""
+        with self._records() as buf:
+            starts = _StartColumn(buf, self.RECORD) if buf is not None else []
+            is_latest = not starts or starts[-1] <= self._to_micros(entry.start_time)
+        if not is_latest:
+            self._splice(None, entry)
+            return
+
+        record = self._store_payload(entry)
+        with self.bin_file.open("ab") as f:
+            # Drop the partial record left by a crash mid-append, which readers
+            # already ignore, so that this record starts on a record boundary.
+            size = f.seek(0, os.SEEK_END)
+            if size % self.RECORD.size:
+                f.truncate(size - size % self.RECORD.size)
+            f.write(record)
+
+    def replace_entry(self, original: TimeEntry, updated: TimeEntry):
+        """Replaces an entry by splicing the record file."""
+        self._splice(original, updated)
+
+    def remove_entry(self, entry: TimeEntry):
+        """Removes an entry by splicing the record file."""
+        self._splice(entry, None)